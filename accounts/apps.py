@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        from task_tracker import versions
+        from . import signals  # noqa: F401
+        from .models import Role, User
+
+        versions.track(User, 'roles')
+        versions.track(Role)
@@ -0,0 +1,141 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router, transaction
+from django.db.models import DEFERRED, F
+from django.utils.translation import gettext_lazy as _
+from rest_framework.settings import api_settings as rest_framework_settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+from .roles import ROLE_NAMES_ATTR, get_role_names
+
+TOKEN_VERSION_CACHE_KEY = "accounts:token_version:{}"
+
+# Claims that CustomTokenObtainPairSerializer writes into every token and that
+# are needed to build a principal without reading the user row.
+PRINCIPAL_CLAIMS = ("email", "roles", "token_version")
+
+
+def get_token_version(user_id):
+    """
+    Returns the current token version of a user, or None if the user does not exist.
+
+    The version lives in the cache for TOKEN_VERSION_CACHE_TIMEOUT seconds and
+    is only read from the database on a cache miss (first request after a
+    restart, expiry, eviction or revocation), so checking it does not cost a
+    query per request.
+    """
+    key = TOKEN_VERSION_CACHE_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = User.objects.filter(pk=user_id).values_list("token_version", flat=True).first()
+        if version is not None:
+            cache.set(key, version, timeout=settings.TOKEN_VERSION_CACHE_TIMEOUT)
+    return version
+
+
+def revoke_tokens(user_ids):
+    """
+    Invalidates every token issued so far to the given users.
+
+    Increments `token_version` in the database and drops the cached copies so the
+    next request re-reads the new version. Inside a transaction they are dropped
+    again on commit: a request may re-cache the old version, still the committed
+    one, in between.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    User.objects.filter(pk__in=user_ids).update(token_version=F("token_version") + 1)
+    keys = [TOKEN_VERSION_CACHE_KEY.format(user_id) for user_id in user_ids]
+    cache.delete_many(keys)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def authenticate_request(request):
+    """
+    Runs the configured REST framework authentication classes on a plain
+    Django request, for code running outside the views (middlewares, the
+    event stream). Returns (user, token, role names), or None without
+    credentials.
+
+    Only the request's headers are read; it is not changed.
+
+    Raises:
+        AuthenticationFailed: The credentials are invalid, expired or revoked.
+    """
+    for authentication_class in rest_framework_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        result = authentication_class().authenticate(request)
+        if result is not None:
+            user, token = result
+            return user, token, get_role_names(user)
+    return None
+
+
+def build_principal(user_id, email, role_names, token_version):
+    """
+    Builds a `User` instance from token claims without querying the database.
+
+    Only `id`, `email`, `is_active` and `token_version` are loaded; every other
+    column is deferred and fetched on first access. The instance behaves like a
+    normal user for permission checks, queryset filters (`owner=request.user`)
+    and foreign key assignment.
+    """
+    loaded = {"id": user_id, "email": email, "is_active": True, "token_version": token_version}
+    user = User.from_db(
+        router.db_for_read(User),
+        list(loaded),
+        [loaded.get(field.attname, DEFERRED) for field in User._meta.concrete_fields],
+    )
+    setattr(user, ROLE_NAMES_ATTR, frozenset(role_names))
+    return user
+
+
+def load_full_user(user):
+    """
+    Loads every deferred column of a principal in a single query.
+
+    Use this in views that serialize the user itself (e.g. `/users/me/`).
+    Instances loaded by `JWTAuthentication` are returned unchanged.
+    """
+    deferred = user.get_deferred_fields()
+    if deferred:
+        user.refresh_from_db(fields=deferred)
+    return user
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that trusts the token claims instead of loading the user row.
+
+    The request user is built from the `user_id`, `email` and `roles` claims, so a
+    read-only request that only needs permission checks and queryset filtering
+    runs no user or role queries at all.
+
+    Revocation:
+        Every token carries the user's `token_version`. It is compared against the
+        cached current version; changing roles, password or active status (or
+        deleting the user) bumps the version and rejects older tokens.
+
+    Tokens issued before these claims were added fall back to the regular
+    database lookup of `JWTAuthentication`.
+
+    Enable with `STATELESS_JWT=1` in the environment.
+    """
+
+    def get_user(self, validated_token):
+        if any(claim not in validated_token for claim in PRINCIPAL_CLAIMS):
+            return super().get_user(validated_token)
+
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        token_version = validated_token["token_version"]
+        if get_token_version(user_id) != token_version:
+            raise AuthenticationFailed(_("Token has been revoked."), code="token_revoked")
+
+        return build_principal(user_id, validated_token["email"], validated_token["roles"], token_version)
@@ -14,6 +14,9 @@ class Role(models.Model):
 class User(AbstractUser):
     email = models.EmailField(unique=True)  # Ensure email is unique
     roles = models.ManyToManyField(Role, related_name='users')
+    # Bumped whenever roles, password or active status change so that stateless
+    # JWT authentication can reject tokens issued before the change.
+    token_version = models.PositiveIntegerField(default=0)
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []  # Remove 'username' from required fields
@@ -1,5 +1,8 @@
 from rest_framework.permissions import BasePermission
 
+from .models import Role
+from .roles import has_role
+
 class IsAdmin(BasePermission):
     """
     Allows access only to users with the 'admin' role.
@@ -9,7 +12,7 @@ class IsAdmin(BasePermission):
         False otherwise.
     """
     def has_permission(self, request, view):
-        return request.user.is_authenticated and request.user.roles.filter(name='admin').exists()
+        return has_role(request.user, Role.ADMIN)
 
 class IsTaskCreator(BasePermission):
     """
@@ -20,7 +23,7 @@ class IsTaskCreator(BasePermission):
         False otherwise.
     """
     def has_permission(self, request, view):
-        return request.user.is_authenticated and request.user.roles.filter(name='task_creator').exists()
+        return has_role(request.user, Role.TASK_CREATOR)
 
 class IsReadOnlyUser(BasePermission):
     """
@@ -31,7 +34,7 @@ class IsReadOnlyUser(BasePermission):
         False otherwise.
     """
     def has_permission(self, request, view):
-        return request.user.is_authenticated and request.user.roles.filter(name='read_only').exists()
+        return has_role(request.user, Role.READ_ONLY)
 
 
 class IsReadOnlyOrAdminOrTaskCreator(BasePermission):
@@ -48,11 +51,7 @@ class IsReadOnlyOrAdminOrTaskCreator(BasePermission):
         False otherwise.
     """
     def has_permission(self, request, view):
-        return (
-            IsReadOnlyUser().has_permission(request, view) or
-            IsAdmin().has_permission(request, view) or
-            IsTaskCreator().has_permission(request, view)
-        )
+        return has_role(request.user, Role.READ_ONLY, Role.ADMIN, Role.TASK_CREATOR)
 
 
 class IsAdminOrTaskCreator(BasePermission):
@@ -66,8 +65,4 @@ class IsAdminOrTaskCreator(BasePermission):
         False otherwise.
     """
     def has_permission(self, request, view):
-        return (
-            IsAdmin().has_permission(request, view) or
-            IsTaskCreator().has_permission(request, view)
-        )
-
+        return has_role(request.user, Role.ADMIN, Role.TASK_CREATOR)
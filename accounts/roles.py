@@ -0,0 +1,45 @@
+ROLE_NAMES_ATTR = "_role_names"
+
+
+def get_role_names(user):
+    """
+    Returns the names of the roles assigned to a user as a frozenset.
+
+    The role names are loaded with a single query the first time they are
+    requested and cached on the user instance. Authentication builds a fresh
+    user instance for every request, so the roles are resolved at most once
+    per request no matter how many permission classes or views ask for them.
+
+    Args:
+        user: The request user (may be anonymous).
+
+    Returns:
+        frozenset: Role names, e.g. frozenset({'admin', 'read_only'}).
+        An empty frozenset for anonymous users.
+    """
+    if not getattr(user, "is_authenticated", False):
+        return frozenset()
+
+    role_names = getattr(user, ROLE_NAMES_ATTR, None)
+    if role_names is None:
+        role_names = frozenset(user.roles.values_list("name", flat=True))
+        setattr(user, ROLE_NAMES_ATTR, role_names)
+    return role_names
+
+
+def has_role(user, *names):
+    """
+    Returns True if the user has at least one of the given roles.
+
+    Example:
+        >>> has_role(request.user, Role.ADMIN, Role.TASK_CREATOR)
+        True
+    """
+    return not get_role_names(user).isdisjoint(names)
+
+
+def clear_role_names(user):
+    """
+    Drops the cached role names so that the next lookup hits the database.
+    """
+    user.__dict__.pop(ROLE_NAMES_ATTR, None)
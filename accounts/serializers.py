@@ -2,14 +2,19 @@ from rest_framework import serializers
 from django.contrib.auth.hashers import make_password
 
 
+from task_tracker.eager_loading import EagerLoadingMixin
+from task_tracker.relations import BulkPrimaryKeyRelatedField, BulkRelatedLookupMixin
+from task_tracker.sparse_fieldsets import SparseFieldsetsMixin
+from task_tracker.timing import TimedListSerializer, TimedSerializerMixin
 from .models import User, Role
 
-class RoleSerializer(serializers.ModelSerializer):
+class RoleSerializer(TimedSerializerMixin, SparseFieldsetsMixin, EagerLoadingMixin, serializers.ModelSerializer):
     class Meta:
         model = Role
+        list_serializer_class = TimedListSerializer
         fields = ['id', 'name']
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, BulkRelatedLookupMixin, SparseFieldsetsMixin, EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializer for the User model.
 
@@ -26,7 +31,7 @@ class UserSerializer(serializers.ModelSerializer):
         - first_name: First name of the user.
         - last_name: Last name of the user.
         - roles (read-only): Nested list of Role objects assigned to the user.
-        - role_ids (write-only): List of role IDs used to assign roles.
+        - role_ids (write-only): List of role IDs used to assign roles (validated with one query).
         - password (write-only): User password; automatically hashed.
 
     Notes:
@@ -62,16 +67,18 @@ class UserSerializer(serializers.ModelSerializer):
     }
     """
     roles = RoleSerializer(many=True, read_only=True)
-    role_ids = serializers.PrimaryKeyRelatedField(
+    role_ids = BulkPrimaryKeyRelatedField(
         queryset=Role.objects.all(), many=True, write_only=True, source='roles'
     )
 
     class Meta:
         model = User
+        list_serializer_class = TimedListSerializer
         fields = ['id', 'username','email', 'first_name', 'last_name', 'roles', 'role_ids', 'password']
         extra_kwargs = {
             'password': {'write_only': True}
         }
+        prefetch_related = ['roles']
 
     def to_internal_value(self, data):
         """
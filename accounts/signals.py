@@ -0,0 +1,59 @@
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .authentication import TOKEN_VERSION_CACHE_KEY, revoke_tokens
+from .models import User
+from .roles import clear_role_names
+
+# Changes to these fields invalidate tokens already issued to the user.
+TOKEN_SENSITIVE_FIELDS = ("password", "is_active")
+
+
+@receiver(m2m_changed, sender=User.roles.through)
+def reset_cached_role_names(sender, instance, action, reverse, **kwargs):
+    """
+    Keeps the per-request role cache honest when a user's roles are changed
+    through the instance that already cached them (e.g. `user.roles.set(...)`).
+    """
+    if action.startswith("post_") and not reverse:
+        clear_role_names(instance)
+
+
+@receiver(m2m_changed, sender=User.roles.through)
+def revoke_tokens_on_role_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Tokens embed the user's roles, so any role assignment change revokes them.
+    """
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        revoke_tokens([instance.pk])
+    elif action == "pre_clear":
+        revoke_tokens(instance.users.values_list("pk", flat=True))
+    else:
+        revoke_tokens(pk_set or [])
+
+
+@receiver(pre_save, sender=User)
+def detect_token_sensitive_changes(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and not set(update_fields) & set(TOKEN_SENSITIVE_FIELDS):
+        return
+    previous = User.objects.filter(pk=instance.pk).values(*TOKEN_SENSITIVE_FIELDS).first()
+    instance._revoke_tokens = previous is not None and any(
+        previous[field] != getattr(instance, field) for field in TOKEN_SENSITIVE_FIELDS
+    )
+
+
+@receiver(post_save, sender=User)
+def revoke_tokens_on_credential_change(sender, instance, created, raw=False, **kwargs):
+    if instance.__dict__.pop("_revoke_tokens", False):
+        revoke_tokens([instance.pk])
+        instance.refresh_from_db(fields=["token_version"])
+
+
+@receiver(post_delete, sender=User)
+def forget_token_version(sender, instance, **kwargs):
+    cache.delete(TOKEN_VERSION_CACHE_KEY.format(instance.pk))
@@ -1,3 +1,239 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import RefreshToken
 
-# Create your tests here.
+from task_tracker.serializers import CustomTokenObtainPairSerializer
+from task_tracker.testing import APITestCase
+from tasks.views import TaskViewSet
+from .authentication import TOKEN_VERSION_CACHE_KEY, StatelessJWTAuthentication, load_full_user
+from .models import Role, User
+from .roles import get_role_names, has_role
+from .serializers import UserSerializer
+
+
+def role_queries(queries):
+    return [q for q in queries if '"accounts_role"' in q['sql']]
+
+
+class RoleResolutionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin_role = Role.objects.create(name=Role.ADMIN)
+        self.creator_role = Role.objects.create(name=Role.TASK_CREATOR)
+        self.read_only_role = Role.objects.create(name=Role.READ_ONLY)
+        self.user = User.objects.create_user(username='u@example.com', email='u@example.com', password='x')
+        self.user.roles.set([self.creator_role, self.read_only_role])
+
+    def authenticate(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+        return client
+
+    def test_role_names_are_loaded_once_per_user_instance(self):
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_role_names(user), frozenset({Role.TASK_CREATOR, Role.READ_ONLY}))
+            self.assertTrue(has_role(user, Role.READ_ONLY))
+            self.assertFalse(has_role(user, Role.ADMIN))
+
+    def test_changing_roles_resets_the_cache(self):
+        get_role_names(self.user)
+        self.user.roles.add(self.admin_role)
+        self.assertIn(Role.ADMIN, get_role_names(self.user))
+
+    def test_task_list_resolves_roles_once(self):
+        client = self.authenticate(self.user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get('/api/tasks/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(role_queries(ctx.captured_queries)), 1)
+
+    def test_project_list_resolves_roles_once(self):
+        client = self.authenticate(self.user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get('/api/projects/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(role_queries(ctx.captured_queries)), 1)
+
+    def test_write_permission_resolves_roles_once(self):
+        read_only = User.objects.create_user(username='r@example.com', email='r@example.com', password='x')
+        read_only.roles.set([self.read_only_role])
+        client = self.authenticate(read_only)
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.post('/api/projects/', {}, format='json')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(len(role_queries(ctx.captured_queries)), 1)
+
+
+class StatelessJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.read_only_role = Role.objects.create(name=Role.READ_ONLY)
+        self.admin_role = Role.objects.create(name=Role.ADMIN)
+        self.user = User.objects.create_user(
+            username='s@example.com', email='s@example.com', password='x', first_name='Sam', last_name='Lee'
+        )
+        self.user.roles.set([self.read_only_role])
+        self.user.refresh_from_db()
+        self.token = str(CustomTokenObtainPairSerializer.get_token(self.user).access_token)
+
+    def authenticate(self, token):
+        request = APIRequestFactory().get('/api/tasks/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        return StatelessJWTAuthentication().authenticate(request)
+
+    def list_tasks(self, token):
+        view = TaskViewSet.as_view({'get': 'list'}, authentication_classes=[StatelessJWTAuthentication])
+        return view(APIRequestFactory().get('/api/tasks/', HTTP_AUTHORIZATION=f'Bearer {token}'))
+
+    def test_principal_is_built_from_claims(self):
+        self.authenticate(self.token)  # warm the token version cache
+        with self.assertNumQueries(0):
+            user, _ = self.authenticate(self.token)
+            self.assertEqual(user.pk, self.user.pk)
+            self.assertEqual(user.email, 's@example.com')
+            self.assertEqual(get_role_names(user), frozenset({Role.READ_ONLY}))
+
+    def test_read_only_request_skips_user_and_role_queries(self):
+        self.list_tasks(self.token)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.list_tasks(self.token)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([q['sql'] for q in ctx.captured_queries if 'FROM "accounts_' in q['sql']], [])
+
+    def test_full_user_is_loaded_on_demand(self):
+        user, _ = self.authenticate(self.token)
+        with self.assertNumQueries(1):
+            load_full_user(user)
+            self.assertEqual(user.first_name, 'Sam')
+            self.assertEqual(user.username, 's@example.com')
+
+    def test_role_change_revokes_token(self):
+        self.user.roles.add(self.admin_role)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(self.token)
+        self.assertEqual(self.list_tasks(self.token).status_code, 401)
+
+    def test_password_change_and_deactivation_revoke_token(self):
+        self.user.set_password('changed')
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(self.token)
+
+        token = str(CustomTokenObtainPairSerializer.get_token(self.user).access_token)
+        self.authenticate(token)
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+
+    def test_version_cached_before_commit_is_dropped(self):
+        self.authenticate(self.token)
+        key = TOKEN_VERSION_CACHE_KEY.format(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.roles.add(self.admin_role)
+            # A concurrent request re-caches the version it read before the commit.
+            cache.set(key, self.user.token_version)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(self.token)
+
+    @override_settings(TOKEN_VERSION_CACHE_TIMEOUT=0)
+    def test_cached_version_expires(self):
+        self.authenticate(self.token)
+        with self.assertNumQueries(1):
+            self.authenticate(self.token)
+
+    def test_deleted_user_token_is_rejected(self):
+        self.authenticate(self.token)
+        self.user.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(self.token)
+
+    def test_tokens_without_claims_fall_back_to_database(self):
+        token = str(RefreshToken.for_user(self.user).access_token)
+        user, _ = self.authenticate(token)
+        self.assertEqual(user.get_deferred_fields(), set())
+        self.assertEqual(user.first_name, 'Sam')
+
+
+class UserEagerLoadingTests(APITestCase):
+    def test_user_list_query_count_is_constant(self):
+        client = self.client_for(self.admin)
+        small, response = self.count_queries(client, '/api/users/')
+        self.assertEqual(len(response.json()['results']), 1)
+
+        for i in range(5):
+            self.create_user(f'u{i}@example.com', self.read_only_role, self.creator_role)
+        large, response = self.count_queries(client, '/api/users/')
+        self.assertEqual(len(response.json()['results']), 6)
+        self.assertEqual(small, large)
+
+    def test_user_list_sparse_fields(self):
+        response = self.client_for(self.admin).get('/api/users/?fields=id,email,roles')
+        self.assertEqual(response.json()['results'], [{'id': self.admin.id, 'email': 'admin@example.com', 'roles': [self.admin_role.id]}])
+
+
+class UserRoleIdsValidationTests(APITestCase):
+    def test_role_ids_are_validated_with_one_query(self):
+        serializer = UserSerializer(data={
+            'email': 'new@example.com', 'first_name': 'N', 'last_name': 'U', 'password': 'x',
+            'role_ids': [self.admin_role.id, self.creator_role.id, self.read_only_role.id],
+        })
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(len(role_queries(ctx.captured_queries)), 1)
+        self.assertEqual(serializer.validated_data['roles'], [self.admin_role, self.creator_role, self.read_only_role])
+
+    def test_missing_role_ids_are_reported(self):
+        serializer = UserSerializer(data={
+            'email': 'new@example.com', 'first_name': 'N', 'last_name': 'U', 'password': 'x',
+            'role_ids': [self.admin_role.id, 9998, 9999],
+        })
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors['role_ids'], ['Invalid pks [9998, 9999] - objects do not exist.'])
+
+
+@override_settings(RESPONSE_CACHE=True)
+class UserResponseCacheTests(APITestCase):
+    def test_role_assignment_invalidates_cached_users(self):
+        client = self.client_for(self.admin)
+        client.get('/api/users/')
+        with CaptureQueriesContext(connection) as ctx:
+            client.get('/api/users/')
+        self.assertFalse([query for query in ctx.captured_queries if '"accounts_user_roles"."user_id" IN' in query['sql']])
+
+        self.admin.roles.add(self.read_only_role)
+        roles = client.get('/api/users/').json()['results'][0]['roles']
+        self.assertEqual({role['name'] for role in roles}, {Role.ADMIN, Role.READ_ONLY})
+
+        client.get('/api/roles/')
+        self.read_only_role.name = 'reader'
+        self.read_only_role.save()
+        self.assertIn('reader', [role['name'] for role in client.get('/api/roles/').json()])
+
+    def test_hit_ratio_metrics(self):
+        client = self.client_for(self.admin)
+        for _ in range(4):
+            client.get('/api/roles/')
+        metrics = client.get('/api/metrics/response-cache/').json()
+        self.assertEqual(metrics['RoleViewSet'], {'hits': 3, 'misses': 1, 'hit_ratio': 0.75})
+        self.assertEqual(metrics['TaskViewSet']['hit_ratio'], None)
+
+        reader = self.create_user('reader@example.com', self.read_only_role)
+        self.assertEqual(self.client_for(reader).get('/api/metrics/response-cache/').status_code, 403)
+
+
+
+class UserAsyncReadTests(APITestCase):
+    def test_matches_the_sync_endpoints(self):
+        reader = self.create_user('reader@example.com', self.read_only_role)
+        client = self.client_for(reader)
+        for url in ('/users/', f'/users/{self.admin.pk}/', '/users/me/'):
+            with self.subTest(url=url):
+                response = client.get(f'/api/async{url}')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json(), client.get(f'/api{url}').json())
+        self.assertEqual(client.get('/api/async/users/me/').json()['email'], 'reader@example.com')
@@ -1,5 +1,6 @@
 from rest_framework import viewsets
 
+from accounts.authentication import load_full_user
 from accounts.permissions import IsAdmin, IsReadOnlyOrAdminOrTaskCreator
 from .models import User, Role
 from .serializers import UserSerializer, RoleSerializer
@@ -7,9 +8,15 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from drf_yasg.utils import swagger_auto_schema
+from task_tracker.async_views import AsyncMeViewSetMixin
+from task_tracker.eager_loading import EagerLoadingViewSetMixin
+from task_tracker.fast_serializers import FastReadViewSetMixin
+from task_tracker.pagination import UserPagination
+from task_tracker.response_cache import CachedResponseViewSetMixin
 
 @swagger_auto_schema(tags=["Tasks"])
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(AsyncMeViewSetMixin, CachedResponseViewSetMixin, FastReadViewSetMixin, EagerLoadingViewSetMixin,
+                  viewsets.ModelViewSet):
     """
     API endpoint for managing User objects.
 
@@ -22,6 +29,16 @@ class UserViewSet(viewsets.ModelViewSet):
             - TaskCreator
         - POST, PUT, PATCH, DELETE: Requires authentication and Admin role.
 
+    Query Parameters (GET):
+        - fields / expand: Sparse fieldsets and opt-in expansion of relations
+          (see SparseFieldsetsMixin). Relations not expanded are returned as IDs.
+        - cursor / page_size: Keyset pagination (see KeysetPagination). At most
+          200 rows per page; responses are `{"next", "previous", "results"}`.
+        - ordering: `id` (default) or `-id`.
+
+    List/retrieve responses are the same for every user and are shared through the
+    response cache until a user or role changes (see CachedResponseViewSetMixin).
+
     Endpoints:
         - GET /users/ : List all users.
         - POST /users/ : Create a new user.
@@ -30,6 +47,8 @@ class UserViewSet(viewsets.ModelViewSet):
         - PATCH /users/{id}/ : Partially update an existing user.
         - DELETE /users/{id}/ : Delete a user.
         - GET /users/me/ : Retrieve the profile of the current authenticated user.
+        - GET /async/users/, /async/users/{id}/, /async/users/me/ : The reads above served
+          through the async ORM under ASGI (see AsyncReadViewSetMixin).
 
     Custom Actions:
         - me (GET /users/me/): 
@@ -42,6 +61,11 @@ class UserViewSet(viewsets.ModelViewSet):
     
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    pagination_class = UserPagination
+    versioned_models = [User, Role]
+
+    def get_cache_scope(self, request):
+        return 'all'
 
     def get_permissions(self):
         """
@@ -59,10 +83,10 @@ class UserViewSet(viewsets.ModelViewSet):
         """
         Returns the currently authenticated user's details.
         """
-        serializer = self.get_serializer(request.user)
+        serializer = self.get_serializer(load_full_user(request.user))
         return Response(serializer.data)
 
-class RoleViewSet(viewsets.ModelViewSet):
+class RoleViewSet(CachedResponseViewSetMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing Role objects.
 
@@ -83,11 +107,18 @@ class RoleViewSet(viewsets.ModelViewSet):
         - PATCH /roles/{id}/ : Partially update an existing role.
         - DELETE /roles/{id}/ : Delete a role.
 
+    List/retrieve responses are shared through the response cache until a role
+    changes (see CachedResponseViewSetMixin).
+
     Methods:
         - get_permissions: Dynamically assigns permissions based on request method.
     """
     queryset = Role.objects.all()
     serializer_class = RoleSerializer
+    versioned_models = [Role]
+
+    def get_cache_scope(self, request):
+        return 'all'
 
     def get_permissions(self):
         """
@@ -0,0 +1,150 @@
+"""
+Throughput and latency of the task list served by one sync WSGI worker
+(`GET /api/tasks/`, as gunicorn's sync workers run it) against one ASGI
+worker serving the async variant (`GET /api/async/tasks/`, see
+AsyncReadViewSetMixin) at the same number of concurrent clients.
+
+The WSGI worker handles one request at a time, so concurrent clients queue
+behind each other; the ASGI worker interleaves them while their queries run.
+Every query optionally sleeps for DB_LATENCY_MS (default 10) to stand in for a
+MySQL round trip, which is what an async worker overlaps; SQLite alone answers
+in microseconds and mostly measures CPU.
+
+Run with:
+    python manage.py test benchmarks --pattern="bench_async.py"
+"""
+import asyncio
+import datetime
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory, TransactionTestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import Role, User
+from projects.models import Project
+from tasks.models import Task
+from task_tracker.asgi import application as asgi_application
+from task_tracker.wsgi import application as wsgi_application
+
+DB_LATENCY = int(os.getenv('DB_LATENCY_MS', 10)) / 1000
+CONCURRENCY = [1, 8, 32]
+REQUESTS = 160
+TASKS = 500
+URL = '/tasks/?page_size=50'
+
+
+def simulate_latency(sender, connection, **kwargs):
+    connection.execute_wrappers.append(sleep_before_query)
+
+
+def sleep_before_query(execute, sql, params, many, context):
+    time.sleep(DB_LATENCY)
+    return execute(sql, params, many, context)
+
+
+class AsyncDeploymentBenchmark(TransactionTestCase):
+    def setUp(self):
+        role = Role.objects.create(name=Role.READ_ONLY)
+        user = User.objects.create(username='reader@example.com', email='reader@example.com',
+                                   first_name='F', last_name='L')
+        user.roles.add(role)
+        project = Project.objects.create(name='Project', description='Benchmark project', owner=user,
+                                         start_date=datetime.date(2025, 1, 1), end_date=datetime.date(2025, 12, 31))
+        Task.objects.bulk_create(
+            Task(description=f'Task {i}', status='new', project=project, owner=user, creator=user,
+                 due_date=datetime.date(2025, 1, 1) + datetime.timedelta(days=i % 365))
+            for i in range(TASKS)
+        )
+        self.token = str(RefreshToken.for_user(user).access_token)
+
+    def run_wsgi(self, concurrency):
+        # One sync worker: requests are served one at a time.
+        worker = threading.Lock()
+        factory = RequestFactory()
+
+        def request():
+            environ = factory.get(f'/api{URL}', HTTP_AUTHORIZATION=f'Bearer {self.token}').environ
+            start = time.perf_counter()
+            with worker:
+                statuses = []
+                body = b''.join(wsgi_application(environ, lambda status, headers: statuses.append(status)))
+            elapsed = time.perf_counter() - start
+            assert statuses == ['200 OK'] and body, statuses
+            return elapsed
+
+        with ThreadPoolExecutor(concurrency) as clients:
+            start = time.perf_counter()
+            latencies = list(clients.map(lambda _: request(), range(REQUESTS)))
+        return time.perf_counter() - start, latencies
+
+    def run_asgi(self, concurrency):
+        async def request():
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+                'scheme': 'http', 'path': f'/api/async{URL.split("?")[0]}', 'raw_path': b'',
+                'query_string': URL.split('?')[1].encode(), 'root_path': '',
+                'headers': [(b'host', b'testserver'), (b'authorization', f'Bearer {self.token}'.encode())],
+                'client': ('127.0.0.1', 50000), 'server': ('testserver', 80),
+            }
+            messages = []
+            body_sent = False
+
+            async def receive():
+                nonlocal body_sent
+                if body_sent:
+                    # The client stays connected until the response is sent.
+                    await asyncio.Future()
+                body_sent = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+            async def send(message):
+                messages.append(message)
+
+            start = time.perf_counter()
+            await asgi_application(scope, receive, send)
+            elapsed = time.perf_counter() - start
+            assert messages[0]['status'] == 200, messages[0]
+            return elapsed
+
+        async def client(count, latencies):
+            for _ in range(count):
+                latencies.append(await request())
+
+        async def main():
+            latencies = []
+            start = time.perf_counter()
+            await asyncio.gather(*(
+                client(REQUESTS // concurrency, latencies) for _ in range(concurrency)
+            ))
+            return time.perf_counter() - start, latencies
+
+        return asyncio.run(main())
+
+    def report(self, label, concurrency, result):
+        elapsed, latencies = result
+        latencies = sorted(latencies)
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        throughput = len(latencies) / elapsed
+        print(f"  {label:<5} c={concurrency:<3} {throughput:>7.1f} req/s   p50 {statistics.median(latencies) * 1000:>7.1f} ms"
+              f"   p99 {p99 * 1000:>7.1f} ms")
+        return throughput
+
+    def test_throughput(self):
+        for latency in (0, DB_LATENCY):
+            if latency:
+                connection_created.connect(simulate_latency)
+            print(f"\nOne worker, {REQUESTS} task list requests, {latency * 1000:.0f} ms per query:")
+            try:
+                for concurrency in CONCURRENCY:
+                    wsgi = self.report('WSGI', concurrency, self.run_wsgi(concurrency))
+                    asgi = self.report('ASGI', concurrency, self.run_asgi(concurrency))
+                    if latency and concurrency > 1:
+                        # Queries of concurrent requests overlap under ASGI only.
+                        self.assertGreater(asgi, wsgi)
+            finally:
+                connection_created.disconnect(simulate_latency)
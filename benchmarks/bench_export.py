@@ -0,0 +1,80 @@
+"""
+Peak Python memory of the streaming task export at growing export sizes.
+
+Each export is consumed chunk by chunk, as the WSGI server would, while
+tracemalloc records the peak allocation. With keyset chunks the peak is bounded
+by the chunk size, so it stays flat as the number of exported rows grows.
+
+Run with:
+    python manage.py test benchmarks --pattern="bench_export.py"
+"""
+import datetime
+import time
+import tracemalloc
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import Role, User
+from projects.models import Project
+from tasks.models import Task
+
+SIZES = [2_000, 10_000, 40_000]
+USERS = 50
+
+
+class ExportMemoryBenchmark(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_role = Role.objects.create(name=Role.ADMIN)
+        cls.users = User.objects.bulk_create(
+            User(username=f'user{i}@example.com', email=f'user{i}@example.com', first_name='First', last_name='Last')
+            for i in range(USERS)
+        )
+        User.roles.through.objects.bulk_create(
+            User.roles.through(user=user, role=cls.admin_role) for user in cls.users
+        )
+        cls.projects = Project.objects.bulk_create(
+            Project(name=f'Project {size}', description='Benchmark project', start_date=datetime.date(2025, 1, 1),
+                    end_date=datetime.date(2025, 12, 31), owner=cls.users[0])
+            for size in SIZES
+        )
+        for project, size in zip(cls.projects, SIZES):
+            Task.objects.bulk_create(
+                Task(description=f'Task {i} ' + 'x' * 100, status='new', project=project,
+                     due_date=datetime.date(2025, 1, 1) + datetime.timedelta(days=i % 365),
+                     owner=cls.users[i % USERS], creator=cls.users[(i + 1) % USERS])
+                for i in range(size)
+            )
+
+    def consume(self, url):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.users[0]).access_token}')
+        tracemalloc.start()
+        start = time.perf_counter()
+        response = client.get(url)
+        size = sum(len(chunk) for chunk in response.streaming_content)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return size, elapsed, peak
+
+    def measure(self, export_format):
+        print(f"\n{export_format} export:")
+        peaks = []
+        for project, rows in zip(self.projects, SIZES):
+            size, elapsed, peak = self.consume(f'/api/projects/{project.pk}/tasks/export/?export_format={export_format}')
+            peaks.append(peak)
+            print(
+                f"  {rows:>7,} rows: {size / 2**20:>7.1f} MiB streamed in {elapsed:.2f}s,"
+                f" peak memory {peak / 2**20:.1f} MiB"
+            )
+        # 20x more rows must not mean (much) more memory.
+        self.assertLess(peaks[-1], peaks[0] * 1.5)
+
+    def test_ndjson(self):
+        self.measure('ndjson')
+
+    def test_csv(self):
+        self.measure('csv')
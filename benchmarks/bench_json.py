@@ -0,0 +1,94 @@
+"""
+Encoding and decoding time of 10k-task payloads with the orjson renderer and
+parser (task_tracker/renderers.py) against DRF's stdlib JSONRenderer and
+JSONParser. Both must produce the same bytes and values.
+
+Run with:
+    python manage.py test benchmarks --pattern="bench_json.py"
+"""
+import datetime
+import io
+import statistics
+import time
+
+from django.test import TestCase
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from accounts.models import Role, User
+from projects.models import Project
+from task_tracker import renderers
+from task_tracker.fast_serializers import compile_serializer
+from task_tracker.renderers import FastJSONParser, FastJSONRenderer
+from tasks.models import Task
+from tasks.serializers import TaskSerializer
+
+TASKS = 10_000
+PROJECTS = 100
+USERS = 50
+ROUNDS = 5
+
+
+def best_of(func):
+    times = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return result, min(times), statistics.median(times)
+
+
+class JSONBenchmark(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        role = Role.objects.create(name=Role.READ_ONLY)
+        users = User.objects.bulk_create(
+            User(username=f'user{i}@example.com', email=f'user{i}@example.com', first_name='First', last_name='Last')
+            for i in range(USERS)
+        )
+        User.roles.through.objects.bulk_create(User.roles.through(user=user, role=role) for user in users)
+        projects = Project.objects.bulk_create(
+            Project(name=f'Project {i}', description='Benchmark project', start_date=datetime.date(2025, 1, 1),
+                    end_date=datetime.date(2025, 12, 31), owner=users[i % USERS])
+            for i in range(PROJECTS)
+        )
+        Task.objects.bulk_create(
+            Task(description=f'Task {i}: write the quarterly report', status='new', project=projects[i % PROJECTS],
+                 due_date=datetime.date(2025, 1, 1) + datetime.timedelta(days=i % 365),
+                 owner=users[i % USERS], creator=users[(i + 1) % USERS])
+            for i in range(TASKS)
+        )
+
+    def report(self, label, stock, fast, size):
+        print(
+            f"\n{label} ({size / 2**20:.1f} MiB)"
+            f"\n  stdlib : {stock[1] * 1000:>7.1f} ms (median {stock[2] * 1000:.1f} ms)"
+            f"\n  orjson : {fast[1] * 1000:>7.1f} ms (median {fast[2] * 1000:.1f} ms)"
+            f"\n  speedup: {stock[1] / fast[1]:.1f}x"
+        )
+
+    def test_render_task_list(self):
+        # The page a list request renders, with nested projects and users.
+        data = {'next': None, 'previous': None,
+                'results': compile_serializer(TaskSerializer()).serialize(Task.objects.order_by('id'))}
+        self.assertIsNotNone(renderers._orjson_dumps(data), 'the payload fell back to the stdlib encoder')
+
+        stock = best_of(lambda: JSONRenderer().render(data))
+        fast = best_of(lambda: FastJSONRenderer().render(data))
+        self.assertEqual(fast[0], stock[0])
+        self.report(f"Render {TASKS:,} tasks", stock, fast, len(stock[0]))
+        self.assertLess(fast[1], stock[1])
+
+    def test_parse_bulk_body(self):
+        # A bulk request body of as many task creates (POST /api/tasks/bulk/).
+        body = JSONRenderer().render({'create': [
+            {'description': f'Task {i}: write the quarterly report', 'status': 'new', 'project_id': i % PROJECTS + 1,
+             'owner_id': i % USERS + 1, 'due_date': '2025-06-01'}
+            for i in range(TASKS)
+        ]})
+
+        stock = best_of(lambda: JSONParser().parse(io.BytesIO(body)))
+        fast = best_of(lambda: FastJSONParser().parse(io.BytesIO(body)))
+        self.assertEqual(fast[0], stock[0])
+        self.report(f"Parse {TASKS:,} task creates", stock, fast, len(body))
+        self.assertLess(fast[1], stock[1])
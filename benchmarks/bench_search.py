@@ -0,0 +1,70 @@
+"""
+Latency of `?q=` task searches as the table grows, with the in-process
+inverted index used on SQLite (the MySQL backend is served by a FULLTEXT index).
+
+The number of matching rows is kept constant while filler rows are added, so a
+search that scanned the table would slow down with it; an index lookup does not.
+
+Run with:
+    python manage.py test benchmarks --pattern="bench_search.py"
+"""
+import datetime
+import statistics
+import time
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from accounts.models import Role, User
+from projects.models import Project
+from task_tracker import search
+from tasks.models import Task
+
+SIZES = [10_000, 50_000, 200_000]
+MATCHES = 200
+WORDS = ['deploy', 'review', 'design', 'refactor', 'migrate', 'document', 'triage', 'release']
+
+
+class SearchBenchmark(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cache.clear()
+        role = Role.objects.create(name=Role.ADMIN)
+        cls.user = User.objects.create(username='admin@example.com', email='admin@example.com')
+        cls.user.roles.add(role)
+        cls.project = Project.objects.create(
+            name='Benchmark', description='Benchmark project', start_date=datetime.date(2025, 1, 1),
+            end_date=datetime.date(2025, 12, 31), owner=cls.user,
+        )
+        cls.add_tasks(0, MATCHES, 'Investigate flaky checkout latency {i}')
+
+    @classmethod
+    def add_tasks(cls, start, stop, template):
+        Task.objects.bulk_create(
+            Task(description=template.format(i=i, word=WORDS[i % len(WORDS)]), status='new', project=cls.project,
+                 due_date=datetime.date(2025, 1, 1), owner=cls.user, creator=cls.user)
+            for i in range(start, stop)
+        )
+        search.invalidate(Task)
+
+    def time_search(self):
+        queryset = Task.objects.visible_to(self.user)
+        search.get_search_backend().search(queryset, 'warm up')  # build the index outside the timings
+        timings = []
+        for _ in range(20):
+            start = time.perf_counter()
+            rows = list(
+                search.get_search_backend().search(queryset, 'checkout latency')
+                .order_by('-relevance', '-id').values_list('id', flat=True)[:50]
+            )
+            timings.append(time.perf_counter() - start)
+        self.assertEqual(len(rows), 50)
+        return statistics.median(timings)
+
+    def test_search_latency(self):
+        print()
+        total = MATCHES
+        for size in SIZES:
+            self.add_tasks(total, size, 'Routine {word} task {i}')
+            total = size
+            print(f"  {size:>8,} tasks: median search {self.time_search() * 1000:.2f} ms")
@@ -0,0 +1,77 @@
+"""
+Rows/sec of the compiled row mappers against the stock DRF serializers.
+
+Run with:
+    python manage.py test benchmarks --pattern="bench_serializers.py"
+"""
+import datetime
+import time
+
+from django.test import TestCase
+
+from accounts.models import Role, User
+from projects.models import Project
+from projects.serializers import ProjectSerializer
+from task_tracker.eager_loading import apply_eager_loading
+from task_tracker.fast_serializers import compile_serializer
+from tasks.models import Task
+from tasks.serializers import TaskSerializer
+
+TASKS = 10_000
+PROJECTS = 100
+USERS = 50
+
+
+def measure(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+class SerializerBenchmark(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        roles = [Role.objects.create(name=name) for name in (Role.ADMIN, Role.TASK_CREATOR, Role.READ_ONLY)]
+        users = User.objects.bulk_create(
+            User(username=f'user{i}@example.com', email=f'user{i}@example.com', first_name='First', last_name='Last')
+            for i in range(USERS)
+        )
+        User.roles.through.objects.bulk_create(
+            User.roles.through(user=user, role=roles[i % len(roles)]) for i, user in enumerate(users)
+        )
+        projects = Project.objects.bulk_create(
+            Project(name=f'Project {i}', description='Benchmark project', start_date=datetime.date(2025, 1, 1),
+                    end_date=datetime.date(2025, 12, 31), owner=users[i % USERS])
+            for i in range(PROJECTS)
+        )
+        Project.users.through.objects.bulk_create(
+            Project.users.through(project=project, user=users[(i + j) % USERS])
+            for i, project in enumerate(projects) for j in range(5)
+        )
+        Task.objects.bulk_create(
+            Task(description=f'Task {i}', due_date=datetime.date(2025, 1, 1) + datetime.timedelta(days=i % 365),
+                 status='new', project=projects[i % PROJECTS], owner=users[i % USERS], creator=users[(i + 1) % USERS])
+            for i in range(TASKS)
+        )
+
+    def compare(self, label, serializer_class, queryset):
+        serializer = serializer_class()
+        stock, stock_time = measure(
+            lambda: serializer_class(apply_eager_loading(queryset, serializer), many=True).data
+        )
+        fast, fast_time = measure(lambda: compile_serializer(serializer).serialize(queryset))
+        self.assertEqual(fast, stock)
+
+        rows = len(fast)
+        print(
+            f"\n{label}: {rows} rows"
+            f"\n  stock serializer : {rows / stock_time:>10,.0f} rows/sec ({stock_time:.2f}s)"
+            f"\n  compiled mapper  : {rows / fast_time:>10,.0f} rows/sec ({fast_time:.2f}s)"
+            f"\n  speedup          : {stock_time / fast_time:.1f}x"
+        )
+
+    def test_task_list(self):
+        self.compare("TaskSerializer", TaskSerializer, Task.objects.order_by('id'))
+
+    def test_project_list(self):
+        self.compare("ProjectSerializer", ProjectSerializer, Project.objects.order_by('id'))
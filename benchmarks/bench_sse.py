@@ -0,0 +1,130 @@
+"""
+Memory per idle Server-Sent Events connection, and fan-out latency of one
+event to every connection, through the ASGI application.
+
+Each connection is a full request to /api/events/ driven through
+`task_tracker.asgi.application` in one event loop, as one ASGI worker would
+serve them: authentication, the middleware stack and a streaming response
+that stays open. tracemalloc measures the Python memory held by the idle
+connections; an event is then published and timed until every connection has
+received it.
+
+Run with:
+    python manage.py test benchmarks --pattern="bench_sse.py"
+"""
+import asyncio
+import gc
+import time
+import tracemalloc
+
+from asgiref.sync import sync_to_async
+from django.core import signals
+from django.db import close_old_connections
+from django.test import TestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import Role, User
+from task_tracker import events
+from task_tracker.asgi import application
+
+CONNECTIONS = [1_000, 2_500, 5_000]
+USERS = 100
+
+
+class Connection:
+    """One open request to /api/events/ made through the ASGI application."""
+
+    def __init__(self, token):
+        self.token = token
+        self.chunks = []
+        self.received = asyncio.Event()
+        self.disconnected = asyncio.Event()
+        self.request_sent = False
+
+    def start(self):
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+            'path': '/api/events/', 'raw_path': b'/api/events/', 'query_string': b'', 'root_path': '',
+            'headers': [(b'host', b'testserver'), (b'authorization', f'Bearer {self.token}'.encode())],
+            'client': ('127.0.0.1', 50000), 'server': ('testserver', 80),
+        }
+        self.task = asyncio.create_task(application(scope, self.receive, self.send))
+
+    async def receive(self):
+        if not self.request_sent:
+            self.request_sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await self.disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message):
+        if message['type'] == 'http.response.body' and message.get('body'):
+            self.chunks.append(message['body'])
+            self.received.set()
+
+    async def next_chunk(self):
+        await self.received.wait()
+        self.received.clear()
+        return self.chunks[-1]
+
+
+class EventStreamBenchmark(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        role = Role.objects.create(name=Role.READ_ONLY)
+        cls.users = User.objects.bulk_create(
+            User(username=f'user{i}@example.com', email=f'user{i}@example.com', first_name='F', last_name='L')
+            for i in range(USERS)
+        )
+        User.roles.through.objects.bulk_create(User.roles.through(user=user, role=role) for user in cls.users)
+        cls.tokens = [str(RefreshToken.for_user(user).access_token) for user in cls.users]
+
+    def setUp(self):
+        # As the test client does: keep the test transaction's connection open.
+        signals.request_started.disconnect(close_old_connections)
+        signals.request_finished.disconnect(close_old_connections)
+
+    def tearDown(self):
+        signals.request_started.connect(close_old_connections)
+        signals.request_finished.connect(close_old_connections)
+
+    async def measure(self, count):
+        gc.collect()
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+
+        start = time.perf_counter()
+        connections = [Connection(self.tokens[i % USERS]) for i in range(count)]
+        for connection in connections:
+            connection.start()
+        for connection in connections:
+            self.assertTrue((await connection.next_chunk()).startswith(b'retry:'))
+        connect_time = time.perf_counter() - start
+        gc.collect()
+        held = tracemalloc.get_traced_memory()[0] - baseline
+        tracemalloc.stop()
+
+        # One event visible to every user.
+        event = {'type': 'task', 'action': 'updated', 'id': 1,
+                 'audience': events.event_audience(any=[user.pk for user in self.users])}
+        start = time.perf_counter()
+        await sync_to_async(events.get_broker().publish)([event])
+        for connection in connections:
+            self.assertTrue((await connection.next_chunk()).startswith(b'event: task'))
+        fan_out = time.perf_counter() - start
+
+        for connection in connections:
+            connection.disconnected.set()
+        await asyncio.gather(*(connection.task for connection in connections))
+        print(
+            f"  {count:>6,} connections: opened in {connect_time:.2f}s, {held / 2**20:>6.1f} MiB held"
+            f" ({held / count / 1024:.1f} KiB each), event delivered to all in {fan_out * 1000:.0f} ms"
+        )
+        return held / count
+
+    async def test_idle_connections(self):
+        print("\nIdle SSE connections in one ASGI worker:")
+        per_connection = [await self.measure(count) for count in CONNECTIONS]
+        # Memory grows linearly: no per-connection buffers beyond the queue.
+        self.assertLess(per_connection[-1], per_connection[0] * 1.5)
+        self.assertEqual(len(events.get_broker().subscriptions), 0)
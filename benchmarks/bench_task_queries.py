@@ -0,0 +1,78 @@
+"""
+Query plans and latency of the task list's visibility rules and filters at
+scale (1M tasks by default, set BENCH_TASKS to change it).
+
+For each query the EXPLAIN plan is printed along with the time to fetch one
+keyset page; none of them may fall back to a full table scan.
+
+Run with:
+    python manage.py test benchmarks --pattern="bench_task_queries.py"
+"""
+import datetime
+import os
+import re
+import time
+
+from django.db import connection
+from django.test import TestCase
+
+from accounts.models import Role, User
+from projects.models import Project
+from tasks.models import Task
+
+TASKS = int(os.getenv('BENCH_TASKS', 1_000_000))
+USERS = 1_000
+PROJECTS = 500
+BATCH = 20_000
+STATUSES = ['new', 'in_progress', 'blocked', 'completed', 'not_started']
+FULL_SCAN = re.compile(r'SCAN (tasks_task|U0)\b(?! USING)')
+
+
+class TaskQueryBenchmark(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        read_only, creator = Role.objects.create(name=Role.READ_ONLY), Role.objects.create(name=Role.TASK_CREATOR)
+        cls.users = User.objects.bulk_create(
+            User(username=f'user{i}@example.com', email=f'user{i}@example.com') for i in range(USERS)
+        )
+        User.roles.through.objects.bulk_create(
+            [User.roles.through(user=user, role=read_only) for user in cls.users]
+            + [User.roles.through(user=cls.users[0], role=creator)]
+        )
+        projects = Project.objects.bulk_create(
+            Project(name=f'Project {i}', description='Benchmark project', start_date=datetime.date(2025, 1, 1),
+                    end_date=datetime.date(2025, 12, 31), owner=cls.users[i % USERS])
+            for i in range(PROJECTS)
+        )
+        cls.project = projects[0]
+        for start in range(0, TASKS, BATCH):
+            Task.objects.bulk_create(
+                Task(description=f'Task {i}', status=STATUSES[(i // 7) % 5], project=projects[i % PROJECTS],
+                     due_date=datetime.date(2025, 1, 1) + datetime.timedelta(days=i % 365),
+                     owner=cls.users[i % USERS], creator=cls.users[(i * 7) % USERS])
+                for i in range(start, min(start + BATCH, TASKS))
+            )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def check(self, label, queryset):
+        plan = queryset.explain()
+        start = time.perf_counter()
+        rows = len(list(queryset.values_list('id', flat=True)[:50]))
+        elapsed = time.perf_counter() - start
+        print(f"\n{label}: {rows} rows in {elapsed * 1000:.1f} ms\n  " + plan.replace('\n', '\n  '))
+        self.assertIsNone(FULL_SCAN.search(plan), plan)
+
+    def test_task_queries(self):
+        member, other = self.users[0], self.users[1]
+        print(f"\n{TASKS:,} tasks")
+        self.check('read-only + task creator visibility (owner OR creator)',
+                   Task.objects.visible_to(member).order_by('due_date', 'id'))
+        self.check('read-only visibility, status filter',
+                   Task.objects.visible_to(other).filter(status='new').order_by('due_date', 'id'))
+        self.check('creator, due date range',
+                   Task.objects.filter(creator=member, due_date__gte='2025-06-01').order_by('due_date', 'id'))
+        self.check('project + status',
+                   Task.objects.filter(project=self.project, status='blocked').order_by('id'))
+        self.check('admin, keyset page on (due_date, id)',
+                   Task.objects.filter(due_date__gt='2025-06-01').order_by('due_date', 'id'))
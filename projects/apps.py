@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class ProjectsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'projects'
+
+    def ready(self):
+        from task_tracker import search, versions
+        from . import signals  # noqa: F401
+        from .models import Project
+
+        search.register(Project, ['name', 'description'])
+        versions.track(Project, 'users')
@@ -0,0 +1,24 @@
+from django.db import migrations
+
+
+def create_fulltext_index(apps, schema_editor):
+    # FULLTEXT indexes back MySQLFullTextBackend; other databases search with
+    # the in-process inverted index instead.
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute('CREATE FULLTEXT INDEX project_name_description_ft ON projects_project (name, description)')
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute('DROP INDEX project_name_description_ft ON projects_project')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_project_users'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
@@ -1,5 +1,18 @@
 from django.db import models
-from accounts.models import User
+from accounts.models import Role, User
+from accounts.roles import get_role_names
+
+
+class ProjectQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """
+        Projects the user may read: every project for admins, otherwise the
+        projects the user is assigned to.
+        """
+        if Role.ADMIN in get_role_names(user):
+            return self.all()
+        return self.filter(users=user)
+
 
 class Project(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -8,6 +21,9 @@ class Project(models.Model):
     end_date = models.DateField()
     owner = models.ForeignKey(User, on_delete=models.CASCADE)
     users = models.ManyToManyField(User, related_name='projects')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ProjectQuerySet.as_manager()
 
     def __str__(self):
         return self.name  
@@ -1,16 +1,76 @@
+from django.db.models import Count, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
 from rest_framework import serializers
 from .models import Project
 from accounts.serializers import UserSerializer
 from accounts.models import User
+from tasks.models import STATUS_CHOICES
+from task_tracker.eager_loading import EagerLoadingMixin
+from task_tracker.relations import BulkPrimaryKeyRelatedField, BulkRelatedLookupMixin
+from task_tracker.sparse_fieldsets import SparseFieldsetsMixin
+from task_tracker.timing import TimedListSerializer, TimedSerializerMixin
 
-class ProjectSerializer(serializers.ModelSerializer):
+
+def status_count_annotation(status):
+    return f"{status}_count"
+
+
+def load_annotations(project):
+    """
+    Sets the values of ProjectSerializer.Meta.annotations on a project that
+    was not read through the annotated queryset (the instance of a create or
+    update, or the project of a task being written), with one query.
+    """
+    annotations = ProjectSerializer.Meta.annotations
+    values = Project.objects.filter(pk=project.pk).annotate(**annotations).values(*annotations).get()
+    for name, value in values.items():
+        setattr(project, name, value)
+
+
+class AnnotatedCountField(serializers.IntegerField):
+    """
+    Read-only count taken from a ProjectSerializer.Meta.annotations value,
+    loaded by load_annotations() when the project does not carry it.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(read_only=True, **kwargs)
+
+    def get_attribute(self, instance):
+        if not hasattr(instance, self.source):
+            load_annotations(instance)
+        return super().get_attribute(instance)
+
+
+class ProjectStatusCountsSerializer(serializers.Serializer):
+    """
+    Per-status task counts of a project, read from the `<status>_count`
+    annotations added by ProjectSerializer.Meta.annotations.
+
+    Example:
+    {"new": 4, "in_progress": 2, "blocked": 0, "completed": 9, "not_started": 1}
+    """
+    def get_fields(self):
+        return {
+            status: AnnotatedCountField(source=status_count_annotation(status))
+            for status, _ in STATUS_CHOICES
+        }
+
+
+class ProjectSerializer(TimedSerializerMixin, BulkRelatedLookupMixin, SparseFieldsetsMixin, EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializer for the Project model.
 
     Handles serialization and deserialization of Project instances, including:
-    - Assigning multiple users to a project (users/user_ids).
+    - Assigning multiple users to a project (user_ids).
     - Assigning an owner to a project (owner/owner_id).
-    - Returning associated tasks via task_set.
+    - Returning member and task counts computed with annotated aggregates
+      (read with one extra query when the instance is not annotated, e.g. in
+      create and update responses).
+
+    The payload has a constant size per project. Members and tasks are served
+    by the paginated sub-resources `/projects/{id}/members/` and
+    `/projects/{id}/tasks/`.
 
     Fields:
         - id (read-only): Project ID.
@@ -20,9 +80,11 @@ class ProjectSerializer(serializers.ModelSerializer):
         - end_date: Project end date.
         - owner (read-only): Project owner as nested User object.
         - owner_id (write-only): Assigns owner by User ID.
-        - users (read-only): List of assigned users as nested User objects.
-        - user_ids (write-only): Assigns users by list of User IDs.
-        - task_set (read-only): List of Task IDs associated with this project.
+        - user_ids (write-only): Assigns users by list of User IDs (validated with one query).
+        - member_count (read-only): Number of assigned users.
+        - task_count (read-only): Number of tasks in the project.
+        - status_counts (read-only): Number of tasks per status.
+        - updated_at (read-only): Time of the last change to the project itself.
 
     Example request (create/update):
     {
@@ -47,35 +109,51 @@ class ProjectSerializer(serializers.ModelSerializer):
             "email": "john@example.com",
             ...
         },
-        "users": [
-            {
-                "id": 2,
-                "username": "jane.doe",
-                "email": "jane@example.com"
-            },
-            {
-                "id": 3,
-                "username": "bob.smith",
-                "email": "bob@example.com"
-            }
-        ],
-        "task_set": [100, 101, 102]
+        "member_count": 3,
+        "task_count": 3,
+        "status_counts": {
+            "new": 1,
+            "in_progress": 2,
+            "blocked": 0,
+            "completed": 0,
+            "not_started": 0
+        },
+        "updated_at": "2024-06-10T09:30:00.123456Z"
     }
     """
-    users = UserSerializer(many=True, read_only=True)
-    user_ids = serializers.PrimaryKeyRelatedField(
+    user_ids = BulkPrimaryKeyRelatedField(
         queryset=User.objects.all(), many=True, write_only=True, source='users'
     )
     owner = UserSerializer(read_only=True)
-    owner_id = serializers.PrimaryKeyRelatedField(
+    owner_id = BulkPrimaryKeyRelatedField(
         queryset=User.objects.all(), write_only=True, source='owner'
     )
 
-    task_set = serializers.PrimaryKeyRelatedField(
-        many=True,
-        read_only=True
-    )
+    member_count = AnnotatedCountField()
+    task_count = AnnotatedCountField()
+    status_counts = ProjectStatusCountsSerializer(source='*', read_only=True)
 
     class Meta:
         model = Project
-        fields = ['id', 'name', 'description', 'start_date', 'end_date', 'owner', 'owner_id', 'users', 'user_ids', 'task_set']
+        list_serializer_class = TimedListSerializer
+        fields = [
+            'id', 'name', 'description', 'start_date', 'end_date', 'owner', 'owner_id', 'user_ids',
+            'member_count', 'task_count', 'status_counts', 'updated_at',
+        ]
+        select_related = ['owner']
+        # Counted with one join on tasks; members are counted in a subquery so the
+        # two joins do not multiply each other.
+        annotations = {
+            'member_count': Coalesce(Subquery(
+                Project.users.through.objects
+                .filter(project=OuterRef('pk'))
+                .values('project')
+                .annotate(count=Count('*'))
+                .values('count')
+            ), Value(0)),
+            'task_count': Count('task'),
+            **{
+                status_count_annotation(status): Count('task', filter=Q(task__status=status))
+                for status, _ in STATUS_CHOICES
+            },
+        }
@@ -0,0 +1,58 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from task_tracker import events
+from .models import Project
+
+
+def project_event(action, pk, members):
+    """
+    Returns the change event (see task_tracker.events.publish) of a project,
+    visible to `members` as in ProjectQuerySet.visible_to().
+    """
+    return {"type": "project", "action": action, "id": pk, "audience": events.event_audience(any=members)}
+
+
+def member_ids(project):
+    return list(project.users.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Project)
+def publish_saved_project(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    # A new project has no members yet; they are added afterwards.
+    members = [] if created else member_ids(instance)
+    events.publish([project_event("created" if created else "updated", instance.pk, members)])
+
+
+@receiver(pre_delete, sender=Project)
+def remember_deleted_members(sender, instance, **kwargs):
+    # The membership rows are deleted before the project.
+    instance._deleted_members = member_ids(instance)
+
+
+@receiver(post_delete, sender=Project)
+def publish_deleted_project(sender, instance, **kwargs):
+    events.publish([project_event("deleted", instance.pk, instance.__dict__.pop("_deleted_members", []))])
+
+
+@receiver(m2m_changed, sender=Project.users.through)
+def publish_member_changes(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Sends an `updated` event to the members before and after the change, so
+    removed members learn that they lost the project. From the user side
+    (`user.projects.add(...)`), `instance` is the user and `pk_set` projects.
+    """
+    if action == "pre_clear":
+        instance._cleared = list(
+            instance.projects.values_list("pk", flat=True) if reverse else member_ids(instance)
+        )
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    changed = pk_set if pk_set is not None else instance.__dict__.pop("_cleared", [])
+    if reverse:
+        events.publish(project_event("updated", pk, [instance.pk]) for pk in changed)
+    else:
+        events.publish([project_event("updated", instance.pk, set(member_ids(instance)) | set(changed))])
@@ -1,3 +1,335 @@
-from django.test import TestCase
+import json
+from unittest.mock import patch
 
-# Create your tests here.
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import User
+from .models import Project
+from .serializers import ProjectSerializer
+from task_tracker.pagination import UserPagination
+from task_tracker.testing import APITestCase
+
+
+class ProjectEagerLoadingTests(APITestCase):
+    def populate(self, rows):
+        for _ in range(rows):
+            member = self.create_user(f'm{User.objects.count()}@example.com', self.read_only_role)
+            project = self.create_project(owner=member, members=[member, self.admin])
+            self.create_tasks(2, project, owner=member)
+        return project
+
+    def test_project_list_query_count_is_constant(self):
+        client = self.client_for(self.admin)
+        self.populate(1)
+        small, response = self.count_queries(client, '/api/projects/')
+        self.assertEqual(len(response.json()['results']), 1)
+
+        self.populate(5)
+        large, response = self.count_queries(client, '/api/projects/')
+        self.assertEqual(len(response.json()['results']), 6)
+        self.assertEqual(small, large)
+
+    def test_project_tasks_query_count_is_constant(self):
+        client = self.client_for(self.admin)
+        project = self.populate(1)
+        small, response = self.count_queries(client, f'/api/projects/{project.pk}/tasks/')
+        self.assertEqual(len(response.json()['results']), 2)
+
+        self.create_tasks(5, project, owner=self.create_user('extra@example.com', self.read_only_role))
+        large, response = self.count_queries(client, f'/api/projects/{project.pk}/tasks/')
+        self.assertEqual(len(response.json()['results']), 7)
+        self.assertEqual(small, large)
+
+    def test_project_list_sparse_fields(self):
+        project = self.populate(1)
+        response = self.client_for(self.admin).get('/api/projects/?fields=id,name,owner.email')
+        self.assertEqual(response.json()['results'], [{'id': project.id, 'name': project.name, 'owner': {'email': 'm1@example.com'}}])
+
+
+class ProjectCountsTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.member = self.create_user('member@example.com', self.read_only_role)
+        self.project = self.create_project(owner=self.member, members=[self.member, self.admin])
+        self.create_tasks(3, self.project, owner=self.member)
+        self.create_tasks(2, self.project, status='completed')
+        self.client = self.client_for(self.admin)
+
+    def test_project_renders_counts_instead_of_lists(self):
+        project = self.client.get(f'/api/projects/{self.project.pk}/').json()
+        self.assertNotIn('users', project)
+        self.assertNotIn('task_set', project)
+        self.assertEqual(project['member_count'], 2)
+        self.assertEqual(project['task_count'], 5)
+        self.assertEqual(project['status_counts']['new'], 3)
+        self.assertEqual(project['status_counts']['completed'], 2)
+        self.assertEqual(project['status_counts']['blocked'], 0)
+
+    def test_write_responses_render_counts(self):
+        url = f'/api/projects/{self.project.pk}/'
+        response = self.client.patch(url, {'name': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), self.client.get(url).json())
+
+        response = self.client.post('/api/projects/', {
+            'name': 'New', 'description': 'desc', 'start_date': '2025-01-01', 'end_date': '2025-12-31',
+            'owner_id': self.admin.pk, 'user_ids': [self.member.pk],
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        data = response.json()
+        self.assertEqual((data['member_count'], data['task_count']), (1, 0))
+        self.assertEqual(data['status_counts'], {'new': 0, 'in_progress': 0, 'blocked': 0, 'completed': 0, 'not_started': 0})
+
+        # The project nested in a task write response counts the new task.
+        response = self.client.post('/api/tasks/', {
+            'description': 'Another', 'due_date': '2025-06-01', 'status': 'blocked', 'project_id': self.project.pk,
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        project = response.json()['project']
+        self.assertEqual((project['task_count'], project['status_counts']['blocked']), (6, 1))
+        self.assertEqual(project, self.client.get(url).json())
+
+    def test_empty_project_counts_are_zero(self):
+        project = self.create_project()
+        data = self.client.get(f'/api/projects/{project.pk}/').json()
+        self.assertEqual((data['member_count'], data['task_count']), (0, 0))
+
+    def test_project_payload_size_does_not_grow_with_members_or_tasks(self):
+        small = len(self.client.get(f'/api/projects/{self.project.pk}/').content)
+        for i in range(3):
+            self.project.users.add(self.create_user(f'extra{i}@example.com', self.read_only_role))
+        self.create_tasks(3, self.project)
+        large = len(self.client.get(f'/api/projects/{self.project.pk}/').content)
+        self.assertEqual(small, large)
+
+    def test_members_are_paginated(self):
+        for i in range(3):
+            self.project.users.add(self.create_user(f'extra{i}@example.com', self.read_only_role))
+        response = self.client.get(f'/api/projects/{self.project.pk}/members/?page_size=3')
+        page = response.json()
+        self.assertEqual(len(page['results']), 3)
+        self.assertIsNotNone(page['next'])
+
+        rest = self.client.get(page['next']).json()
+        self.assertEqual(len(rest['results']), 2)
+        self.assertIsNone(rest['next'])
+        ids = [user['id'] for user in page['results'] + rest['results']]
+        self.assertEqual(ids, sorted(self.project.users.values_list('id', flat=True)))
+
+    def test_members_require_project_visibility(self):
+        outsider = self.create_user('outsider@example.com', self.read_only_role)
+        response = self.client_for(outsider).get(f'/api/projects/{self.project.pk}/members/')
+        self.assertEqual(response.status_code, 404)
+        response = self.client_for(self.member).get(f'/api/projects/{self.project.pk}/members/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_members_page_size_is_capped(self):
+        for i in range(UserPagination.max_page_size):
+            self.project.users.add(self.create_user(f'extra{i}@example.com'))
+        response = self.client.get(f'/api/projects/{self.project.pk}/members/?page_size=100000')
+        self.assertEqual(len(response.json()['results']), UserPagination.max_page_size)
+
+
+class ProjectBulkIdValidationTests(APITestCase):
+    def test_user_ids_are_validated_with_one_query(self):
+        users = [self.create_user(f'u{i}@example.com') for i in range(30)]
+        payload = {
+            'name': 'Big', 'description': 'desc', 'start_date': '2025-01-01', 'end_date': '2025-12-31',
+            'owner_id': users[0].id, 'user_ids': [user.id for user in users],
+        }
+        client = self.client_for(self.admin)
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.post('/api/projects/', payload, format='json')
+        self.assertEqual(response.status_code, 201)
+        lookups = [q['sql'] for q in ctx.captured_queries if 'FROM "accounts_user" WHERE "accounts_user"."id"' in q['sql']]
+        # One for the authenticated user, one IN query shared by owner_id and user_ids.
+        self.assertEqual(len(lookups), 2)
+        self.assertIn(' IN (', lookups[1])
+        self.assertEqual(Project.objects.get(name='Big').users.count(), 30)
+
+    def test_missing_user_ids_are_all_reported(self):
+        user = self.create_user('u@example.com')
+        serializer = ProjectSerializer(data={
+            'name': 'P', 'description': 'd', 'start_date': '2025-01-01', 'end_date': '2025-12-31',
+            'owner_id': user.id, 'user_ids': [user.id, 9998, 9999],
+        })
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors['user_ids'], ['Invalid pks [9998, 9999] - objects do not exist.'])
+
+    def test_single_missing_id_keeps_the_stock_message(self):
+        serializer = ProjectSerializer(data={
+            'name': 'P', 'description': 'd', 'start_date': '2025-01-01', 'end_date': '2025-12-31',
+            'owner_id': 9999, 'user_ids': ['x'],
+        })
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors['owner_id'], ['Invalid pk "9999" - object does not exist.'])
+        self.assertEqual(serializer.errors['user_ids'], ['Incorrect type. Expected pk value, received str.'])
+
+
+class ProjectTasksSubResourceTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.member = self.create_user('member@example.com', self.read_only_role)
+        self.project = self.create_project(owner=self.member, members=[self.member])
+        self.create_tasks(4, self.project, status='new')
+        self.create_tasks(3, self.project, status='blocked')
+        self.create_tasks(2, self.create_project(), status='new')
+        self.client = self.client_for(self.admin)
+        self.url = f'/api/projects/{self.project.pk}/tasks/'
+
+    def test_missing_or_invisible_project_is_404(self):
+        self.assertEqual(self.client.get('/api/projects/9999/tasks/').status_code, 404)
+        outsider = self.create_user('outsider@example.com', self.read_only_role)
+        self.assertEqual(self.client_for(outsider).get(self.url).status_code, 404)
+        self.assertEqual(self.client_for(self.member).get(self.url).status_code, 200)
+        for suffix in ('tasks/', 'members/', 'tasks/export/'):
+            self.assertEqual(self.client.get(f'/api/projects/abc/{suffix}').status_code, 404)
+
+    def test_members_only_see_their_tasks(self):
+        own = self.create_tasks(2, self.project, owner=self.member)
+        client = self.client_for(self.member)
+        expected = sorted(task.pk for task in own)
+        self.assertEqual(sorted(task['id'] for task in client.get(self.url).json()['results']), expected)
+        rows = json.loads(b''.join(client.get(self.url + '?stream=1').streaming_content))
+        self.assertEqual(sorted(row['id'] for row in rows), expected)
+
+    def test_filters(self):
+        results = self.client.get(self.url + '?status=blocked').json()['results']
+        self.assertEqual([task['status'] for task in results], ['blocked'] * 3)
+        results = self.client.get(self.url + '?status=new,blocked&due_date_after=2025-06-02&due_date_before=2025-06-03').json()['results']
+        self.assertEqual(len(results), 4)
+        self.assertEqual(self.client.get(self.url + '?status=done').status_code, 400)
+        self.assertEqual(self.client.get(self.url + '?due_date_after=June').status_code, 400)
+
+    def test_pagination_with_ordering(self):
+        page = self.client.get(self.url + '?ordering=status,id&page_size=5').json()
+        rest = self.client.get(page['next']).json()
+        ids = [task['id'] for task in page['results'] + rest['results']]
+        self.assertEqual(ids, list(self.project.task_set.order_by('status', 'id').values_list('id', flat=True)))
+
+    def test_stream_matches_paginated_results(self):
+        paginated = self.client.get(self.url + '?status=new&ordering=due_date,id&page_size=200').json()['results']
+        with patch('task_tracker.streaming.STREAM_CHUNK_SIZE', 3):
+            response = self.client.get(self.url + '?status=new&ordering=due_date,id&stream=1')
+            self.assertTrue(response.streaming)
+            self.assertEqual(json.loads(b''.join(response.streaming_content)), paginated)
+        with override_settings(FAST_SERIALIZERS=False):
+            response = self.client.get(self.url + '?status=new&ordering=due_date,id&stream=1')
+            self.assertEqual(json.loads(b''.join(response.streaming_content)), paginated)
+
+    def test_stream_reads_in_chunks(self):
+        with patch('task_tracker.streaming.STREAM_CHUNK_SIZE', 3), CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url + '?stream=1&fields=id,status')
+            rows = json.loads(b''.join(response.streaming_content))
+        self.assertEqual([row['id'] for row in rows], list(self.project.task_set.order_by('id').values_list('id', flat=True)))
+        task_queries = [q['sql'] for q in ctx.captured_queries if 'FROM "tasks_task"' in q['sql']]
+        # 7 rows in chunks of 3, each chunk a keyset query without OFFSET.
+        self.assertEqual(len(task_queries), 3)
+        self.assertTrue(all('LIMIT 3' in sql and 'OFFSET' not in sql for sql in task_queries))
+
+
+class ProjectSearchTests(APITestCase):
+    def test_search_name_and_description(self):
+        member = self.create_user('member@example.com', self.read_only_role)
+        alpha = self.create_project(members=[member])
+        alpha.name, alpha.description = 'Billing revamp', 'Move invoices to the new billing engine'
+        alpha.save()
+        beta = self.create_project()
+        beta.description = 'Billing reports'
+        beta.save()
+
+        results = self.client_for(self.admin).get('/api/projects/?q=billing').json()['results']
+        self.assertEqual([project['id'] for project in results], [alpha.id, beta.id])
+        self.assertEqual(results[0]['task_count'], 0)
+        results = self.client_for(member).get('/api/projects/?q=reports').json()['results']
+        self.assertEqual(results, [])
+
+
+class ProjectStatsEndpointTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.member = self.create_user('member@example.com', self.read_only_role)
+        self.mine = self.create_project(members=[self.member])
+        self.hidden = self.create_project()
+        self.create_tasks(2, self.mine)
+        self.create_tasks(1, self.mine, status='completed')
+        self.create_tasks(4, self.hidden, status='blocked')
+
+    def test_counts_are_scoped_to_visible_projects(self):
+        response = self.client_for(self.member).get('/api/projects/stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [{
+            'project': self.mine.pk, 'name': self.mine.name, 'task_count': 3,
+            'status_counts': {'new': 2, 'in_progress': 0, 'blocked': 0, 'completed': 1, 'not_started': 0},
+        }])
+
+        results = self.client_for(self.admin).get('/api/projects/stats/').json()['results']
+        self.assertEqual([row['task_count'] for row in results], [3, 4])
+
+    def test_counts_do_not_read_tasks(self):
+        client = self.client_for(self.admin)
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get('/api/projects/stats/?page_size=1')
+        self.assertEqual(len(response.json()['results']), 1)
+        self.assertFalse([query for query in ctx.captured_queries if 'tasks_task"' in query['sql']])
+        self.assertEqual(
+            len([query for query in ctx.captured_queries if 'tasks_projecttaskstats' in query['sql']]), 1
+        )
+
+
+class ProjectConditionalGetTests(APITestCase):
+    def test_membership_and_task_changes_change_the_etag(self):
+        member = self.create_user('member@example.com', self.read_only_role)
+        project = self.create_project(members=[member])
+        client = self.client_for(member)
+        for change in (
+            lambda: self.create_tasks(1, project),
+            lambda: project.users.remove(member),
+        ):
+            response = client.get('/api/projects/')
+            self.assertEqual(client.get('/api/projects/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+            change()
+            self.assertEqual(client.get('/api/projects/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+        self.assertEqual(client.get('/api/projects/').json()['results'], [])
+
+
+
+class ProjectEventTests(APITestCase):
+    def published(self, write):
+        with patch('task_tracker.events._publish') as publish, self.captureOnCommitCallbacks(execute=True):
+            write()
+        return [
+            (event['action'], event['id'], event['audience']['any'])
+            for call in publish.call_args_list for event in call.args[0] if event['type'] == 'project'
+        ]
+
+    def test_events_reach_members_before_and_after(self):
+        member = self.create_user('member@example.com', self.read_only_role)
+        other = self.create_user('other@example.com', self.read_only_role)
+        project = self.create_project(members=[member])
+
+        self.assertEqual(self.published(lambda: project.users.set([other])), [
+            ('updated', project.pk, [member.pk]),
+            ('updated', project.pk, [other.pk]),
+        ])
+        self.assertEqual(self.published(lambda: other.projects.clear()), [('updated', project.pk, [other.pk])])
+        project.users.add(member)
+        pk = project.pk
+        self.assertEqual(self.published(project.delete), [('deleted', pk, [member.pk])])
+
+
+class ProjectAsyncReadTests(APITestCase):
+    def test_matches_the_sync_endpoints(self):
+        member = self.create_user('member@example.com', self.read_only_role)
+        project = self.create_project(members=[member])
+        self.create_project()
+        self.create_tasks(3, project)
+        client = self.client_for(member)
+        for url in ('/projects/', f'/projects/{project.pk}/', '/projects/?fields=id,name,status_counts'):
+            with self.subTest(url=url):
+                response = client.get(f'/api/async{url}')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(json.loads(response.content), json.loads(client.get(f'/api{url}').content))
+        self.assertEqual(len(client.get('/api/async/projects/').json()['results']), 1)
@@ -1,16 +1,31 @@
 from rest_framework import viewsets
 
-from accounts.models import Role
 from .models import Project
 from .serializers import ProjectSerializer
+from tasks.models import ProjectTaskStats, Task
+from tasks.stats import empty_status_counts
 from tasks.serializers import TaskSerializer
 from rest_framework.permissions import IsAuthenticated
 from accounts.permissions import IsAdmin, IsReadOnlyOrAdminOrTaskCreator
 from rest_framework.decorators import action
-from rest_framework.response import Response
+from task_tracker.async_views import AsyncReadViewSetMixin
+from task_tracker.conditional import ConditionalGetViewSetMixin
+from task_tracker.response_cache import CachedResponseViewSetMixin
+from task_tracker.eager_loading import EagerLoadingViewSetMixin, apply_eager_loading
+from task_tracker.fast_serializers import FastReadViewSetMixin, get_row_mapper
+from task_tracker.streaming import json_array_stream, serialize_chunks
+from tasks.export import export_tasks
+from tasks.filters import TaskFilterBackend
+from task_tracker.search import FullTextSearchFilter
+from django.http import StreamingHttpResponse
+from rest_framework.generics import get_object_or_404
+from task_tracker.pagination import ProjectPagination, TaskPagination, UserPagination
+from accounts.models import Role, User
+from accounts.serializers import UserSerializer
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(AsyncReadViewSetMixin, ConditionalGetViewSetMixin, CachedResponseViewSetMixin, FastReadViewSetMixin,
+                     EagerLoadingViewSetMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing Project objects.
 
@@ -29,6 +44,15 @@ class ProjectViewSet(viewsets.ModelViewSet):
         - If the requesting user has 'admin' role, return all projects.
         - Otherwise, return only projects where the user is assigned.
 
+    Query Parameters (GET):
+        - fields / expand: Sparse fieldsets and opt-in expansion of relations
+          (see SparseFieldsetsMixin). Relations not expanded are returned as IDs.
+        - cursor / page_size: Keyset pagination (see KeysetPagination). At most
+          200 rows per page; responses are `{"next", "previous", "results"}`.
+        - ordering: `id` (default) or `-id`.
+        - q: Full-text search in name and description (see FullTextSearchFilter);
+          results are ordered by relevance unless `ordering` is given.
+
     Endpoints:
         - GET /projects/ : List projects.
         - POST /projects/ : Create a new project.
@@ -36,30 +60,58 @@ class ProjectViewSet(viewsets.ModelViewSet):
         - PUT /projects/{id}/ : Update a project.
         - PATCH /projects/{id}/ : Partially update a project.
         - DELETE /projects/{id}/ : Delete a project.
-        - GET /projects/{id}/tasks/ : Retrieve all tasks assigned to a specific project.
+        - GET /projects/{id}/members/ : Paginated list of the users assigned to a project.
+        - GET /projects/{id}/tasks/ : Paginated list of the tasks of a project, filterable by
+          status and due date; `?stream=1` streams every matching task instead.
+        - GET /projects/{id}/tasks/export/ : Stream the project's tasks visible to the user
+          as NDJSON or CSV (see export_tasks).
+        - GET /projects/stats/ : Paginated task counts per status of the visible projects,
+          read from the ProjectTaskStats counters (see stats()).
+        - GET /async/projects/ and /async/projects/{id}/ : The list and retrieve above served
+          through the async ORM under ASGI (see AsyncReadViewSetMixin).
+
+    Projects render `member_count`, `task_count` and `status_counts` instead of
+    embedding their members and tasks; use the sub-resources above for the lists.
+
+    List and retrieve responses carry an ETag and Last-Modified and answer
+    `If-None-Match` / `If-Modified-Since` with 304 Not Modified until a project,
+    task, user or role changes (see ConditionalGetViewSetMixin). Other list/retrieve
+    responses are served from the response cache until then (see
+    CachedResponseViewSetMixin).
 
     Methods:
         - get_queryset(): Dynamically filters queryset based on user role.
         - get_permissions(): Dynamically assigns permissions based on request method.
         - perform_create(): Automatically assigns the current user as the project owner during creation.
+        - members(): Custom action to fetch the members of a given project.
         - tasks(): Custom action to fetch tasks for a given project.
+        - stats(): Custom action to fetch the task counters of the visible projects.
 
     Example (Custom Action - Get tasks for a project):
         Request:
-            GET /projects/5/tasks/
+            GET /projects/5/tasks/?page_size=2
         Response:
-            [
-                {
-                    "id": 101,
-                    "name": "Task 1",
-                    "description": "...",
+            {
+                "next": "http://localhost:8000/api/projects/5/tasks/?cursor=cD0xMDI%3D&page_size=2",
+                "previous": null,
+                "results": [
+                    {
+                        "id": 101,
+                        "name": "Task 1",
+                        "description": "...",
+                        ...
+                    },
                     ...
-                },
-                ...
-            ]
+                ]
+            }
     """
     queryset = Project.objects.all()
     serializer_class = ProjectSerializer
+    pagination_class = ProjectPagination
+    filter_backends = [FullTextSearchFilter]
+    # Models rendered by ProjectSerializer (the counts come from tasks and members),
+    # whose versions key the ETags and cached responses.
+    versioned_models = [Project, Task, User, Role]
 
 
     def get_queryset(self):
@@ -71,12 +123,9 @@ class ProjectViewSet(viewsets.ModelViewSet):
         if getattr(self, 'swagger_fake_view', False):
             return Project.objects.none() 
     
-        request_user_role = self.request.user.roles.values_list("name", flat=True)
-        if Role.ADMIN in request_user_role:  # admin has full access to all projects
-            return super().get_queryset()
-        
-        # Non-admin users can only access projects assigned to them
-        return self.request.user.projects.all()
+        # Admins see every project, other users the projects assigned to them
+        # (see ProjectQuerySet.visible_to).
+        return super().get_queryset().visible_to(self.request.user)
 
     def get_permissions(self):
         """
@@ -94,15 +143,117 @@ class ProjectViewSet(viewsets.ModelViewSet):
 
 
 
+    @action(detail=True, methods=['get'])
+    def members(self, request, pk):
+        """
+        Custom action to list the users assigned to a specific project, one page at a time.
+        URL: /projects/{id}/members/
+        """
+        project = self.get_visible_project()
+        return self.paginated_sub_resource(project.users.all(), UserSerializer, UserPagination)
+
     @action(detail=True, methods=['get'])
     def tasks(self, request, pk):
         """
-        Custom action to list tasks under a specific project.
+        Custom action to list tasks under a specific project, one page at a time.
         URL: /projects/{id}/tasks/
+
+        Only tasks the user may read in /tasks/ are listed.
+
+        Query Parameters:
+            - status, due_date_after, due_date_before: See TaskFilterBackend.
+            - cursor, page_size, ordering: See TaskPagination.
+            - stream=1: Return every matching task as one JSON array, streamed in
+              keyset chunks instead of paginated.
+        """
+        project = self.get_visible_project()
+        # Not through `project.task_set`: its rows would share this bare instance
+        # instead of loading the project rendered by TaskSerializer.
+        tasks = TaskFilterBackend().filter_queryset(
+            request, Task.objects.visible_to(request.user).filter(project=project), self
+        )
+        if request.query_params.get('stream') in ('1', 'true'):
+            serializer = TaskSerializer(context=self.get_serializer_context())
+            chunks = serialize_chunks(
+                apply_eager_loading(tasks, serializer), serializer, TaskPagination().get_ordering(request)
+            )
+            return StreamingHttpResponse(json_array_stream(chunks), content_type='application/json')
+        return self.paginated_sub_resource(tasks, TaskSerializer, TaskPagination)
+
+    @action(detail=True, methods=['get'], url_path='tasks/export')
+    def tasks_export(self, request, pk):
+        """
+        Streams the tasks of a project as NDJSON (default) or CSV.
+        URL: /projects/{id}/tasks/export/?export_format=csv
+
+        Only tasks the user may read in /tasks/ are exported.
+        """
+        project = self.get_visible_project()
+        tasks = Task.objects.visible_to(request.user).filter(project=project)
+        return export_tasks(request, tasks, self.get_serializer_context(), filename=f'project-{project.pk}-tasks')
+
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        """
+        Task counts per status of every project the user can see (see get_queryset),
+        one keyset page of projects at a time.
+        URL: /projects/stats/
+
+        The counts come from the ProjectTaskStats counters maintained on every task
+        write, read with one query on their (project, status) index per page, so
+        the cost does not depend on the number of tasks.
+
+        Query Parameters:
+            - cursor, page_size, ordering: See ProjectPagination.
+
+        Example response:
+            {
+                "next": null,
+                "previous": null,
+                "results": [
+                    {
+                        "project": 5,
+                        "name": "Website",
+                        "task_count": 3,
+                        "status_counts": {"new": 1, "in_progress": 2, "blocked": 0, "completed": 0, "not_started": 0}
+                    }
+                ]
+            }
+        """
+        paginator = ProjectPagination()
+        projects = paginator.paginate_queryset(self.get_queryset().values_list('pk', 'name'), request, view=self)
+        results = {
+            pk: {'project': pk, 'name': name, 'task_count': 0, 'status_counts': empty_status_counts()}
+            for pk, name, *_ in projects
+        }
+        counters = ProjectTaskStats.objects.filter(project_id__in=list(results), count__gt=0)
+        for project_id, status, count in counters.values_list('project_id', 'status', 'count'):
+            results[project_id]['status_counts'][status] = count
+            results[project_id]['task_count'] += count
+        return paginator.get_paginated_response(list(results.values()))
+
+    def get_visible_project(self):
+        """
+        Returns the project in the URL if the user can see it (see get_queryset).
+
+        Raises:
+            Http404: If the project does not exist or is not visible to the user.
+        """
+        project = get_object_or_404(self.get_queryset().only('pk'), pk=self.kwargs['pk'])
+        self.check_object_permissions(self.request, project)
+        return project
+
+    def paginated_sub_resource(self, queryset, serializer_class, pagination_class):
+        """
+        Returns one keyset page of `queryset` rendered with `serializer_class`,
+        through its compiled row mapper when available.
         """
-        # Fetch project by ID
-        project = Project.objects.get(id=pk)
-        # Fetch all tasks associated with this project
-        tasks = project.task_set.all()
-        tasks_serializer = TaskSerializer(tasks, many=True)
-        return Response(tasks_serializer.data)
+        serializer = serializer_class(context=self.get_serializer_context())
+        queryset = apply_eager_loading(queryset, serializer)
+        paginator = pagination_class()
+        mapper = get_row_mapper(serializer)
+        if mapper is not None:
+            page = paginator.paginate_queryset(mapper.values_queryset(queryset), request=self.request, view=self)
+            return paginator.get_paginated_response(mapper.map_rows(page))
+        page = paginator.paginate_queryset(queryset, request=self.request, view=self)
+        return paginator.get_paginated_response(serializer_class(page, many=True, context=serializer.context).data)
@@ -11,6 +11,13 @@ python manage.py create_default_superuser
 python manage.py create_roles
 python manage.py create_user_with_admin_role 
 
+# SERVER_MODE=asgi serves the same API from uvicorn workers, which also run the
+# async reads under /api/async/ and the /api/events/ stream.
+if [ "$SERVER_MODE" = "asgi" ]; then
+    echo "🚀 Starting Uvicorn server..."
+    exec uvicorn task_tracker.asgi:application --host 0.0.0.0 --port 8000 --workers 3 --log-level debug
+fi
+
 echo "🚀 Starting Gunicorn server..."
 gunicorn task_tracker.wsgi:application --bind 0.0.0.0:8000 -w 3 --log-level debug --timeout 120 --reload
 
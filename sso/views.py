@@ -17,7 +17,7 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.core.cache import cache
 from .serializers import SSOTokenSerializer
-from rest_framework_simplejwt.tokens import RefreshToken
+from task_tracker.serializers import CustomTokenObtainPairSerializer
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
@@ -151,7 +151,8 @@ def google_callback(request):
     user = User.objects.filter(email=email)
     if user.exists():
         # Generate a token (e.g., JWT or session)
-        refresh = RefreshToken.for_user(user.first())
+        # Issue the same claims as /api/token/ so stateless authentication works for SSO logins.
+        refresh = CustomTokenObtainPairSerializer.get_token(user.first())
         cache_data = {
             "access": str(refresh.access_token), 
             "refresh": str(refresh)
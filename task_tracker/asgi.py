@@ -3,6 +3,14 @@ ASGI config for task_tracker project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Besides the REST API it serves the Server-Sent Events stream at /api/events/
+(see task_tracker.sse) and the async reads under /api/async/ (see
+task_tracker.async_views), which need an ASGI server such as:
+
+    uvicorn task_tracker.asgi:application --host 0.0.0.0 --port 8001
+
+`SERVER_MODE=asgi ./setup.sh` runs the whole API this way instead of gunicorn.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -0,0 +1,141 @@
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import Http404
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.response import Response
+
+from .eager_loading import apply_eager_loading
+
+
+class AsyncReadViewSetMixin:
+    """
+    ViewSet mixin adding async variants of the read actions, served through
+    Django's async ORM by the ASGI application (`task_tracker.asgi`). Combine
+    with FastReadViewSetMixin and EagerLoadingViewSetMixin.
+
+    Under gunicorn sync workers a slow query blocks the whole worker; an async
+    view awaits its queries instead, so one ASGI worker keeps serving other
+    requests meanwhile. Route them with `as_async_view()`:
+
+        path('api/async/tasks/', TaskViewSet.as_async_view('list'))
+
+    Authentication, permissions, throttling, filters, pagination and sparse
+    fieldsets run as on the sync endpoints, in one thread hop before the first
+    query (`prepare()`); the rows are then read with `async for` and rendered by
+    the compiled RowMapper (see FastReadViewSetMixin), falling back to the
+    serializer when the mapper does not apply. Responses are identical to the
+    sync endpoints', except that ETags and the response cache are not used.
+
+    The views also work under WSGI (Django runs them in an event loop per
+    request), but only gain anything under an ASGI server.
+    """
+    async_actions = {
+        'list': 'alist',
+        'retrieve': 'aretrieve',
+    }
+
+    @classmethod
+    def as_async_view(cls, action, **initkwargs):
+        """
+        Returns an async view function serving GET requests with the async
+        variant of `action` (a key of `async_actions`).
+        """
+        handler_name = cls.async_actions[action]
+
+        async def view(request, *args, **kwargs):
+            self = cls(**initkwargs)
+            self.action_map = {'get': action}
+            self.args = args
+            self.kwargs = kwargs
+            self.headers = self.default_response_headers
+            request = self.initialize_request(request, *args, **kwargs)
+            self.request = request
+            try:
+                if request.method != 'GET':
+                    raise exceptions.MethodNotAllowed(request.method)
+                response = await getattr(self, handler_name)(request, *args, **kwargs)
+            except Exception as exc:
+                response = self.handle_exception(exc)
+            self.response = self.finalize_response(request, response, *args, **kwargs)
+            return self.response
+
+        view.cls = cls
+        view.initkwargs = initkwargs
+        view.actions = {'get': action}
+        return csrf_exempt(view)
+
+    def prepare(self, request):
+        """
+        Runs the checks of `APIView.initial()` (authentication, permissions,
+        throttles) and returns (filtered queryset, row mapper or None). Runs in
+        a worker thread: authentication and role lookups are synchronous.
+        """
+        self.initial(request, *self.args, **self.kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.action != 'list' and self._has_object_permissions():
+            return queryset, None
+        return queryset, self.get_row_mapper()
+
+    async def alist(self, request, *args, **kwargs):
+        queryset, mapper = await sync_to_async(self.prepare)(request)
+        if mapper is not None:
+            queryset = mapper.values_queryset(queryset)
+        if self.paginator is None:
+            rows = [row async for row in queryset]
+        else:
+            page = self.paginator.get_page_queryset(queryset, request)
+            rows = self.paginator.paginate_rows([row async for row in page])
+        data = await self.arender_rows(rows, mapper)
+        if self.paginator is None:
+            return Response(data)
+        return self.get_paginated_response(data)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        queryset, mapper = await sync_to_async(self.prepare)(request)
+        model = queryset.model
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+            if mapper is not None:
+                queryset = mapper.values_queryset(queryset)
+            rows = [row async for row in queryset[:1]]
+        except (TypeError, ValueError, DjangoValidationError):
+            rows = []
+        if not rows:
+            raise Http404(f"No {model._meta.object_name} matches the given query.")
+        if mapper is None:
+            await sync_to_async(self.check_object_permissions)(request, rows[0])
+        return Response((await self.arender_rows(rows, mapper))[0])
+
+    async def arender_rows(self, rows, mapper):
+        """
+        Renders model instances, or values_list() rows of `mapper`.
+        """
+        if mapper is not None:
+            return await mapper.amap_rows(rows)
+        # Serializers may read relations the eager loading did not cover.
+        return await sync_to_async(lambda: self.get_serializer(rows, many=True).data)()
+
+
+class AsyncMeViewSetMixin(AsyncReadViewSetMixin):
+    """
+    AsyncReadViewSetMixin for UserViewSet, adding the async variant of
+    `GET /users/me/`.
+    """
+    async_actions = {
+        **AsyncReadViewSetMixin.async_actions,
+        'me': 'ame',
+    }
+
+    async def ame(self, request, *args, **kwargs):
+        await sync_to_async(self.initial)(request, *args, **kwargs)
+        serializer = self.get_serializer()
+        queryset = apply_eager_loading(self.get_queryset().filter(pk=request.user.pk), serializer)
+        mapper = self.get_row_mapper()
+        if mapper is not None:
+            queryset = mapper.values_queryset(queryset)
+        rows = [row async for row in queryset[:1]]
+        if not rows:
+            raise Http404("No User matches the given query.")
+        return Response((await self.arender_rows(rows, mapper))[0])
@@ -0,0 +1,273 @@
+import gzip
+import re
+import time
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - gzip only
+    brotli = None
+
+from .counters import BufferedCounters
+
+METRICS_KEY = "compression:metrics:{}:{}"
+METRIC_NAMES = ("responses", "cached", "bytes_in", "bytes_out", "cpu_us")
+
+pending_metrics = BufferedCounters()
+
+GZIP_LEVEL = 6
+# Brotli's default (11) is meant for static assets; 5 compresses better than
+# gzip at about its speed.
+BROTLI_QUALITY = 5
+
+# Server-Sent Events must reach the client as they are written.
+COMPRESSIBLE_TYPES = re.compile(r"^(application/(json|x-ndjson|.*\+json)|text/(?!event-stream).*)(;|$)")
+ACCEPT_ENCODING = re.compile(r"\s*([^\s;,]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*(?:,|$)")
+
+
+def available_encodings():
+    """
+    Returns the content codings this process can produce, preferred first.
+    """
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(request):
+    """
+    Returns the preferred content coding the client accepts
+    (`Accept-Encoding`, honouring `q` values and `*`), or None for identity.
+    """
+    header = request.headers.get("Accept-Encoding", "")
+    if not header:
+        return None
+    weights = {}
+    for coding, q in ACCEPT_ENCODING.findall(header):
+        try:
+            weights[coding.lower()] = float(q) if q else 1.0
+        except ValueError:
+            continue
+    best, best_weight = None, 0.0
+    for coding in available_encodings():
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def compress(content, encoding):
+    """
+    Returns `content` compressed with `encoding` (see available_encodings()).
+    """
+    if encoding == "br":
+        return brotli.compress(content, quality=BROTLI_QUALITY)
+    return gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compressor(encoding):
+    """
+    Returns a function compressing one chunk of a stream at a time (flushed,
+    so every chunk reaches the client), and returning the trailer when called
+    with None.
+    """
+    if encoding == "br":
+        stream = brotli.Compressor(quality=BROTLI_QUALITY)
+        return lambda chunk: stream.finish() if chunk is None else stream.process(chunk) + stream.flush()
+    # wbits=31 writes a gzip header and trailer.
+    stream = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    return lambda chunk: stream.flush() if chunk is None else stream.compress(chunk) + stream.flush(zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses with brotli (when the `brotli` package is installed)
+    or gzip, as negotiated by `Accept-Encoding`.
+
+    Compressed:
+        - JSON, NDJSON and text bodies of at least `COMPRESSION_MIN_SIZE`
+          bytes (smaller ones gain less than the header overhead).
+        - Streaming responses (task exports) of those types whatever their
+          size, chunk by chunk, sync or async. Event streams are left alone.
+
+    Responses served from the response cache may carry their bodies already
+    compressed (`precompressed`, see CachedResponseViewSetMixin); they are
+    sent as is. Newly compressed bodies are handed to the response's
+    `store_compressed` callback, so the cache keeps them next to the raw
+    content and a hit never compresses again.
+
+    Strong ETags become weak, since the bytes differ from the uncompressed
+    representation (conditional requests compare ETags weakly). API bodies
+    carry no secrets (tokens travel in headers), so no BREACH padding is added.
+
+    Bytes in/out and CPU time are counted per coding (see get_metrics()).
+
+    Disable with `RESPONSE_COMPRESSION=0` in the environment.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        encoding = self.get_encoding(request, response)
+        if encoding is None or response.streaming or encoding in getattr(response, "precompressed", {}):
+            return self.process_response(request, response)
+        # zlib and brotli release the GIL: compress off the event loop.
+        return await sync_to_async(self.process_response, thread_sensitive=False)(request, response)
+
+    def get_encoding(self, request, response):
+        """
+        Returns the coding to compress `response` with, or None.
+        """
+        if not getattr(settings, "RESPONSE_COMPRESSION", True) or response.has_header("Content-Encoding") \
+                or response.status_code < 200 or response.status_code in (204, 206, 304) \
+                or not COMPRESSIBLE_TYPES.match(response.get("Content-Type", "")):
+            return None
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return None
+        return negotiate(request)
+
+    def process_response(self, request, response):
+        patch = response.streaming or len(getattr(response, "content", b"")) >= settings.COMPRESSION_MIN_SIZE
+        if patch and COMPRESSIBLE_TYPES.match(response.get("Content-Type", "")):
+            # Caches must not hand a compressed body to clients that cannot read it.
+            patch_vary_headers(response, ("Accept-Encoding",))
+
+        encoding = self.get_encoding(request, response)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = _compress_async_stream(response.streaming_content, encoding)
+            else:
+                response.streaming_content = _compress_stream(response.streaming_content, encoding)
+            del response.headers["Content-Length"]
+        else:
+            content = response.content
+            precompressed = getattr(response, "precompressed", {})
+            if encoding in precompressed:
+                compressed = precompressed[encoding]
+                record(encoding, len(content), len(compressed), 0, cached=True)
+            else:
+                start = time.thread_time()
+                compressed = compress(content, encoding)
+                record(encoding, len(content), len(compressed), time.thread_time() - start)
+                store = getattr(response, "store_compressed", None)
+                if store is not None:
+                    store(encoding, compressed)
+            if len(compressed) >= len(content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+
+def _compress_stream(chunks, encoding):
+    compress_chunk = compressor(encoding)
+    size = compressed_size = cpu = 0
+    try:
+        for chunk in chunks:
+            start = time.thread_time()
+            data = compress_chunk(chunk)
+            cpu += time.thread_time() - start
+            size += len(chunk)
+            compressed_size += len(data)
+            if data:
+                yield data
+        data = compress_chunk(None)
+        compressed_size += len(data)
+        yield data
+    finally:
+        record(encoding, size, compressed_size, cpu)
+
+
+async def _compress_async_stream(chunks, encoding):
+    compress_chunk = compressor(encoding)
+    size = compressed_size = cpu = 0
+    try:
+        async for chunk in chunks:
+            start = time.thread_time()
+            data = compress_chunk(chunk)
+            cpu += time.thread_time() - start
+            size += len(chunk)
+            compressed_size += len(data)
+            if data:
+                yield data
+        data = compress_chunk(None)
+        compressed_size += len(data)
+        yield data
+    finally:
+        record(encoding, size, compressed_size, cpu)
+
+
+def record(encoding, size, compressed_size, cpu, cached=False):
+    """
+    Counts one response compressed with `encoding`: its raw and compressed
+    sizes and the CPU seconds spent (none when `cached`). Buffered in the
+    process (see BufferedCounters).
+    """
+    counters = {
+        "responses": 1,
+        "bytes_in": size,
+        "bytes_out": compressed_size,
+        "cpu_us": round(cpu * 1_000_000),
+    }
+    if cached:
+        counters["cached"] = 1
+    for name, value in counters.items():
+        if value or name == "responses":
+            pending_metrics.add(METRICS_KEY.format(encoding, name), value)
+
+
+def get_metrics():
+    """
+    Returns the compression counters per coding, shared by every worker:
+
+        {"gzip": {"responses": 120, "cached": 80, "bytes_in": 9437184,
+                  "bytes_out": 1048576, "bytes_saved": 8388608, "ratio": 0.111,
+                  "cpu_ms": 240.0, "bytes_saved_per_response": 69905,
+                  "cpu_ms_per_response": 2.0}, ...}
+
+    `cached` responses were served precompressed from the response cache, at
+    no CPU cost; `cpu_ms_per_response` averages over every response.
+    """
+    encodings = ("br", "gzip")
+    pending_metrics.flush()
+    stored = cache.get_many([METRICS_KEY.format(encoding, name) for encoding in encodings for name in METRIC_NAMES])
+    metrics = {}
+    for encoding in encodings:
+        counters = {name: stored.get(METRICS_KEY.format(encoding, name), 0) for name in METRIC_NAMES}
+        responses, size, compressed_size = counters["responses"], counters["bytes_in"], counters["bytes_out"]
+        cpu_ms = counters["cpu_us"] / 1000
+        metrics[encoding] = {
+            "responses": responses,
+            "cached": counters["cached"],
+            "bytes_in": size,
+            "bytes_out": compressed_size,
+            "bytes_saved": size - compressed_size,
+            "ratio": compressed_size / size if size else None,
+            "cpu_ms": cpu_ms,
+            "bytes_saved_per_response": (size - compressed_size) // responses if responses else None,
+            "cpu_ms_per_response": cpu_ms / responses if responses else None,
+        }
+    return metrics
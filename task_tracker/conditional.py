@@ -0,0 +1,73 @@
+import hashlib
+import json
+
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+from accounts.roles import get_role_names
+from . import versions
+
+
+class ConditionalGetViewSetMixin:
+    """
+    ViewSet mixin answering conditional list/retrieve requests
+    (`If-None-Match` / `If-Modified-Since`) with 304 Not Modified before any
+    query or serialization runs.
+
+    The validators come from the versions (see task_tracker.versions) of every
+    model the response renders, listed in `versioned_models`:
+        - ETag: strong, a hash of those versions, the current
+          versions.window(), the user, their roles, the full URL (filters,
+          cursor, fields) and the Accept header, so it changes whenever the
+          response could.
+        - Last-Modified: the last change of any of those models.
+
+    Checking costs one cache read, so polling clients get a 304 until
+    something they could see changes. Responses are marked `private,
+    no-cache` so browsers revalidate instead of reusing them silently.
+    """
+    versioned_models = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
+
+    def conditional_response(self, view, request, *args, **kwargs):
+        validators = self.get_validators(request)
+        if validators is None:
+            return view(request, *args, **kwargs)
+
+        etag, last_modified = validators
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = view(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        patch_vary_headers(response, ('Authorization', 'Accept'))
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def get_validators(self, request):
+        """
+        Returns (ETag, Last-Modified timestamp) for the request, or None when
+        the versions are unavailable (the cache is down).
+        """
+        if request.method not in ('GET', 'HEAD') or not self.versioned_models:
+            return None
+        current = versions.get_request_versions(request, self.versioned_models)
+        if current is None:
+            return None
+        key = json.dumps([
+            sorted(current.items()),
+            versions.window(),
+            request.user.pk,
+            sorted(get_role_names(request.user)),
+            request.get_full_path(),
+            request.headers.get('Accept', ''),
+        ], separators=(',', ':'))
+        etag = '"%s"' % hashlib.sha1(key.encode()).hexdigest()
+        return etag, int(max(modified for _, modified in current.values()))
@@ -0,0 +1,54 @@
+import atexit
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def incr_many(counters):
+    """
+    Adds `counters` ({cache key: value}) to counters in the cache with atomic
+    `incr`, creating the missing ones.
+    """
+    for key, value in counters.items():
+        try:
+            cache.incr(key, value)
+        except ValueError:
+            cache.add(key, 0, timeout=None)
+            cache.incr(key, value)
+
+
+class BufferedCounters:
+    """
+    Counters of this process, added to counters in the cache (Redis in
+    production) shared by every worker.
+
+    Increments accumulate in memory and are added to the cache by the first
+    add() at least REQUEST_METRICS_FLUSH_SECONDS after the previous flush, and
+    at exit, so counting costs no cache round trip on most requests. Readers of
+    the shared counters flush() first to include this worker's.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = defaultdict(int)
+        self.flushed_at = time.monotonic()
+        # Gunicorn workers exit through sys.exit(): keep their last counts.
+        atexit.register(self.flush)
+
+    def add(self, key, value=1):
+        with self.lock:
+            self.pending[key] += value
+        if self.flush_due():
+            self.flush()
+
+    def flush_due(self):
+        return time.monotonic() - self.flushed_at >= settings.REQUEST_METRICS_FLUSH_SECONDS
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, defaultdict(int)
+            self.flushed_at = time.monotonic()
+        incr_many(pending)
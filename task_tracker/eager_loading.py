@@ -0,0 +1,224 @@
+import copy
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.relations import ManyRelatedField
+
+
+class EagerLoadingMixin:
+    """
+    Serializer mixin that declares the related paths a serializer reads.
+
+    Each serializer lists its own relations in `Meta`:
+        - select_related: forward foreign keys rendered by the serializer.
+        - prefetch_related: many-valued relations (M2M, reverse foreign keys).
+
+    Nested serializers that use this mixin contribute their paths automatically,
+    prefixed with the source of the field they are nested under. A nested
+    serializer reached through a prefetched relation has all of its paths
+    prefetched too.
+
+    Aggregates rendered by the serializer are declared in `Meta.annotations`
+    (name -> expression) and only added when a field reads them.
+
+    Only relations that are actually rendered are loaded: a relation rendered as
+    a primary key (see SparseFieldsetsMixin) reads the foreign key column or a
+    prefetch of IDs instead of joining the full row. When the serializer is in
+    sparse mode the selected columns are also restricted with `.only()`.
+
+    Example:
+        class ProjectSerializer(EagerLoadingMixin, serializers.ModelSerializer):
+            owner = UserSerializer(read_only=True)
+            ...
+            class Meta:
+                select_related = ['owner']
+                prefetch_related = ['users', 'task_set']
+    """
+
+    def get_eager_loading(self):
+        """
+        Returns the loading plan for this serializer as a tuple of
+        (select_related paths, Prefetch objects, `.only()` columns or None,
+        annotations).
+        """
+        meta = self.Meta
+        model = meta.model
+        declared_select = set(getattr(meta, "select_related", ()))
+        declared_annotations = getattr(meta, "annotations", {})
+        select, prefetch, only, annotations = [], [], [model._meta.pk.name], {}
+
+        for field in readable_fields(self):
+            if field.source == "*":
+                only = None
+                continue
+
+            name = field.source.split(".")[0]
+            if name in declared_annotations:
+                annotations[name] = declared_annotations[name]
+                continue
+
+            relation = get_relation(model, name)
+            nested = getattr(field, "child", field)
+
+            if isinstance(nested, EagerLoadingMixin):
+                nested_select, nested_prefetch, nested_only, nested_annotations = nested.get_eager_loading()
+                if name in declared_select and not nested_annotations:
+                    select += [name] + [f"{name}__{path}" for path in nested_select]
+                    prefetch += [_with_prefix(lookup, name) for lookup in nested_prefetch]
+                    if nested_only is None:
+                        only = None
+                        continue
+                    columns = [name] + [f"{name}__{column}" for column in nested_only]
+                else:
+                    # Annotated relations cannot be joined in, so they are
+                    # prefetched with their own (aggregating) query.
+                    queryset = _apply_plan(
+                        nested.Meta.model._default_manager.all(),
+                        nested_select, nested_prefetch, _with_join_columns(relation, nested_only),
+                        nested_annotations,
+                    )
+                    prefetch.append(Prefetch(name, queryset=queryset))
+                    columns = [name] if _is_column(relation) else []
+            elif isinstance(field, ManyRelatedField) and relation is not None:
+                # Many-valued relation rendered as primary keys: prefetch the IDs only.
+                related_model = relation.related_model
+                queryset = related_model._default_manager.only(
+                    *_with_join_columns(relation, [related_model._meta.pk.name])
+                )
+                prefetch.append(Prefetch(name, queryset=queryset))
+                continue
+            elif relation is not None:
+                columns = [name] if _is_column(relation) else []
+            elif _is_concrete(model, name):
+                columns = [name]
+            elif hasattr(model, name):
+                # Properties and methods may read any column, so load the full row.
+                only = None
+                continue
+            else:
+                # Annotations are computed by the query itself.
+                continue
+
+            if only is not None:
+                only += columns
+
+        only = _unique(only) if self.is_sparse() and only is not None else None
+        return _unique(select), prefetch, only, annotations
+
+    def is_sparse(self):
+        """
+        Whether the serializer renders a subset of its fields (see SparseFieldsetsMixin).
+        """
+        return False
+
+
+def readable_fields(serializer):
+    """
+    Yields the readable fields of `serializer`, flattening plain nested
+    serializers declared with `source='*'` (they render the same object).
+    """
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == "*" and isinstance(field, serializers.Serializer) \
+                and not isinstance(field, serializers.ModelSerializer):
+            yield from readable_fields(field)
+        else:
+            yield field
+
+
+def get_relation(model, name):
+    """
+    Returns the relation field or reverse relation named `name` (accessor names
+    such as `task_set` included), or None if `name` is not a relation.
+    """
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        field = next(
+            (rel for rel in model._meta.related_objects if rel.get_accessor_name() == name),
+            None,
+        )
+    if field is None or not field.is_relation:
+        return None
+    return field
+
+
+def apply_eager_loading(queryset, serializer):
+    """
+    Applies the loading plan declared by `serializer` to `queryset`.
+
+    Args:
+        queryset: QuerySet of the serializer's model.
+        serializer: Serializer instance (or ListSerializer) that will render the rows.
+
+    Returns:
+        QuerySet: The queryset with select_related/prefetch_related (and `.only()`
+        in sparse mode) applied. Serializing any number of rows then costs a
+        constant number of queries.
+    """
+    serializer = getattr(serializer, "child", serializer)
+    if not isinstance(serializer, EagerLoadingMixin):
+        return queryset
+
+    return _apply_plan(queryset, *serializer.get_eager_loading())
+
+
+class EagerLoadingViewSetMixin:
+    """
+    ViewSet mixin that eager-loads the relations declared by the serializer
+    for read requests (list and retrieve).
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method in SAFE_METHODS:
+            queryset = apply_eager_loading(queryset, self.get_serializer())
+        return queryset
+
+
+def _apply_plan(queryset, select, prefetch, only, annotations):
+    annotations = {
+        name: expression for name, expression in annotations.items()
+        if name not in queryset.query.annotations
+    }
+    if annotations:
+        queryset = queryset.annotate(**annotations)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    if only is not None:
+        queryset = queryset.only(*only)
+    return queryset
+
+
+def _with_prefix(lookup, prefix):
+    lookup = copy.copy(lookup)
+    lookup.add_prefix(prefix)
+    return lookup
+
+
+def _with_join_columns(relation, only):
+    # Reverse foreign keys are matched back to their parent through the
+    # foreign key column, so it has to be loaded alongside the selected columns.
+    if only is None or relation is None or not relation.one_to_many:
+        return only
+    return list(only) + [relation.field.name]
+
+
+def _is_column(relation):
+    return relation.concrete and (relation.many_to_one or relation.one_to_one)
+
+
+def _is_concrete(model, name):
+    try:
+        return model._meta.get_field(name).concrete
+    except FieldDoesNotExist:
+        return False
+
+
+def _unique(paths):
+    return list(dict.fromkeys(paths))
@@ -0,0 +1,207 @@
+import asyncio
+import json
+import logging
+import threading
+import weakref
+
+from django.conf import settings
+from django.db import transaction
+
+from accounts.models import Role
+
+logger = logging.getLogger(__name__)
+
+EVENTS_CHANNEL = "task_tracker:events"
+
+# Pending batches per subscriber; a subscriber that falls further behind gets
+# RESET instead and must refresh (e.g. through GET /api/tasks/changes/).
+SUBSCRIPTION_QUEUE_SIZE = 256
+
+# Delivered instead of the batches a subscriber missed.
+RESET = "reset"
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def publish(events):
+    """
+    Publishes a list of change events to every subscriber, once the current
+    transaction commits (at once outside transactions; never on rollback).
+
+    Events are dicts with:
+        - type / action / id: What changed, e.g. `{"type": "task", "action":
+          "updated", "id": 7}`. Sent to clients as is.
+        - audience: Who may see the event, `{role name: [user IDs], "any":
+          [user IDs]}`; admins see every event. Never sent to clients.
+
+    One call is one message on the broker, so writes of many rows should
+    publish their events together.
+    """
+    events = list(events)
+    if not events:
+        return
+    transaction.on_commit(lambda: _publish(events))
+
+
+def _publish(events):
+    try:
+        get_broker().publish(events)
+    except Exception:
+        # Subscribers catch up through the change feed; never fail the write.
+        logger.exception("Could not publish %d change events", len(events))
+
+
+def event_audience(**users):
+    """
+    Builds the `audience` of an event from role names (or "any") to user IDs,
+    dropping empty IDs, e.g. `event_audience(read_only=[owner_id, None])`.
+    """
+    return {role: sorted({pk for pk in pks if pk is not None}) for role, pks in users.items()}
+
+
+def is_visible(event, user_id, role_names):
+    """
+    Returns True if a user with `role_names` may see `event`.
+    """
+    if Role.ADMIN in role_names:
+        return True
+    audience = event.get("audience", {})
+    return user_id in audience.get("any", ()) or any(
+        user_id in audience.get(role, ()) for role in role_names
+    )
+
+
+def get_broker():
+    """
+    Returns the process-wide broker: RedisBroker when `EVENTS_REDIS_URL` is
+    set, so every worker receives the events of every other worker, and
+    LocalBroker (this process only) otherwise.
+    """
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                url = getattr(settings, "EVENTS_REDIS_URL", None)
+                _broker = RedisBroker(url) if url else LocalBroker()
+    return _broker
+
+
+class Subscription:
+    """
+    The event batches of one subscriber, read with `await get()`.
+
+    Batches are handed over to the subscriber's event loop from any thread, so
+    sync views and signal handlers can publish directly. An idle subscription
+    is an empty asyncio.Queue and a set entry.
+    """
+
+    def __init__(self, broker, loop, maxsize=SUBSCRIPTION_QUEUE_SIZE):
+        self.broker = broker
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+
+    def put(self, batch):
+        self.loop.call_soon_threadsafe(self._put, batch)
+
+    def _put(self, batch):
+        try:
+            self.queue.put_nowait(batch)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESET)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    """
+    Fan-out of published events to the subscriptions of this process.
+
+    Subscriptions are weakly referenced: a stream dropped without closing its
+    subscription stops receiving events once it is garbage collected.
+    """
+
+    def __init__(self):
+        self.subscriptions = weakref.WeakSet()
+        self.lock = threading.Lock()
+
+    def publish(self, events):
+        self.deliver(events)
+
+    def deliver(self, batch):
+        with self.lock:
+            subscriptions = list(self.subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.put(batch)
+            except RuntimeError:
+                # Its event loop is closed.
+                self.unsubscribe(subscription)
+
+    def subscribe(self):
+        """
+        Returns a new Subscription bound to the running event loop.
+        """
+        subscription = Subscription(self, asyncio.get_running_loop())
+        with self.lock:
+            self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscriptions.discard(subscription)
+
+
+class RedisBroker(LocalBroker):
+    """
+    Publishes through Redis pub/sub. Each process holds one Redis subscription,
+    started with its first subscriber, and fans the messages out to its own
+    subscriptions like LocalBroker; thousands of open streams cost one Redis
+    connection.
+
+    Subscribers get RESET after the Redis connection drops, since messages
+    published meanwhile are lost.
+    """
+    reconnect_delay = 1
+
+    def __init__(self, url):
+        super().__init__()
+        self.url = url
+        self.client = None
+        self.listener = None
+
+    def publish(self, events):
+        if self.client is None:
+            import redis
+
+            self.client = redis.Redis.from_url(self.url)
+        self.client.publish(EVENTS_CHANNEL, json.dumps(events, separators=(",", ":")))
+
+    def subscribe(self):
+        subscription = super().subscribe()
+        if self.listener is None or self.listener.done():
+            self.listener = asyncio.get_running_loop().create_task(self.listen())
+        return subscription
+
+    async def listen(self):
+        import redis.asyncio
+
+        client = redis.asyncio.Redis.from_url(self.url)
+        while True:
+            try:
+                async with client.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    await pubsub.subscribe(EVENTS_CHANNEL)
+                    async for message in pubsub.listen():
+                        self.deliver(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Lost the Redis event subscription")
+                self.deliver(RESET)
+                await asyncio.sleep(self.reconnect_delay)
@@ -0,0 +1,420 @@
+import json
+from collections import OrderedDict, defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import ForeignObjectRel
+from django.http import Http404
+from rest_framework import fields as drf_fields
+from rest_framework import serializers
+from rest_framework.permissions import BasePermission
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField, RelatedField
+from rest_framework.response import Response
+from rest_framework.settings import ISO_8601, api_settings
+
+from .eager_loading import get_relation
+from .timing import measure_serialization
+
+# Serializer fields whose `to_representation` returns database values of these
+# model field types unchanged, so the compiled mapper can copy them as-is.
+IDENTITY_FIELDS = {
+    drf_fields.CharField: {"CharField", "TextField", "EmailField", "SlugField"},
+    drf_fields.EmailField: {"CharField", "EmailField"},
+    drf_fields.ChoiceField: {"CharField"},
+    drf_fields.IntegerField: {
+        "AutoField", "BigAutoField", "SmallAutoField", "IntegerField", "BigIntegerField",
+        "SmallIntegerField", "PositiveIntegerField", "PositiveBigIntegerField", "PositiveSmallIntegerField",
+    },
+    drf_fields.ReadOnlyField: None,
+}
+
+MAX_COMPILED_MAPPERS = 256
+_compiled = OrderedDict()
+
+
+class Uncompilable(Exception):
+    """
+    Raised when a serializer uses a field the row mapper cannot reproduce exactly.
+    """
+
+
+class ManyLoader:
+    """
+    Loads a many-valued relation (M2M or reverse foreign key) for a batch of
+    parent rows with one `IN` query, grouped by parent primary key.
+    """
+
+    def __init__(self, key_index, relation, mapper):
+        self.key_index = key_index
+        self.related_model = relation.related_model
+        # Lookup from the related model back to the parent.
+        if isinstance(relation, ForeignObjectRel):
+            self.back = relation.field.name
+        else:
+            self.back = relation.related_query_name()
+        self.mapper = mapper
+
+    def load(self, rows):
+        queryset = self.related_queryset(rows)
+        if queryset is None:
+            return {}
+        related_rows = list(queryset)
+        if self.mapper:
+            values = self.mapper.map_rows([row[1:] for row in related_rows])
+        else:
+            values = [row[1] for row in related_rows]
+        return self.group(related_rows, values)
+
+    async def aload(self, rows):
+        """
+        load() through the async ORM.
+        """
+        queryset = self.related_queryset(rows)
+        if queryset is None:
+            return {}
+        related_rows = [row async for row in queryset]
+        if self.mapper:
+            values = await self.mapper.amap_rows([row[1:] for row in related_rows])
+        else:
+            values = [row[1] for row in related_rows]
+        return self.group(related_rows, values)
+
+    def related_queryset(self, rows):
+        """
+        Returns the values_list() queryset of the related rows of `rows`, led by
+        the parent key, or None when no row has a key.
+        """
+        keys = {row[self.key_index] for row in rows}
+        keys.discard(None)
+        if not keys:
+            return None
+
+        queryset = self.related_model._default_manager.filter(**{f"{self.back}__in": keys})
+        if self.mapper:
+            return self.mapper.values_queryset(queryset, self.back)
+        return queryset.values_list(self.back, self.related_model._meta.pk.name)
+
+    def group(self, related_rows, values):
+        grouped = defaultdict(list)
+        for row, value in zip(related_rows, values):
+            grouped[row[0]].append(value)
+        return grouped
+
+
+class ForwardLoader:
+    """
+    Loads a forward relation rendered by an annotated serializer (annotations
+    cannot be computed through a join) for a batch of parent rows with one
+    `IN` query, keyed by the related primary key.
+    """
+
+    def __init__(self, key_index, relation, mapper):
+        self.key_index = key_index
+        self.related_model = relation.related_model
+        self.mapper = mapper
+
+    def load(self, rows):
+        queryset = self.related_queryset(rows)
+        if queryset is None:
+            return {}
+        related_rows = list(queryset)
+        # The primary key is always the first column of a compiled mapper.
+        return {row[0]: value for row, value in zip(related_rows, self.mapper.map_rows(related_rows))}
+
+    async def aload(self, rows):
+        """
+        load() through the async ORM.
+        """
+        queryset = self.related_queryset(rows)
+        if queryset is None:
+            return {}
+        related_rows = [row async for row in queryset]
+        return {row[0]: value for row, value in zip(related_rows, await self.mapper.amap_rows(related_rows))}
+
+    def related_queryset(self, rows):
+        keys = {row[self.key_index] for row in rows}
+        keys.discard(None)
+        if not keys:
+            return None
+        return self.mapper.values_queryset(self.related_model._default_manager.filter(pk__in=keys))
+
+
+class RowMapper:
+    """
+    Precompiled read-only representation of a serializer.
+
+    `columns` lists the `values_list()` lookups needed to render one object
+    (forward relations are flattened into joined columns), and `map_row` is a
+    generated function that turns one tuple into the same dict the serializer
+    would produce. Many-valued relations are loaded in batches by ManyLoader.
+    `annotations` holds the aggregates some of the columns are read from.
+    """
+
+    def __init__(self, columns, source, namespace, loaders, annotations=None):
+        self.columns = columns
+        self.loaders = loaders
+        self.annotations = annotations or {}
+        self.source = source
+        exec(compile(source, "<row mapper>", "exec"), namespace)
+        self.map_row = namespace["map_row"]
+
+    def values_queryset(self, queryset, *leading):
+        """
+        Returns `queryset` as a values_list() queryset of this mapper's columns,
+        preceded by the `leading` lookups if any.
+        """
+        annotations = {
+            name: expression for name, expression in self.annotations.items()
+            if name not in queryset.query.annotations
+        }
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+        # Other annotations (e.g. search relevance) stay selectable as trailing
+        # columns, which the generated function never reads.
+        extra = [name for name in queryset.query.annotation_select if name not in self.columns]
+        return queryset.prefetch_related(None).values_list(*leading, *self.columns, *extra)
+
+    def map_rows(self, rows):
+        """
+        Maps a list of `values_list()` tuples to representation dicts.
+        """
+        many = [loader.load(rows) for loader in self.loaders]
+        map_row = self.map_row
+        with measure_serialization():
+            return [map_row(row, many) for row in rows]
+
+    async def amap_rows(self, rows):
+        """
+        map_rows() loading the many-valued relations through the async ORM.
+        """
+        many = [await loader.aload(rows) for loader in self.loaders]
+        map_row = self.map_row
+        with measure_serialization():
+            return [map_row(row, many) for row in rows]
+
+    def serialize(self, queryset):
+        return self.map_rows(list(self.values_queryset(queryset)))
+
+
+class _Compiler:
+    def __init__(self):
+        self.columns = []
+        self.index = {}
+        self.loaders = []
+        self.namespace = {}
+        self.annotations = {}
+
+    def column(self, lookup):
+        """
+        Returns the tuple index of a values_list() lookup, adding it if needed.
+        """
+        if lookup not in self.index:
+            self.index[lookup] = len(self.columns)
+            self.columns.append(lookup)
+        return self.index[lookup]
+
+    def constant(self, value):
+        name = f"_c{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def serializer(self, serializer, prefix=""):
+        """
+        Returns a Python expression building the dict for `serializer`.
+        """
+        if type(serializer).to_representation is not serializers.Serializer.to_representation:
+            raise Uncompilable(f"{type(serializer).__name__} overrides to_representation()")
+
+        model = serializer.Meta.model
+        pk = self.column(prefix + model._meta.pk.name)
+        return self.fields(serializer, model, getattr(serializer.Meta, "annotations", {}), prefix, pk)
+
+    def fields(self, serializer, model, annotations, prefix, pk):
+        items = []
+        for field in serializer.fields.values():
+            if field.write_only:
+                continue
+            items.append(f"{field.field_name!r}: {self.field(field, model, annotations, prefix, pk)}")
+        return "{" + ", ".join(items) + "}"
+
+    def field(self, field, model, annotations, prefix, pk):
+        source = field.source
+        if source == "*" and isinstance(field, serializers.Serializer) \
+                and not isinstance(field, serializers.ModelSerializer):
+            # A plain serializer over the same object renders more columns of this row.
+            if type(field).to_representation is not serializers.Serializer.to_representation:
+                raise Uncompilable(f"{type(field).__name__} overrides to_representation()")
+            return self.fields(field, model, annotations, prefix, pk)
+        if source == "*" or "." in source:
+            raise Uncompilable(f"Field '{field.field_name}' has source '{source}'")
+        if source in annotations:
+            if prefix:
+                raise Uncompilable(f"Field '{field.field_name}' reads an annotation through a join")
+            self.annotations[source] = annotations[source]
+            value = f"row[{self.column(source)}]"
+            return f"(None if {value} is None else {self.constant(field.to_representation)}({value}))"
+        relation = get_relation(model, source)
+
+        if isinstance(field, serializers.ListSerializer) or isinstance(field, ManyRelatedField):
+            if relation is None or not (relation.many_to_many or relation.one_to_many):
+                raise Uncompilable(f"Field '{field.field_name}' is not a many-valued relation")
+            if isinstance(field, ManyRelatedField):
+                self._check_primary_key_field(field.child_relation)
+                mapper = None
+            else:
+                mapper = compile_serializer(field.child, cache=False)
+            self.loaders.append(ManyLoader(pk, relation, mapper))
+            return f"many[{len(self.loaders) - 1}].get(row[{pk}], [])"
+
+        if isinstance(field, serializers.BaseSerializer):
+            if relation is None or not (relation.many_to_one or relation.one_to_one) or not relation.concrete:
+                raise Uncompilable(f"Field '{field.field_name}' is not a forward relation")
+            if getattr(field.Meta, "annotations", None):
+                mapper = compile_serializer(field, cache=False)
+                if mapper.annotations:
+                    self.loaders.append(ForwardLoader(self.column(prefix + source), relation, mapper))
+                    return f"many[{len(self.loaders) - 1}].get(row[{self.column(prefix + source)}])"
+            nested_prefix = f"{prefix}{source}__"
+            nested_pk = self.column(nested_prefix + relation.related_model._meta.pk.name)
+            return f"(None if row[{nested_pk}] is None else {self.serializer(field, nested_prefix)})"
+
+        if isinstance(field, RelatedField):
+            self._check_primary_key_field(field)
+            if relation is None or not relation.concrete:
+                raise Uncompilable(f"Field '{field.field_name}' is not a forward relation")
+            return f"row[{self.column(prefix + source)}]"
+
+        if isinstance(field, (serializers.SerializerMethodField, serializers.HiddenField)) or \
+                type(field).get_attribute is not drf_fields.Field.get_attribute:
+            raise Uncompilable(f"Field '{field.field_name}' needs the model instance")
+        if relation is not None:
+            raise Uncompilable(f"Field '{field.field_name}' renders a relation")
+
+        value = f"row[{self.column(prefix + source)}]"
+        model_field = _concrete_field(model, source)
+        identity_types = IDENTITY_FIELDS.get(type(field), ())
+        if type(field) in IDENTITY_FIELDS and (
+            identity_types is None or (model_field is not None and model_field.get_internal_type() in identity_types)
+        ):
+            expression = value
+        elif _is_iso_date(field, model_field):
+            # What DateField.to_representation() returns for ISO 8601 dates.
+            expression = f"{value}.isoformat()"
+        else:
+            expression = f"{self.constant(field.to_representation)}({value})"
+
+        if model_field is not None and not model_field.null and expression == value:
+            return value
+        return f"(None if {value} is None else {expression})"
+
+    def _check_primary_key_field(self, field):
+        if type(field) is not PrimaryKeyRelatedField or field.pk_field is not None:
+            raise Uncompilable(f"{type(field).__name__} is not a plain primary key field")
+
+
+def compile_serializer(serializer, cache=True):
+    """
+    Compiles a (bound) serializer instance into a RowMapper.
+
+    The mapper honours the serializer's current field set, so sparse fieldsets
+    compile to smaller mappers. Compiled mappers are cached per serializer class
+    and sparse spec.
+
+    Raises:
+        Uncompilable: If a field cannot be reproduced exactly from column values.
+    """
+    serializer = getattr(serializer, "child", serializer)
+    key = None
+    if cache:
+        spec = serializer.get_sparse_spec() if hasattr(serializer, "get_sparse_spec") else None
+        key = (type(serializer), json.dumps(spec, sort_keys=True))
+        if key in _compiled:
+            _compiled.move_to_end(key)
+            return _compiled[key]
+
+    compiler = _Compiler()
+    expression = compiler.serializer(serializer)
+    source = f"def map_row(row, many):\n    return {expression}\n"
+    mapper = RowMapper(compiler.columns, source, compiler.namespace, compiler.loaders, compiler.annotations)
+
+    if key is not None:
+        _compiled[key] = mapper
+        if len(_compiled) > MAX_COMPILED_MAPPERS:
+            _compiled.popitem(last=False)
+    return mapper
+
+
+def get_row_mapper(serializer):
+    """
+    Returns the compiled RowMapper for `serializer`, or None when fast
+    serializers are disabled or the serializer does not compile.
+    """
+    if not getattr(settings, "FAST_SERIALIZERS", True):
+        return None
+    try:
+        return compile_serializer(serializer)
+    except Uncompilable:
+        return None
+
+
+class FastReadViewSetMixin:
+    """
+    ViewSet mixin serving list/retrieve through a compiled RowMapper.
+
+    Rows are read with `values_list()` and mapped to dicts by a generated
+    function instead of going through DRF field dispatch for every value. The
+    output is identical to the serializer's. Serializers the compiler cannot
+    handle, or views with object-level permissions, use the regular path.
+
+    Disable with `FAST_SERIALIZERS=0` in the environment.
+    """
+
+    def get_row_mapper(self):
+        return get_row_mapper(self.get_serializer())
+
+    def list(self, request, *args, **kwargs):
+        mapper = self.get_row_mapper()
+        if mapper is None:
+            return super().list(request, *args, **kwargs)
+
+        rows = mapper.values_queryset(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(mapper.map_rows(page))
+        return Response(mapper.map_rows(list(rows)))
+
+    def retrieve(self, request, *args, **kwargs):
+        mapper = self.get_row_mapper()
+        if mapper is None or self._has_object_permissions():
+            return super().retrieve(request, *args, **kwargs)
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset())
+        try:
+            rows = list(mapper.values_queryset(
+                queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+            )[:1])
+        except (TypeError, ValueError, DjangoValidationError):
+            # A malformed lookup value, as in DRF's get_object_or_404().
+            rows = []
+        if not rows:
+            raise Http404(f"No {queryset.model._meta.object_name} matches the given query.")
+        return Response(mapper.map_rows(rows)[0])
+
+    def _has_object_permissions(self):
+        return any(
+            type(permission).has_object_permission is not BasePermission.has_object_permission
+            for permission in self.get_permissions()
+        )
+
+
+def _is_iso_date(field, model_field):
+    return (
+        type(field) is drf_fields.DateField and model_field is not None
+        and model_field.get_internal_type() == "DateField"
+        and str(getattr(field, "format", api_settings.DATE_FORMAT)).lower() == ISO_8601
+    )
+
+
+def _concrete_field(model, name):
+    return next((f for f in model._meta.concrete_fields if f.name == name or f.attname == name), None)
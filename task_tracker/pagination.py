@@ -0,0 +1,281 @@
+import json
+from base64 import b64decode, b64encode
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from django.db.models.query import ValuesListIterable
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .search import RELEVANCE
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over a fixed set of stable orderings.
+
+    Each page is selected with a `WHERE (due_date, id) > (...)` style condition
+    on the last row of the previous page instead of an OFFSET, so page N costs
+    the same as page 1, and no `COUNT(*)` is run. Every ordering ends with the
+    primary key, which makes positions unique.
+
+    Works with model instances as well as `values_list()` rows (as read by
+    FastReadViewSetMixin); ordering columns missing from a values_list() are
+    appended after the selected ones.
+
+    Query Parameters:
+        - cursor: Opaque position returned in `next`/`previous`.
+        - page_size: Number of rows per page (default 50, at most 200).
+        - ordering: One of `orderings`, optionally reversed with `-` on every
+          field (e.g. `-due_date,-id`). Defaults to the first one, or to the
+          most relevant first for `?q=` searches.
+
+    Example response:
+    {
+        "next": "https://api.example.com/api/tasks/?cursor=eyJwIjpbIjIwMjUtMDYtMTUiLDEwMV19&ordering=due_date%2Cid",
+        "previous": null,
+        "results": [...]
+    }
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    ordering_query_param = 'ordering'
+    page_size = 50
+    max_page_size = 200
+    orderings = ['id']
+
+    invalid_cursor_message = 'Invalid cursor'
+    invalid_ordering_message = 'Invalid ordering "{ordering}". Expected one of: {choices}.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.paginate_rows(list(self.get_page_queryset(queryset, request)))
+
+    def get_page_queryset(self, queryset, request):
+        """
+        Returns the sliced queryset of the requested page, with one extra row
+        that tells whether another page follows. Pass the fetched rows to
+        paginate_rows() (async views fetch them with the async ORM).
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset)
+        self.reverse, position = self.decode_cursor(request)
+
+        self.position = position
+
+        fields = [field.lstrip('-') for field in self.ordering]
+        descending = self.ordering[0].startswith('-') != self.reverse
+        queryset, self.row_index = with_ordering_columns(queryset, fields)
+        queryset = queryset.order_by(*[('-' if descending else '') + field for field in fields])
+        if position is not None:
+            queryset = queryset.filter(self.after(queryset, fields, position, descending))
+        return queryset[:self.page_size + 1]
+
+    def paginate_rows(self, rows):
+        """
+        Returns the page from the rows of get_page_queryset(), and records the
+        positions of its next/previous links.
+        """
+        position = self.position
+        fields = [field.lstrip('-') for field in self.ordering]
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if self.reverse:
+            rows.reverse()
+
+        self.has_next = has_more if not self.reverse else position is not None
+        self.has_previous = position is not None if not self.reverse else has_more
+        self.first_position = self.encode_position(rows[0], fields) if rows else position
+        self.last_position = self.encode_position(rows[-1], fields) if rows else position
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param], strict=True, cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_ordering(self, request, queryset=None):
+        """
+        Returns the requested ordering as a list of (optionally `-` prefixed) fields.
+
+        Search results (querysets annotated with `relevance`, see
+        FullTextSearchFilter) default to the most relevant first.
+        """
+        value = request.query_params.get(self.ordering_query_param)
+        if not value and queryset is not None and RELEVANCE in queryset.query.annotations:
+            return ['-' + RELEVANCE, '-' + queryset.model._meta.pk.name]
+        value = value or self.orderings[0]
+        choices = {ordering: ordering.split(',') for ordering in self.orderings}
+        choices.update({
+            ','.join('-' + field for field in fields): ['-' + field for field in fields]
+            for fields in list(choices.values())
+        })
+        if value not in choices:
+            raise ValidationError({self.ordering_query_param: [
+                self.invalid_ordering_message.format(ordering=value, choices=', '.join(choices))
+            ]})
+        return choices[value]
+
+    def decode_cursor(self, request):
+        """
+        Returns (reverse, position) for the cursor in the request, position being
+        None on the first page.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return False, None
+        try:
+            cursor = json.loads(b64decode(encoded.encode('ascii')).decode('utf-8'))
+            position, reverse = cursor['p'], bool(cursor.get('r'))
+            if not isinstance(position, list) or len(position) != len(self.ordering):
+                raise ValueError
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        return reverse, position
+
+    def encode_cursor(self, position, reverse):
+        cursor = {'p': position}
+        if reverse:
+            cursor['r'] = 1
+        encoded = b64encode(json.dumps(cursor, separators=(',', ':')).encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def encode_position(self, row, fields):
+        values = row_position(row, fields, self.row_index)
+        return [value.isoformat() if hasattr(value, 'isoformat') else value for value in values]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.last_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.first_position is None:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.first_position, reverse=True)
+
+    def after(self, queryset, fields, position, descending):
+        annotations = queryset.query.annotations
+        try:
+            values = [
+                (annotations[field].output_field if field in annotations else queryset.model._meta.get_field(field))
+                .to_python(value)
+                for field, value in zip(fields, position)
+            ]
+        except (DjangoValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        return keyset_condition(fields, values, descending)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {'name': self.cursor_query_param, 'required': False, 'in': 'query',
+             'schema': {'type': 'string'}},
+            {'name': self.page_size_query_param, 'required': False, 'in': 'query',
+             'schema': {'type': 'integer'}},
+            {'name': self.ordering_query_param, 'required': False, 'in': 'query',
+             'schema': {'type': 'string', 'enum': self.orderings}},
+        ]
+
+
+def with_ordering_columns(queryset, fields):
+    """
+    Returns (queryset, row_index). For values_list() querysets, ordering columns
+    that were not selected are appended after the selected ones (rows are read
+    by position, so the extra trailing columns are harmless) and `row_index`
+    maps each column to its position; it is None for other querysets.
+    """
+    if queryset._iterable_class is not ValuesListIterable:
+        return queryset, None
+    missing = [field for field in fields if field not in queryset._fields]
+    if missing:
+        queryset = queryset.values_list(*queryset._fields, *missing)
+    return queryset, {name: index for index, name in enumerate(queryset._fields)}
+
+
+def row_position(row, fields, row_index=None):
+    """
+    Returns the values of the ordering `fields` of a model instance, dict or
+    values_list() row.
+    """
+    if row_index is not None:
+        return [row[row_index[field]] for field in fields]
+    if isinstance(row, dict):
+        return [row[field] for field in fields]
+    return [getattr(row, field) for field in fields]
+
+
+def keyset_condition(fields, values, descending=False):
+    """
+    Returns the condition selecting rows strictly after the position `values`
+    in the ordering `fields`: `(a > x) OR (a = x AND b > y) OR ...` (or `<`
+    when descending).
+    """
+    lookup = 'lt' if descending else 'gt'
+    condition = Q()
+    for index, field in enumerate(fields):
+        equal = {fields[i]: values[i] for i in range(index)}
+        condition |= Q(**equal, **{f'{field}__{lookup}': values[index]})
+    return condition
+
+
+def keyset_chunks(queryset, ordering, chunk_size):
+    """
+    Yields the rows of `queryset` in lists of up to `chunk_size`, walking the
+    ordering (fields, all ascending or all `-` descending, ending with the
+    primary key) with one keyset query per chunk.
+
+    Unlike `QuerySet.iterator()`, this never holds more than one chunk in the
+    database driver either (the MySQL drivers buffer whole result sets), and
+    every chunk query is an index range scan.
+    """
+    fields = [field.lstrip('-') for field in ordering]
+    descending = ordering[0].startswith('-')
+    queryset, row_index = with_ordering_columns(queryset, fields)
+    queryset = queryset.order_by(*ordering)
+    position = None
+    while True:
+        chunk = queryset if position is None else queryset.filter(keyset_condition(fields, position, descending))
+        rows = list(chunk[:chunk_size])
+        if rows:
+            yield rows
+        if len(rows) < chunk_size:
+            return
+        position = row_position(rows[-1], fields, row_index)
+
+
+class TaskPagination(KeysetPagination):
+    orderings = ['id', 'due_date,id', 'status,id']
+
+
+class ProjectPagination(KeysetPagination):
+    orderings = ['id']
+
+
+class UserPagination(KeysetPagination):
+    orderings = ['id']
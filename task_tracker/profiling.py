@@ -0,0 +1,240 @@
+import cProfile
+import datetime
+import json
+import os
+import pstats
+import re
+import secrets
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from rest_framework import exceptions
+
+from accounts.authentication import authenticate_request
+from accounts.models import Role
+
+HEADER = "HTTP_X_PROFILE"
+QUERY_FLAG = "profile"
+PROFILE_ID = re.compile(r"^\d{8}T\d{6}-[0-9a-f]{8}$")
+TOP_FUNCTIONS = 30
+TOP_ALLOCATIONS = 25
+
+# cProfile and tracemalloc are process wide: one profile at a time.
+_lock = threading.Lock()
+
+
+def requested(request):
+    """
+    Whether the request asks to be profiled (`X-Profile: 1` or `?profile=1`).
+    The query string is only parsed when it mentions the flag.
+    """
+    if HEADER in request.META:
+        return request.META[HEADER] == "1"
+    query = request.META.get("QUERY_STRING", "")
+    return f"{QUERY_FLAG}=" in query and request.GET.get(QUERY_FLAG) == "1"
+
+
+def get_admin(request):
+    """
+    Returns the user authenticated by the request's `Authorization` header if
+    they have the 'admin' role, else None.
+    """
+    try:
+        result = authenticate_request(request)
+    except exceptions.APIException:
+        return None
+    if result is None or Role.ADMIN not in result[2]:
+        return None
+    return result[0]
+
+
+class Profile:
+    """
+    cProfile and tracemalloc around one request.
+    """
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.tracing = tracemalloc.is_tracing()
+
+    def start(self):
+        if not self.tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self.started_at = time.perf_counter()
+        self.profiler.enable()
+
+    def stop(self):
+        self.profiler.disable()
+        self.duration = time.perf_counter() - self.started_at
+        self.snapshot = tracemalloc.take_snapshot()
+        self.peak = tracemalloc.get_traced_memory()[1]
+        if not self.tracing:
+            tracemalloc.stop()
+
+    def save(self, request, response, user):
+        """
+        Writes `<id>.prof` (pstats, for snakeviz or `python -m pstats`) and
+        `<id>.json` (summary, top functions and allocation sites) to
+        PROFILE_DIR, drops the oldest profiles beyond PROFILE_KEEP, and returns
+        the id.
+        """
+        directory = Path(settings.PROFILE_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        now = datetime.datetime.now(datetime.timezone.utc)
+        profile_id = f"{now:%Y%m%dT%H%M%S}-{secrets.token_hex(4)}"
+
+        self.profiler.dump_stats(directory / f"{profile_id}.prof")
+        summary = {
+            "id": profile_id,
+            "created_at": now.isoformat(),
+            "method": request.method,
+            "path": request.get_full_path(),
+            "status": response.status_code,
+            "user_id": user.pk,
+            "duration_ms": round(self.duration * 1000, 3),
+            "peak_memory_bytes": self.peak,
+            "functions": self.top_functions(),
+            "allocations": self.top_allocations(),
+        }
+        with open(directory / f"{profile_id}.json", "w") as file:
+            json.dump(summary, file, indent=2)
+        prune(directory)
+        return profile_id
+
+    def top_functions(self):
+        stats = pstats.Stats(self.profiler)
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:TOP_FUNCTIONS]
+        return [
+            {
+                "function": f"{filename}:{line}({name})",
+                "calls": calls,
+                "total_ms": round(total * 1000, 3),
+                "cumulative_ms": round(cumulative * 1000, 3),
+            }
+            for (filename, line, name), (_, calls, total, cumulative, _) in rows
+        ]
+
+    def top_allocations(self):
+        snapshot = self.snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, cProfile.__file__),
+        ))
+        return [
+            {"site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}", "bytes": stat.size, "count": stat.count}
+            for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]
+        ]
+
+
+def prune(directory):
+    summaries = sorted(directory.glob("*.json"), key=lambda path: path.name, reverse=True)
+    for summary in summaries[settings.PROFILE_KEEP:]:
+        summary.unlink(missing_ok=True)
+        summary.with_suffix(".prof").unlink(missing_ok=True)
+
+
+def list_profiles():
+    """
+    Returns the summaries of the stored profiles, newest first, without their
+    function and allocation tables.
+    """
+    directory = Path(settings.PROFILE_DIR)
+    if not directory.is_dir():
+        return []
+    profiles = []
+    for path in sorted(directory.glob("*.json"), key=lambda path: path.name, reverse=True):
+        try:
+            with open(path) as file:
+                summary = json.load(file)
+        except (OSError, ValueError):
+            continue
+        profiles.append({key: value for key, value in summary.items() if key not in ("functions", "allocations")})
+    return profiles
+
+
+def profile_path(profile_id, suffix):
+    """
+    Returns the path of a stored profile file (`.json` or `.prof`), or None
+    when the id is malformed or unknown.
+    """
+    if not PROFILE_ID.match(profile_id):
+        return None
+    path = Path(settings.PROFILE_DIR) / f"{profile_id}{suffix}"
+    return path if os.path.isfile(path) else None
+
+
+class ProfilerMiddleware:
+    """
+    Profiles single requests on demand, in production.
+
+    A request from a user with the 'admin' role carrying `X-Profile: 1` or
+    `?profile=1` runs under cProfile and tracemalloc. The pstats dump and a
+    summary (duration, peak memory, top functions by cumulative time, top
+    allocation sites) are written to PROFILE_DIR, and the response carries
+    their id in `X-Profile-Id`. Admins list and download them through
+    `/api/profiles/`.
+
+    Requests without the flag only pay a header lookup and a substring check
+    of the query string; the flag from anyone else is ignored. Only one request
+    per process is profiled at a time (the profilers are process wide); a
+    concurrent one is served unprofiled with `X-Profile-Id: busy`.
+
+    The profile ends when the response is returned, so the body of a
+    streaming response (exports) is not included. Under ASGI only the code
+    running on the event loop thread is profiled, not the sync code async
+    views hand to worker threads: profile through the WSGI workers.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        user = get_admin(request) if requested(request) else None
+        if user is None:
+            return self.get_response(request)
+        if not _lock.acquire(blocking=False):
+            return self.busy(self.get_response(request))
+        try:
+            profile = Profile()
+            profile.start()
+            try:
+                response = self.get_response(request)
+            finally:
+                profile.stop()
+            response.headers["X-Profile-Id"] = profile.save(request, response, user)
+        finally:
+            _lock.release()
+        return response
+
+    async def __acall__(self, request):
+        user = await sync_to_async(get_admin)(request) if requested(request) else None
+        if user is None:
+            return await self.get_response(request)
+        if not _lock.acquire(blocking=False):
+            return self.busy(await self.get_response(request))
+        try:
+            profile = Profile()
+            profile.start()
+            try:
+                response = await self.get_response(request)
+            finally:
+                profile.stop()
+            response.headers["X-Profile-Id"] = await sync_to_async(profile.save)(request, response, user)
+        finally:
+            _lock.release()
+        return response
+
+    def busy(self, response):
+        response.headers["X-Profile-Id"] = "busy"
+        return response
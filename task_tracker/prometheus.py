@@ -0,0 +1,214 @@
+import atexit
+import hmac
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from rest_framework.permissions import BasePermission
+from rest_framework.renderers import BaseRenderer
+
+from accounts.models import Role
+from accounts.roles import has_role
+from .counters import incr_many
+
+METRICS_KEY = "prometheus:{}:{}"
+SERIES_KEY = "prometheus:series"
+SERIES_LOCK_KEY = "prometheus:series:lock"
+PREFIX = "task_tracker_"
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# name: (help, buckets, scale). Observations are stored as integers: seconds
+# in microseconds, so the shared cache can `incr` them.
+HISTOGRAMS = {
+    "http_request_duration_seconds": ("Time until the response is returned.", DURATION_BUCKETS, 1_000_000),
+    "http_request_db_duration_seconds": ("Time spent in database queries per request.", DURATION_BUCKETS, 1_000_000),
+    "http_request_db_queries": ("Database queries per request.", QUERY_BUCKETS, 1),
+    "http_request_serialize_duration_seconds": ("Time spent in serializers per request.", DURATION_BUCKETS, 1_000_000),
+}
+COUNTERS = {
+    "http_requests_total": "Responses per status code.",
+    "http_request_cache_hits_total": "Response cache hits.",
+    "http_request_cache_misses_total": "Response cache misses.",
+}
+
+# Anything else is counted as "other", so clients cannot add label values.
+METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+
+
+def _labels(**labels):
+    return ",".join(f'{name}="{value}"' for name, value in labels.items())
+
+
+class Registry:
+    """
+    Per-route request metrics of this process, added to counters shared by
+    every worker.
+
+    Observations accumulate in memory and are added to the cache (Redis in
+    production) with atomic `incr` every REQUEST_METRICS_FLUSH_SECONDS, so a
+    request costs no round trip and the counters of all gunicorn workers add
+    up. The series (metric and labels) ever observed are listed under one
+    key, updated under a lock the first time a worker sees a series.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = defaultdict(int)
+        self.new_series = set()
+        self.registered = set()
+        self.flushed_at = time.monotonic()
+
+    def observe(self, route, method, status, timing):
+        """
+        Adds one request of `route` (a URL name, None when no URL matched)
+        measured by `timing` (see task_tracker.timing.RequestTiming).
+        """
+        labels = _labels(route=route or "unmatched", method=method if method in METHODS else "other")
+        values = {
+            "http_request_duration_seconds": timing.total,
+            "http_request_db_duration_seconds": timing.db_time,
+            "http_request_db_queries": timing.db_queries,
+            "http_request_serialize_duration_seconds": timing.serialize_time,
+        }
+        counters = {
+            (f"http_requests_total{{{labels},status=\"{status}\"}}"): 1,
+            f"http_request_cache_hits_total{{{labels}}}": timing.cache_hits,
+            f"http_request_cache_misses_total{{{labels}}}": timing.cache_misses,
+        }
+        with self.lock:
+            for name, value in values.items():
+                _, buckets, scale = HISTOGRAMS[name]
+                series = f"{name}{{{labels}}}"
+                self._add(series, bisect_left(buckets, value), 1)
+                self._add(series, "sum", round(value * scale))
+                self._add(series, "count", 1)
+            for series, value in counters.items():
+                if value:
+                    self._add(series, "value", value)
+
+    def _add(self, series, field, value):
+        if series not in self.registered:
+            self.new_series.add(series)
+        self.pending[(series, field)] += value
+
+    def flush_due(self):
+        return time.monotonic() - self.flushed_at >= settings.REQUEST_METRICS_FLUSH_SECONDS
+
+    def flush(self):
+        """
+        Adds the pending observations to the shared counters.
+        """
+        with self.lock:
+            pending, self.pending = self.pending, defaultdict(int)
+            new_series, self.new_series = self.new_series, set()
+            self.flushed_at = time.monotonic()
+        incr_many({METRICS_KEY.format(series, field): value for (series, field), value in pending.items()})
+        if new_series and not self._register(new_series):
+            # Another worker holds the lock: try again at the next flush.
+            with self.lock:
+                self.new_series |= new_series
+
+    def _register(self, series):
+        if not cache.add(SERIES_LOCK_KEY, 1, timeout=5):
+            return False
+        try:
+            cache.set(SERIES_KEY, (cache.get(SERIES_KEY) or set()) | series, timeout=None)
+        finally:
+            cache.delete(SERIES_LOCK_KEY)
+        self.registered |= series
+        return True
+
+
+registry = Registry()
+# Gunicorn workers exit through sys.exit(): keep their last observations.
+atexit.register(registry.flush)
+
+
+def render():
+    """
+    Returns every worker's metrics in the Prometheus text exposition format
+    (version 0.0.4), histogram buckets cumulative as the format requires.
+    """
+    series = cache.get(SERIES_KEY) or set()
+    by_metric = defaultdict(list)
+    for name in series:
+        by_metric[name.split("{", 1)[0]].append(name)
+
+    keys = []
+    for name in series:
+        metric = name.split("{", 1)[0]
+        if metric in HISTOGRAMS:
+            fields = [*range(len(HISTOGRAMS[metric][1]) + 1), "sum", "count"]
+        else:
+            fields = ["value"]
+        keys.extend(METRICS_KEY.format(name, field) for field in fields)
+    values = cache.get_many(keys)
+
+    lines = []
+    for metric, (help_text, buckets, scale) in HISTOGRAMS.items():
+        lines += [f"# HELP {PREFIX}{metric} {help_text}", f"# TYPE {PREFIX}{metric} histogram"]
+        for name in sorted(by_metric[metric]):
+            labels = name[len(metric) + 1:-1]
+            count = 0
+            for index, bound in enumerate((*buckets, "+Inf")):
+                count += values.get(METRICS_KEY.format(name, index), 0)
+                le = bound if bound == "+Inf" else repr(float(bound))
+                lines.append(f'{PREFIX}{metric}_bucket{{{labels},le="{le}"}} {count}')
+            total = values.get(METRICS_KEY.format(name, "sum"), 0)
+            lines.append(f"{PREFIX}{metric}_sum{{{labels}}} {total / scale if scale != 1 else total}")
+            lines.append(f"{PREFIX}{metric}_count{{{labels}}} {values.get(METRICS_KEY.format(name, 'count'), 0)}")
+    for metric, help_text in COUNTERS.items():
+        lines += [f"# HELP {PREFIX}{metric} {help_text}", f"# TYPE {PREFIX}{metric} counter"]
+        for name in sorted(by_metric[metric]):
+            lines.append(f"{PREFIX}{name} {values.get(METRICS_KEY.format(name, 'value'), 0)}")
+    return "\n".join(lines) + "\n"
+
+
+class PrometheusRenderer(BaseRenderer):
+    media_type = "text/plain"
+    format = "prometheus"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, str):
+            return data.encode(self.charset)
+        # Errors (401/403) as plain text.
+        return str(data.get("detail", data) if isinstance(data, dict) else data).encode(self.charset)
+
+
+class MetricsTokenAuthentication(BaseAuthentication):
+    """
+    Authenticates the Prometheus scraper by the static `METRICS_TOKEN`
+    (`Authorization: Bearer <token>`, `bearer_token` in the scrape config),
+    as an anonymous user whose `request.auth` is "metrics". Other bearer
+    tokens are left to the JWT authentication that follows.
+    """
+
+    def authenticate(self, request):
+        token = settings.METRICS_TOKEN
+        header = get_authorization_header(request).split()
+        if not token or len(header) != 2 or header[0].lower() != b"bearer":
+            return None
+        if not hmac.compare_digest(header[1], token.encode()):
+            return None
+        return AnonymousUser(), "metrics"
+
+    def authenticate_header(self, request):
+        return "Bearer"
+
+
+class IsMetricsScraperOrAdmin(BasePermission):
+    """
+    Allows the scraper authenticated by MetricsTokenAuthentication, and users
+    with the 'admin' role.
+    """
+
+    def has_permission(self, request, view):
+        return request.auth == "metrics" or (request.user.is_authenticated and has_role(request.user, Role.ADMIN))
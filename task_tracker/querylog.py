@@ -0,0 +1,208 @@
+import contextvars
+import logging
+import re
+import time
+import traceback
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+_current = contextvars.ContextVar("query_inspection", default=None)
+
+# Values Django writes into the SQL instead of passing them as parameters
+# (LIMIT/OFFSET, some constants), and placeholder lists whose length follows
+# the data (`IN (%s, %s, ...)`).
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*%s\s*,)+\s*%s\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+# Frames of these files (libraries, and the execute wrappers and serializer
+# timing) say nothing about which code caused the queries.
+_LIBRARY_FRAMES = re.compile(r"[/\\](site-packages|dist-packages|lib[/\\]python[\d.]+)[/\\]|(querylog|timing)\.py$")
+
+
+class NPlusOneError(AssertionError):
+    """
+    Raised in strict mode (`QUERY_INSPECTOR_STRICT`) when a view of one of
+    `QUERY_INSPECTOR_STRICT_APPS` repeats a query shape more than
+    `N_PLUS_ONE_THRESHOLD` times in one request.
+    """
+
+
+def fingerprint(sql):
+    """
+    Returns the shape of `sql`: literals and parameters become `?`, and
+    parameter lists of any length collapse into one.
+
+    Example:
+        >>> fingerprint('SELECT * FROM "t" WHERE "id" IN (%s, %s, %s) LIMIT 21')
+        'SELECT * FROM "t" WHERE "id" IN (?) LIMIT ?'
+    """
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _PLACEHOLDER_LIST.sub("(?)", sql).replace("%s", "?")
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def caller_stack(limit=8):
+    """
+    Returns the innermost `limit` frames of the current stack that belong to
+    this project, formatted as in a traceback.
+    """
+    frames = [frame for frame in traceback.extract_stack()[:-1] if not _LIBRARY_FRAMES.search(frame.filename)]
+    return "".join(traceback.format_list(frames[-limit:]))
+
+
+class QueryInspection:
+    """
+    The query shapes one request ran, and those flagged as N+1 with the stack
+    of the first repeat over the threshold.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self.shapes = Counter()
+        self.repeated = {}
+        self.explaining = False
+
+    def is_strict(self):
+        if not settings.QUERY_INSPECTOR_STRICT:
+            return False
+        match = self.request.resolver_match
+        view = getattr(match.func, "cls", match.func) if match is not None else None
+        module = getattr(view, "__module__", "")
+        return module.split(".")[0] in settings.QUERY_INSPECTOR_STRICT_APPS
+
+
+def inspect_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper counting the query shapes of the current request
+    and logging slow queries with their plan.
+    """
+    inspection = _current.get()
+    if inspection is None or inspection.explaining:
+        return execute(sql, params, many, context)
+
+    # Every statement counts: an UPDATE or INSERT per row is an N+1 as much as
+    # a SELECT per row. executemany() runs one statement for many rows.
+    if not many:
+        shape = fingerprint(sql)
+        inspection.shapes[shape] += 1
+        if inspection.shapes[shape] == settings.N_PLUS_ONE_THRESHOLD + 1:
+            stack = caller_stack()
+            inspection.repeated[shape] = stack
+            if inspection.is_strict():
+                raise NPlusOneError(
+                    f"N+1 in {inspection.request.method} {inspection.request.path}: this query ran more than "
+                    f"{settings.N_PLUS_ONE_THRESHOLD} times.\n{shape}\n{stack}"
+                )
+
+    start = time.perf_counter()
+    result = execute(sql, params, many, context)
+    duration = time.perf_counter() - start
+    if duration * 1000 >= settings.SLOW_QUERY_MS:
+        log_slow_query(inspection, context["connection"], sql, params, many, duration)
+    return result
+
+
+def log_slow_query(inspection, connection, sql, params, many, duration):
+    """
+    Logs a query slower than `SLOW_QUERY_MS` with its `EXPLAIN` output (for
+    single SELECT statements) and the stack that ran it.
+    """
+    plan = ""
+    if not many and sql.lstrip()[:6].upper() == "SELECT":
+        inspection.explaining = True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}", params)
+                plan = "\n".join(" ".join(str(value) for value in row) for row in cursor.fetchall())
+        except Exception as exc:  # The plan is best effort: never fail the request.
+            plan = f"(EXPLAIN failed: {exc})"
+        finally:
+            inspection.explaining = False
+    logger.warning(
+        "Slow query (%.1f ms) in %s %s:\n%s\nParams: %r\nPlan:\n%s\n%s",
+        duration * 1000, inspection.request.method, inspection.request.path, sql, params, plan, caller_stack(),
+    )
+
+
+def instrument(connection):
+    if inspect_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(inspect_query)
+
+
+def _instrument_new_connection(sender, connection, **kwargs):
+    instrument(connection)
+
+
+class QueryInspectorMiddleware:
+    """
+    Development and test middleware watching the queries of every request:
+
+        - N+1 detection: statements are fingerprinted (see fingerprint()), and
+          a shape that runs more than `N_PLUS_ONE_THRESHOLD` times in one
+          request is logged with the stack of the code that repeats it, e.g.
+          a nested serializer reading a relation the view did not prefetch,
+          or a counter UPDATE per written row.
+        - Slow queries: queries taking `SLOW_QUERY_MS` or more are logged with
+          their parameters, `EXPLAIN` output and stack.
+
+    In strict mode (`QUERY_INSPECTOR_STRICT`, on in the test suite) an N+1 in
+    a view of `QUERY_INSPECTOR_STRICT_APPS` (tasks, projects, accounts)
+    raises NPlusOneError at the offending query, so the test that ran the
+    request fails with the culprit in its traceback.
+
+    Enabled with `QUERY_INSPECTOR=1` (the default under DEBUG and in tests);
+    otherwise Django drops the middleware at startup and queries are not
+    wrapped.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.QUERY_INSPECTOR:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        connection_created.connect(_instrument_new_connection)
+        for connection in connections.all(initialized_only=True):
+            instrument(connection)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        inspection = QueryInspection(request)
+        token = _current.set(inspection)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.report(inspection)
+        return response
+
+    async def __acall__(self, request):
+        inspection = QueryInspection(request)
+        token = _current.set(inspection)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.report(inspection)
+        return response
+
+    def report(self, inspection):
+        for shape, stack in inspection.repeated.items():
+            logger.warning(
+                "N+1 in %s %s: %d queries of the same shape\n%s\n%s",
+                inspection.request.method, inspection.request.path, inspection.shapes[shape], shape, stack,
+            )
@@ -0,0 +1,176 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+from rest_framework.fields import empty
+from rest_framework.relations import MANY_RELATION_KWARGS, ManyRelatedField, PrimaryKeyRelatedField
+
+# Context key under which instances fetched by the bulk lookups are shared
+# between the fields (and rows) of one serializer.
+RELATED_INSTANCES_KEY = "related_instances"
+
+
+class BulkPrimaryKeyRelatedField(PrimaryKeyRelatedField):
+    """
+    Primary key field whose lookups are shared across a serializer.
+
+    Works like `PrimaryKeyRelatedField`, but the instances are fetched in bulk:
+        - With `many=True` the whole ID list is validated with a single `IN`
+          query and every missing ID is reported at once.
+        - Serializers using BulkRelatedLookupMixin resolve the IDs of all their
+          bulk fields (and of every row of a `many=True` write) up front, with
+          one `IN` query per queryset, so `owner_id` and `creator_id` share a
+          lookup and a 500-row write does not run 500 SELECTs per field.
+
+    The fetched instances are the ones assigned to the model, so the M2M
+    `set()` after validation does not load them again.
+
+    Example error:
+        {"user_ids": ["Invalid pks [98, 99] - objects do not exist."]}
+    """
+    default_error_messages = {
+        'does_not_exist_many': _('Invalid pks {pk_values} - objects do not exist.'),
+    }
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BulkManyRelatedField(**list_kwargs)
+
+    def to_internal_value(self, data):
+        if self.pk_field is not None:
+            data = self.pk_field.to_internal_value(data)
+        pk = self.to_pk(data)
+        return self.lookup([pk])[pk]
+
+    def to_pk(self, data):
+        """
+        Converts a raw ID to the python type of the model's primary key.
+        """
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return self.get_queryset().model._meta.pk.to_python(data)
+        except (DjangoValidationError, TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+    def lookup(self, pks):
+        """
+        Returns {pk: instance} for `pks`, reusing instances already fetched for
+        the same queryset in this serializer.
+
+        Raises:
+            ValidationError: Listing every pk that does not exist.
+        """
+        found, _ = self.get_shared_lookup()
+        self.fetch(pks)
+        missing = [pk for pk in dict.fromkeys(pks) if pk not in found]
+        if len(missing) == 1 and len(pks) == 1:
+            self.fail('does_not_exist', pk_value=missing[0])
+        if missing:
+            self.fail('does_not_exist_many', pk_values=missing)
+        return {pk: found[pk] for pk in pks}
+
+    def fetch(self, pks):
+        """
+        Loads the `pks` not looked up yet with a single `IN` query into the
+        shared lookup.
+        """
+        found, checked = self.get_shared_lookup()
+        pks = set(pks) - checked
+        if not pks:
+            return
+        found.update(self.get_queryset().in_bulk(pks))
+        checked.update(pks)
+
+    def get_shared_lookup(self):
+        """
+        Returns the (instances by pk, looked-up pks) pair shared by every bulk
+        field of this serializer that reads the same queryset.
+        """
+        queryset = self.get_queryset()
+        key = (queryset.model, str(queryset.query))
+        shared = self.context.setdefault(RELATED_INSTANCES_KEY, {})
+        if key not in shared:
+            shared[key] = ({}, set())
+        return shared[key]
+
+
+class BulkManyRelatedField(ManyRelatedField):
+    """
+    Many-valued counterpart of BulkPrimaryKeyRelatedField: validates the whole
+    ID list with one query and returns the instances in input order.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+
+        child = self.child_relation
+        if child.pk_field is not None:
+            data = [child.pk_field.to_internal_value(item) for item in data]
+        pks = [child.to_pk(item) for item in data]
+        instances = child.lookup(pks)
+        return [instances[pk] for pk in pks]
+
+
+class BulkRelatedLookupMixin:
+    """
+    Serializer mixin resolving the IDs of every BulkPrimaryKeyRelatedField
+    before validation, one `IN` query per queryset.
+
+    With `many=True` the IDs of all rows are resolved together when the first
+    row is validated, so a bulk write of N rows costs the same number of
+    lookups as a single row.
+    """
+
+    def run_validation(self, data=empty):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            if not getattr(parent, '_related_ids_prefetched', False):
+                parent._related_ids_prefetched = True
+                rows = parent.initial_data if isinstance(getattr(parent, 'initial_data', None), list) else [data]
+                prefetch_related_ids(self, rows)
+        else:
+            prefetch_related_ids(self, [data])
+        return super().run_validation(data)
+
+
+def prefetch_related_ids(serializer, rows):
+    """
+    Fetches the instances referenced by the bulk primary key fields of
+    `serializer` in `rows` (raw input dicts), grouped by queryset. Invalid IDs
+    are skipped here and reported by the fields during validation.
+    """
+    groups = {}
+    for field in serializer.fields.values():
+        if field.read_only:
+            continue
+        many = isinstance(field, BulkManyRelatedField)
+        relation = field.child_relation if many else field
+        if not isinstance(relation, BulkPrimaryKeyRelatedField) or relation.pk_field is not None:
+            continue
+
+        pks = groups.setdefault(id(relation.get_shared_lookup()), (relation, set()))[1]
+        for row in rows:
+            if not isinstance(row, dict) or field.field_name not in row:
+                continue
+            values = row[field.field_name]
+            if not many:
+                values = [values]
+            elif isinstance(values, str) or not hasattr(values, '__iter__'):
+                continue
+            for value in values:
+                if value is None or isinstance(value, (bool, list, dict)):
+                    continue
+                try:
+                    pks.add(relation.to_pk(value))
+                except serializers.ValidationError:
+                    continue
+
+    for relation, pks in groups.values():
+        relation.fetch(pks)
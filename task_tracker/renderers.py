@@ -0,0 +1,121 @@
+import io
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - the stdlib encoder is used instead
+    orjson = None
+
+# Dates and times go through DRF's encoder (`Z` suffix, milliseconds), and
+# dataclasses are not JSON in the stdlib encoder either.
+ORJSON_OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS) if orjson else 0
+
+# orjson writes floats below 1e-4 and exponents differently from `repr()`
+# (`0.00001` and `1e16` instead of `1e-05` and `1e+16`). Outputs that might
+# contain one (a digit followed by `e`, or `.0000`) are rendered again by the
+# stdlib encoder; task, project and user payloads have no floats.
+_DIGITS_TO_ZERO = bytes.maketrans(b'123456789', b'000000000')
+
+# orjson reads integers beyond 64 bits as floats; bodies with a run of 19
+# digits are parsed by the stdlib instead.
+_LONG_NUMBER = b'0' * 19
+
+_encoder = encoders.JSONEncoder()
+
+
+def use_orjson():
+    """
+    Whether orjson is installed and enabled (`FAST_JSON`), and DRF's JSON
+    settings are the defaults it reproduces (UTF-8 output, compact separators,
+    no NaN/Infinity).
+    """
+    return (
+        orjson is not None and getattr(settings, 'FAST_JSON', True)
+        and api_settings.UNICODE_JSON and api_settings.COMPACT_JSON and api_settings.STRICT_JSON
+    )
+
+
+def dumps(data):
+    """
+    Encodes `data` to the same bytes as `JSONRenderer` without indentation,
+    with orjson when possible.
+    """
+    if use_orjson():
+        content = _orjson_dumps(data)
+        if content is not None:
+            return content
+    return JSONRenderer().render(data)
+
+
+def _orjson_dumps(data):
+    """
+    Returns `data` encoded by orjson, or None when only the stdlib encoder
+    reproduces the output: integers beyond 64 bits, non-string keys, lone
+    surrogates and possibly differing floats.
+    """
+    try:
+        content = orjson.dumps(data, default=_encoder.default, option=ORJSON_OPTIONS)
+    except orjson.JSONEncodeError:
+        return None
+    if b'.0000' in content or b'0e' in content.translate(_DIGITS_TO_ZERO):
+        return None
+    # As JSONRenderer: keep the output a strict subset of JavaScript.
+    if b'\xe2\x80\xa8' in content or b'\xe2\x80\xa9' in content:
+        content = content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+    return content
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer encoding with orjson when it is installed.
+
+    The output is byte-identical to JSONRenderer's: types orjson does not
+    encode the same way (dates, times, lazy strings, decimals, querysets, ...)
+    go through DRF's JSONEncoder, and payloads orjson cannot reproduce fall
+    back to the stdlib encoder. Indented output (`; indent=4`, the browsable
+    API) always uses the stdlib encoder.
+
+    NaN and infinite floats render as `null` instead of raising as the stdlib
+    encoder does (STRICT_JSON).
+
+    Disable with `FAST_JSON=0` in the environment.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None or not use_orjson() or \
+                self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        content = _orjson_dumps(data)
+        if content is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        return content
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser decoding UTF-8 bodies with orjson when it is installed.
+
+    Bodies orjson rejects or reads differently (invalid JSON, NaN, integers
+    beyond 64 bits, encodings other than UTF-8) are parsed by JSONParser, so
+    accepted documents, parsed values and error messages are unchanged.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if not use_orjson() or encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        if _LONG_NUMBER not in body.translate(_DIGITS_TO_ZERO):
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass
+        return super().parse(io.BytesIO(body), media_type, parser_context)
@@ -0,0 +1,155 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from rest_framework.response import Response
+
+from accounts.models import Role
+from accounts.roles import get_role_names
+from . import versions
+from .counters import BufferedCounters
+from .timing import record_cache_lookup
+
+RESPONSE_KEY = "responses:v2:{}:{}:{}"
+METRICS_KEY = "responses:metrics:{}:{}"
+
+pending_metrics = BufferedCounters()
+
+
+class CachedResponseViewSetMixin:
+    """
+    ViewSet mixin caching rendered list/retrieve responses.
+
+    Keys are made of:
+        - The visibility scope of the user (see get_cache_scope()): all admins
+          share one copy, other users get their own.
+        - The versions (see task_tracker.versions) of `versioned_models`, the
+          models the response renders, and the current versions.window().
+        - The absolute URL (filters, cursor, fields) and the Accept header.
+
+    Any write to one of those models bumps its generation, so every cached
+    response that could contain it stops being looked up at once, without
+    deleting or scanning keys; stale entries expire after
+    `RESPONSE_CACHE_TIMEOUT` seconds. Only JSON responses are cached.
+
+    Entries hold the rendered content and its compressed variants, added by
+    CompressionMiddleware the first time a coding is requested, so a hit is
+    sent compressed without compressing it again.
+
+    Hits and misses are counted per view (see get_metrics()).
+
+    Disable with `RESPONSE_CACHE=0` in the environment.
+    """
+    versioned_models = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, view, request, *args, **kwargs):
+        key = self.get_response_cache_key(request)
+        if key is None:
+            return view(request, *args, **kwargs)
+
+        cached = cache.get(key)
+        record(self.get_cache_label(), hit=cached is not None)
+        if cached is not None:
+            content, content_type, encoded = cached
+            response = HttpResponse(content, content_type=content_type)
+            response.precompressed = encoded
+            response.store_compressed = _compressed_store(key, content, content_type, encoded)
+            return response
+        self._response_cache_key = key
+        return view(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        key = getattr(self, '_response_cache_key', None)
+        if key is not None and isinstance(response, Response) and response.status_code == 200 \
+                and getattr(response.accepted_renderer, 'format', None) == 'json':
+            response.render()
+            cache.set(key, (response.content, response['Content-Type'], {}), timeout=settings.RESPONSE_CACHE_TIMEOUT)
+            response.store_compressed = _compressed_store(key, response.content, response['Content-Type'], {})
+        return response
+
+    def get_cache_scope(self, request):
+        """
+        Returns the part of the key that separates users who may see different
+        rows. Views whose rows are the same for every user return a constant.
+        """
+        if Role.ADMIN in get_role_names(request.user):
+            return 'admin'
+        return f'user:{request.user.pk}'
+
+    def get_cache_label(self):
+        return type(self).__name__
+
+    def get_response_cache_key(self, request):
+        """
+        Returns the cache key of the request, or None when it is not cacheable
+        (cache disabled or unavailable, or not a GET).
+        """
+        if not getattr(settings, 'RESPONSE_CACHE', False) or request.method != 'GET' or not self.versioned_models:
+            return None
+        current = versions.get_request_versions(request, self.versioned_models)
+        if current is None:
+            return None
+        digest = hashlib.sha1(json.dumps([
+            sorted(current.items()),
+            versions.window(),
+            request.build_absolute_uri(),
+            request.headers.get('Accept', ''),
+        ], separators=(',', ':')).encode()).hexdigest()
+        return RESPONSE_KEY.format(self.get_cache_label(), self.get_cache_scope(request), digest)
+
+
+def _compressed_store(key, content, content_type, encoded):
+    """
+    Returns the `store_compressed(encoding, data)` callback of a cached
+    response (see CompressionMiddleware), adding a compressed variant to its
+    cache entry.
+    """
+    def store(encoding, data):
+        cache.set(key, (content, content_type, {**encoded, encoding: data}), timeout=settings.RESPONSE_CACHE_TIMEOUT)
+    return store
+
+
+def record(label, hit):
+    """
+    Counts a response cache hit or miss of the view `label` (buffered in the
+    process, see BufferedCounters), and of the current request (see
+    TimingMiddleware).
+    """
+    record_cache_lookup(hit)
+    pending_metrics.add(METRICS_KEY.format(label, 'hits' if hit else 'misses'))
+
+
+def get_metrics():
+    """
+    Returns the response cache counters per view, shared by every worker:
+
+        {"TaskViewSet": {"hits": 950, "misses": 50, "hit_ratio": 0.95}, ...}
+    """
+    labels = sorted({cls.__name__ for cls in _viewsets()})
+    pending_metrics.flush()
+    counters = cache.get_many([METRICS_KEY.format(label, kind) for label in labels for kind in ('hits', 'misses')])
+    metrics = {}
+    for label in labels:
+        hits = counters.get(METRICS_KEY.format(label, 'hits'), 0)
+        misses = counters.get(METRICS_KEY.format(label, 'misses'), 0)
+        total = hits + misses
+        metrics[label] = {'hits': hits, 'misses': misses, 'hit_ratio': hits / total if total else None}
+    return metrics
+
+
+def _viewsets():
+    # Every cached viewset, including those not requested yet in this process.
+    pending = list(CachedResponseViewSetMixin.__subclasses__())
+    while pending:
+        cls = pending.pop()
+        pending.extend(cls.__subclasses__())
+        yield cls
@@ -0,0 +1,331 @@
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, router
+from django.db.models import Case, F, FloatField, Func, Lookup, Value, When
+from django.db.models.signals import post_delete, post_save
+from django.utils.module_loading import import_string
+from rest_framework.filters import BaseFilterBackend
+
+SEARCH_PARAM = "q"
+RELEVANCE = "relevance"
+
+# Searchable models and their text columns, filled by `register()` from the
+# apps' `ready()`.
+_registry = {}
+_backend = None
+
+
+def register(model, fields):
+    """
+    Makes `fields` of `model` searchable with `?q=` (see FullTextSearchFilter).
+
+    On MySQL the columns need a FULLTEXT index over exactly these fields,
+    created by the app's migrations.
+    """
+    _registry[model] = list(fields)
+    post_save.connect(_indexed_row_saved, sender=model, dispatch_uid=f"search:{model._meta.label}:save")
+    post_delete.connect(_indexed_row_deleted, sender=model, dispatch_uid=f"search:{model._meta.label}:delete")
+
+
+def get_search_fields(model):
+    return _registry[model]
+
+
+def get_search_backend():
+    """
+    Returns the configured search backend.
+
+    `SEARCH_BACKEND` is a dotted path to a backend class; when unset, MySQL uses
+    MySQLFullTextBackend and every other database InvertedIndexBackend.
+    """
+    global _backend
+    if _backend is None:
+        path = getattr(settings, "SEARCH_BACKEND", None)
+        if path is None:
+            vendor = connections[router.db_for_read(None)].vendor
+            path = "task_tracker.search.MySQLFullTextBackend" if vendor == "mysql" \
+                else "task_tracker.search.InvertedIndexBackend"
+        _backend = import_string(path)()
+    return _backend
+
+
+def tokenize(text):
+    return re.findall(r"\w\w+", (text or "").lower())
+
+
+class BaseSearchBackend:
+    """
+    A search backend restricts a queryset to the rows matching a query and
+    annotates each with a `relevance` score (higher is better).
+    """
+
+    def search(self, queryset, query):
+        raise NotImplementedError
+
+    def row_saved(self, instance):
+        pass
+
+    def row_deleted(self, instance):
+        pass
+
+    def rows_deleted(self, model, pks):
+        pass
+
+
+class MatchAgainst(Func):
+    """
+    `MATCH (columns) AGAINST (query IN NATURAL LANGUAGE MODE)`: the relevance
+    of a row for `query`, served by the FULLTEXT index over `columns`.
+    """
+    template = "MATCH (%(expressions)s) AGAINST (%%s IN NATURAL LANGUAGE MODE)"
+    output_field = FloatField()
+
+    def __init__(self, *columns, query):
+        super().__init__(*[F(column) for column in columns])
+        self.query = query
+
+    def as_sql(self, compiler, connection, **extra_context):
+        sql, params = super().as_sql(compiler, connection, **extra_context)
+        return sql, (*params, self.query)
+
+
+class Matches(Lookup):
+    """
+    WHERE condition made of a bare MatchAgainst, the form MySQL answers from
+    the FULLTEXT index.
+    """
+    lookup_name = "matches"
+    prepare_rhs = False
+
+    def as_sql(self, compiler, connection):
+        return compiler.compile(self.lhs)
+
+
+class MySQLFullTextBackend(BaseSearchBackend):
+    """
+    Searches with MySQL FULLTEXT indexes (natural language mode), so a query
+    costs an index lookup regardless of the table size.
+    """
+
+    def search(self, queryset, query):
+        columns = get_search_fields(queryset.model)
+        return queryset.filter(Matches(MatchAgainst(*columns, query=query), True)).annotate(
+            **{RELEVANCE: MatchAgainst(*columns, query=query)}
+        )
+
+
+class InvertedIndex:
+    """
+    In-process inverted index of the text columns of one model.
+
+    `postings` maps each token to {pk: term frequency}; `documents` keeps the
+    tokens of every row so it can be removed again. Scores are TF-IDF sums over
+    the query tokens.
+    """
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = fields
+        self.postings = defaultdict(dict)
+        self.documents = {}
+        self.built = False
+        self.generation = None
+        self.lock = threading.RLock()
+
+    def build(self, generation):
+        self.postings.clear()
+        self.documents.clear()
+        rows = self.model._default_manager.values_list("pk", *self.fields)
+        for pk, *values in rows.iterator(chunk_size=2000):
+            self.add(pk, values)
+        self.built = True
+        self.generation = generation
+
+    def add(self, pk, values):
+        self.remove(pk)
+        tokens = Counter(token for value in values for token in tokenize(value))
+        self.documents[pk] = tokens
+        for token, count in tokens.items():
+            self.postings[token][pk] = count
+
+    def remove(self, pk):
+        for token in self.documents.pop(pk, ()):
+            postings = self.postings[token]
+            postings.pop(pk, None)
+            if not postings:
+                del self.postings[token]
+
+    def search(self, query):
+        """
+        Returns the (pk, score) pairs of the rows matching `query`, best first.
+        """
+        total = len(self.documents) or 1
+        scores = defaultdict(float)
+        for token in set(tokenize(query)):
+            postings = self.postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + total / len(postings))
+            for pk, count in postings.items():
+                scores[pk] += count * idf
+        return sorted(scores.items(), key=lambda item: (item[1], item[0]), reverse=True)
+
+
+class InvertedIndexBackend(BaseSearchBackend):
+    """
+    Fallback backend for databases without full-text indexes (SQLite in tests
+    and development).
+
+    Each process keeps an inverted index per model, built on first use and
+    updated by the model's save/delete signals. Writes also bump a generation
+    counter in the cache so other processes rebuild their copy on their next
+    search. Writes that skip signals (`QuerySet.update()`, `bulk_create()`)
+    must call `invalidate(model)`, or `rows_deleted(model, pks)` for deletes.
+
+    A query reads only the postings of its tokens, and returns the
+    `SEARCH_MAX_HITS` (default 1000) best matches among the rows of the
+    queryset: its filters (e.g. visibility) are checked before the cut-off,
+    see visible_hits().
+    """
+    generation_key = "search:generation:{}"
+
+    def __init__(self):
+        self.indexes = {}
+        self.max_hits = getattr(settings, "SEARCH_MAX_HITS", 1000)
+
+    def get_index(self, model):
+        index = self.indexes.get(model)
+        if index is None:
+            index = self.indexes[model] = InvertedIndex(model, get_search_fields(model))
+        generation = cache.get(self.generation_key.format(model._meta.label))
+        with index.lock:
+            if not index.built or index.generation != generation:
+                index.build(generation)
+        return index
+
+    def search(self, queryset, query):
+        index = self.get_index(queryset.model)
+        with index.lock:
+            ranked = index.search(query)
+        hits = self.visible_hits(queryset, ranked)
+        if not hits:
+            return queryset.none().annotate(**{RELEVANCE: Value(0.0, output_field=FloatField())})
+        relevance = Case(
+            *[When(pk=pk, then=Value(score)) for pk, score in hits],
+            default=Value(0.0), output_field=FloatField(),
+        )
+        return queryset.filter(pk__in=[pk for pk, _ in hits]).annotate(**{RELEVANCE: relevance})
+
+    def visible_hits(self, queryset, ranked):
+        """
+        Returns the first `max_hits` of the `ranked` (pk, score) pairs that are
+        rows of `queryset`. Candidates are checked against the database best
+        first, in batches doubling from `max_hits`, so a user who may read few
+        of the matches still gets the best of those.
+        """
+        if not queryset.query.where:
+            return ranked[:self.max_hits]
+        hits, start, size = [], 0, self.max_hits
+        while start < len(ranked) and len(hits) < self.max_hits:
+            batch = ranked[start:start + size]
+            rows = set(queryset.filter(pk__in=[pk for pk, _ in batch]).order_by().values_list("pk", flat=True))
+            hits.extend(hit for hit in batch if hit[0] in rows)
+            start, size = start + size, size * 2
+        return hits[:self.max_hits]
+
+    def row_saved(self, instance):
+        index = self.bump(type(instance))
+        if index is not None:
+            with index.lock:
+                index.add(instance.pk, [getattr(instance, field) for field in index.fields])
+
+    def row_deleted(self, instance):
+        self.rows_deleted(type(instance), [instance.pk])
+
+    def rows_deleted(self, model, pks):
+        index = self.bump(model)
+        if index is not None:
+            with index.lock:
+                for pk in pks:
+                    index.remove(pk)
+
+    def bump(self, model):
+        """
+        Advances the model's generation and returns the local index if it can be
+        updated in place (it was current before the write), else None.
+        """
+        key = self.generation_key.format(model._meta.label)
+        index = self.indexes.get(model)
+        previous = cache.get(key)
+        generation = _next_generation(key)
+        # Another process may have written in between; then rebuild instead.
+        if index is None or not index.built or index.generation != previous \
+                or generation != (previous or 0) + 1:
+            return None
+        index.generation = generation
+        return index
+
+    def invalidate(self, model):
+        _next_generation(self.generation_key.format(model._meta.label))
+
+
+def _next_generation(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # First write since the cache was (re)started.
+        cache.add(key, 1, timeout=None)
+        return cache.get(key)
+
+
+def invalidate(model):
+    """
+    Tells the search backend that rows of `model` changed without signals.
+    """
+    backend = get_search_backend()
+    if hasattr(backend, "invalidate"):
+        backend.invalidate(model)
+
+
+def rows_deleted(model, pks):
+    """
+    Tells the search backend that the rows `pks` of `model` were deleted
+    without signals.
+    """
+    if pks:
+        get_search_backend().rows_deleted(model, pks)
+
+
+def _indexed_row_saved(sender, instance, **kwargs):
+    get_search_backend().row_saved(instance)
+
+
+def _indexed_row_deleted(sender, instance, **kwargs):
+    get_search_backend().row_deleted(instance)
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+    Filters by the `?q=` full-text query and annotates `relevance`.
+
+    Applied after the view's visibility rules, so only rows the user may read
+    are returned. Results are ordered by relevance unless the request asks for
+    another ordering (see KeysetPagination).
+
+    Example:
+        GET /api/tasks/?q=unit+tests
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(SEARCH_PARAM, "").strip()
+        if not query:
+            return queryset
+        return get_search_backend().search(queryset, query)
+
+    def get_schema_operation_parameters(self, view):
+        return [{"name": SEARCH_PARAM, "required": False, "in": "query", "schema": {"type": "string"}}]
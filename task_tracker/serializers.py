@@ -1,5 +1,6 @@
 
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from accounts.roles import get_role_names
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     @classmethod
@@ -8,7 +9,11 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
 
         # Add custom claims
         token["short_name"] = f'{user.first_name[0]} {user.last_name[0]}'
-        token["roles"] = [ role.name for role in user.roles.all()] if user.roles.exists() else []
+        token["email"] = user.email
+        token["roles"] = sorted(get_role_names(user))
+        # Lets StatelessJWTAuthentication reject tokens issued before a role,
+        # password or active status change.
+        token["token_version"] = user.token_version
         return token
 
 
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+import sys
 from pathlib import Path
 from dotenv import load_dotenv
 import pymysql
@@ -30,6 +31,10 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = os.getenv("DEBUG") == "1"
 
+# `manage.py test` runs against SQLite and a local-memory cache so the suite
+# does not need the MySQL and Redis services from docker-compose.
+TESTING = sys.argv[1:2] == ["test"]
+
 ALLOWED_HOSTS = ['tracker.nanha.link', "localhost"]
 
 
@@ -52,7 +57,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'task_tracker.timing.TimingMiddleware',
+    'task_tracker.profiling.ProfilerMiddleware',
+    'task_tracker.querylog.QueryInspectorMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'task_tracker.compression.CompressionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -105,6 +114,15 @@ DATABASES = {
 }
 
 
+if TESTING:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -141,6 +159,16 @@ CACHES = {
     }
 }
 
+if TESTING:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            # Metrics flushes write hundreds of keys; culling at the default
+            # 300 entries would evict cached responses mid-test.
+            "OPTIONS": {"MAX_ENTRIES": 100_000},
+        }
+    }
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -160,10 +188,84 @@ USE_TZ = True
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
+# STATELESS_JWT=1 builds the request user from the token claims instead of
+# loading the user row on every request (see accounts.authentication).
+STATELESS_JWT = os.getenv("STATELESS_JWT") == "1"
+# Seconds a user's token version stays cached: bounds how long a revocation
+# can go unnoticed if a stale version is ever cached.
+TOKEN_VERSION_CACHE_TIMEOUT = int(os.getenv("TOKEN_VERSION_CACHE_TIMEOUT", "300"))
+
+# List/retrieve of tasks, projects and users render rows through compiled row
+# mappers instead of DRF field dispatch (see task_tracker.fast_serializers).
+FAST_SERIALIZERS = os.getenv("FAST_SERIALIZERS", "1") == "1"
+
+# JSON responses and request bodies are encoded/decoded with orjson when it is
+# installed, with the same output as DRF's JSONRenderer (see task_tracker.renderers).
+FAST_JSON = os.getenv("FAST_JSON", "1") == "1"
+
+# JSON, NDJSON and CSV responses of at least COMPRESSION_MIN_SIZE bytes (and
+# every streaming export) are sent with brotli or gzip, as negotiated by
+# Accept-Encoding (see task_tracker.compression).
+RESPONSE_COMPRESSION = os.getenv("RESPONSE_COMPRESSION", "1") == "1"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+# Every request reports its DB time and query count, serializer time, response
+# cache hits/misses and total time in a Server-Timing header, and adds them to
+# per-route histograms served to Prometheus by GET /metrics (admins, or the
+# scraper with `Authorization: Bearer <METRICS_TOKEN>`). Workers add their
+# observations to the shared cache every REQUEST_METRICS_FLUSH_SECONDS
+# (see task_tracker.timing and task_tracker.prometheus).
+REQUEST_TIMING = os.getenv("REQUEST_TIMING", "1") == "1"
+REQUEST_METRICS_FLUSH_SECONDS = int(os.getenv("REQUEST_METRICS_FLUSH_SECONDS", "10"))
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+# Admins profile one request by sending `X-Profile: 1` or `?profile=1`: it runs
+# under cProfile and tracemalloc, and the newest PROFILE_KEEP results are kept
+# in PROFILE_DIR, listed and downloaded through /api/profiles/ (see
+# task_tracker.profiling).
+PROFILE_DIR = os.getenv("PROFILE_DIR", str(BASE_DIR / "profiles"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))
+
+# Development/test query inspection (see task_tracker.querylog): a statement shape
+# repeated more than N_PLUS_ONE_THRESHOLD times in one request is logged as an
+# N+1 with the stack that ran it, and queries of SLOW_QUERY_MS or more are
+# logged with their EXPLAIN output. QUERY_INSPECTOR_STRICT (on in tests) makes
+# an N+1 in the views of QUERY_INSPECTOR_STRICT_APPS raise instead.
+QUERY_INSPECTOR = os.getenv("QUERY_INSPECTOR", "1" if DEBUG else "0") == "1"
+QUERY_INSPECTOR_STRICT = os.getenv("QUERY_INSPECTOR_STRICT") == "1"
+QUERY_INSPECTOR_STRICT_APPS = ("tasks", "projects", "accounts")
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+SLOW_QUERY_MS = int(os.getenv("SLOW_QUERY_MS", "100"))
+
+# List/retrieve responses of tasks, projects, users and roles are cached per
+# visibility scope and model versions (see task_tracker.response_cache).
+RESPONSE_CACHE = os.getenv("RESPONSE_CACHE", "1") == "1"
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", "300"))
+# ETags and cached responses last at most this long, so a version bump lost to
+# a cache outage leaves them stale for a bounded time (see task_tracker.versions).
+VERSIONS_MAX_STALENESS_SECONDS = int(os.getenv("VERSIONS_MAX_STALENESS_SECONDS", "60"))
+
+# Task and project change events of GET /api/events/ (see task_tracker.sse) go
+# through Redis pub/sub so every worker sees every write; without a URL they
+# only reach the streams of the process that made the write.
+EVENTS_REDIS_URL = os.getenv("EVENTS_REDIS_URL", os.getenv("REDIS_URL"))
+SSE_HEARTBEAT_SECONDS = int(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
+        'accounts.authentication.StatelessJWTAuthentication'
+        if STATELESS_JWT else
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
+    'DEFAULT_RENDERER_CLASSES': [
+        'task_tracker.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'task_tracker.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
@@ -178,6 +280,16 @@ REST_FRAMEWORK = {
     'EXCEPTION_HANDLER': 'task_tracker.utils.custom_exception_handler',
 }
 
+if TESTING:
+    SECRET_KEY = SECRET_KEY or "test-secret-key"
+    PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+    REST_FRAMEWORK['DEFAULT_THROTTLE_CLASSES'] = []
+    # Tests that exercise the cache enable it explicitly.
+    RESPONSE_CACHE = False
+    EVENTS_REDIS_URL = None
+    # Fail the tests that make a request with an N+1.
+    QUERY_INSPECTOR = QUERY_INSPECTOR_STRICT = True
+
 # JWT Settings
 from datetime import timedelta
 SIMPLE_JWT = {
@@ -225,7 +337,7 @@ SWAGGER_SETTINGS = {
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 
-if not DEBUG:
+if not DEBUG and not TESTING:
     # SSL Settings
     SECURE_SSL_REDIRECT = True
     SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
@@ -0,0 +1,125 @@
+from rest_framework import serializers
+
+FIELDS_PARAM = "fields"
+EXPAND_PARAM = "expand"
+
+
+def parse_paths(value):
+    """
+    Parses a comma-separated list of dotted paths into a nested dict.
+
+    Example:
+        >>> parse_paths("id,owner.first_name,owner.last_name,project")
+        {'id': {}, 'owner': {'first_name': {}, 'last_name': {}}, 'project': {}}
+    """
+    tree = {}
+    for path in (value or "").split(","):
+        path = path.strip()
+        if not path:
+            continue
+        node = tree
+        for part in path.split("."):
+            node = node.setdefault(part, {})
+    return tree
+
+
+class SparseFieldsetsMixin:
+    """
+    Serializer mixin adding `?fields=` and `?expand=` support.
+
+    Sparse mode is enabled when the request carries either parameter (or when the
+    serializer is built with `fields=`/`expand=` keyword arguments). In sparse mode:
+        - `fields` keeps only the listed fields. Dotted paths select fields of a
+          nested relation and imply its expansion (`owner.first_name`).
+        - Nested relations are rendered as primary keys unless listed in `expand`
+          (dotted paths expand deeper levels, e.g. `project.owner`).
+        - Write-only fields are never removed, so writes are unaffected.
+
+    Without either parameter the serializer renders its full nested
+    representation, as before.
+
+    Example:
+        GET /api/tasks/?fields=id,description,status,due_date,owner.first_name,owner.last_name
+        [
+            {
+                "id": 101,
+                "description": "Complete unit tests",
+                "status": "new",
+                "due_date": "2025-06-15",
+                "owner": {"first_name": "John", "last_name": "Doe"}
+            }
+        ]
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop(FIELDS_PARAM, None)
+        expand = kwargs.pop(EXPAND_PARAM, None)
+        super().__init__(*args, **kwargs)
+        self._sparse_spec = None
+        if fields is not None or expand is not None:
+            self._sparse_spec = (
+                parse_paths(",".join(fields)) if fields is not None else None,
+                parse_paths(",".join(expand or ())),
+            )
+
+    def get_sparse_spec(self):
+        """
+        Returns (fields tree or None for all fields, expand tree), or None when
+        the serializer is not in sparse mode.
+        """
+        if self._sparse_spec is not None or not self._is_root():
+            return self._sparse_spec
+
+        request = self.context.get("request")
+        params = getattr(request, "query_params", {})
+        if FIELDS_PARAM not in params and EXPAND_PARAM not in params:
+            return None
+        fields = parse_paths(params.get(FIELDS_PARAM)) if FIELDS_PARAM in params else None
+        self._sparse_spec = (fields or None, parse_paths(params.get(EXPAND_PARAM)))
+        return self._sparse_spec
+
+    def is_sparse(self):
+        return self.get_sparse_spec() is not None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        spec = self.get_sparse_spec()
+        if spec is None:
+            return fields
+
+        selected, expanded = spec
+        for name, field in list(fields.items()):
+            if field.write_only:
+                continue
+            if selected is not None and name not in selected:
+                del fields[name]
+                continue
+
+            nested = getattr(field, "child", field)
+            if not isinstance(nested, serializers.BaseSerializer) or field.source == "*":
+                continue
+
+            nested_selected = (selected or {}).get(name) or None
+            if name in expanded or nested_selected:
+                if isinstance(nested, SparseFieldsetsMixin):
+                    nested._sparse_spec = (nested_selected, expanded.get(name, {}))
+            else:
+                fields[name] = self.build_primary_key_field(name, field)
+        return fields
+
+    def build_primary_key_field(self, name, field):
+        """
+        Returns a read-only primary key field rendering `field` as IDs.
+        """
+        kwargs = {"read_only": True}
+        if isinstance(field, serializers.ListSerializer):
+            kwargs["many"] = True
+        if field.source and field.source != name:
+            kwargs["source"] = field.source
+        return serializers.PrimaryKeyRelatedField(**kwargs)
+
+    def _is_root(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
@@ -0,0 +1,146 @@
+import asyncio
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework import exceptions
+
+from accounts.authentication import authenticate_request, get_token_version
+from accounts.models import Role
+from . import events
+
+# EventSource cannot send headers: browsers pass the access token in the URL.
+TOKEN_PARAM = "access_token"
+
+# Milliseconds browsers wait before reconnecting a dropped stream.
+RETRY_MS = 3000
+
+
+async def event_stream(request):
+    """
+    Server-Sent Events stream of the task and project changes visible to the
+    user. Served by the ASGI application only (`task_tracker.asgi`).
+
+    URL: /api/events/
+
+    Authentication:
+        The access token, in the `Authorization: Bearer` header or (for
+        browsers' EventSource) the `access_token` query parameter. Users need
+        one of the roles (as `IsReadOnlyOrAdminOrTaskCreator`).
+
+    Events:
+        - task: `{"action": "created" | "updated" | "deleted", "id": 7}` for the
+          tasks the user can see before or after the change (TaskQuerySet
+          visibility; bulk creates may have a null `id`).
+        - project: The same for projects (ProjectQuerySet visibility); member
+          changes are `updated` events for the members before and after.
+        - reset: Events were dropped (slow client or broker reconnect); refresh
+          everything, e.g. from GET /api/tasks/changes/.
+        - expired / revoked: The token expired, or was revoked by a role,
+          password or status change; reconnect with a new token.
+
+    Events only name what changed: clients read the rows through the REST API,
+    typically with the cursor of GET /api/tasks/changes/. A comment is sent
+    every `SSE_HEARTBEAT_SECONDS` so proxies keep idle streams open.
+
+    Each open stream is one suspended coroutine and one empty queue (see
+    task_tracker.events), so one worker holds thousands of idle streams; every
+    worker shares one broker subscription (Redis pub/sub when
+    `EVENTS_REDIS_URL` is set).
+
+    Example:
+        event: task
+        data: {"action":"updated","id":7}
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"detail": "The event stream is only served by the ASGI application (task_tracker.asgi)."}, status=501,
+        )
+    try:
+        authenticated = await sync_to_async(authenticate)(request)
+    except exceptions.AuthenticationFailed as exc:
+        return JsonResponse({"detail": str(exc.detail)}, status=401)
+    if authenticated is None:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+    user, token, role_names = authenticated
+    if not role_names & {Role.ADMIN, Role.TASK_CREATOR, Role.READ_ONLY}:
+        return JsonResponse({"detail": "You do not have permission to perform this action."}, status=403)
+
+    # Subscribed before the response is returned, so no event committed after
+    # this request was answered is missed.
+    subscription = events.get_broker().subscribe()
+    response = StreamingHttpResponse(
+        stream(subscription, user.pk, role_names, token), content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    # Keeps nginx from buffering the stream.
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def authenticate(request):
+    """
+    Authenticates the stream request (see authenticate_request()), taking the
+    token from the `access_token` query parameter when there is no
+    `Authorization` header. Only for this view: elsewhere, tokens in URLs
+    would end up in access logs.
+    """
+    token = request.GET.get(TOKEN_PARAM)
+    if token and "HTTP_AUTHORIZATION" not in request.META:
+        request.META["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+    return authenticate_request(request)
+
+
+async def stream(subscription, user_id, role_names, token):
+    """
+    Yields the SSE messages of `subscription` visible to the user until the
+    token expires or is revoked, or the client disconnects.
+
+    The token version is checked, and a heartbeat sent, every
+    `SSE_HEARTBEAT_SECONDS` however busy the broker is: batches of events
+    (most of them for other users) must not hold off a revocation.
+    """
+    heartbeat = settings.SSE_HEARTBEAT_SECONDS
+    expires_at = token.get("exp")
+    token_version = token.get("token_version")
+    try:
+        yield f"retry: {RETRY_MS}\n\n".encode()
+        next_check = time.monotonic() + heartbeat
+        while True:
+            timeout = next_check - time.monotonic()
+            if expires_at is not None:
+                if expires_at - time.time() <= 0:
+                    yield message("expired", {})
+                    return
+                timeout = min(timeout, expires_at - time.time())
+            if timeout <= 0:
+                if token_version is not None and \
+                        await sync_to_async(get_token_version)(user_id) != token_version:
+                    yield message("revoked", {})
+                    return
+                yield b": ping\n\n"
+                next_check = time.monotonic() + heartbeat
+                continue
+            try:
+                batch = await asyncio.wait_for(subscription.get(), timeout)
+            except asyncio.TimeoutError:
+                continue
+            if batch == events.RESET:
+                yield message("reset", {})
+                continue
+            visible = b"".join(
+                message(event["type"], {key: value for key, value in event.items() if key not in ("type", "audience")})
+                for event in batch
+                if events.is_visible(event, user_id, role_names)
+            )
+            if visible:
+                yield visible
+    finally:
+        subscription.close()
+
+
+def message(name, data):
+    return f"event: {name}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
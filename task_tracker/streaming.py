@@ -0,0 +1,89 @@
+import csv
+
+from .fast_serializers import get_row_mapper
+from .pagination import keyset_chunks
+from .renderers import dumps
+
+STREAM_CHUNK_SIZE = 1000
+
+
+def serialize_chunks(queryset, serializer, ordering, chunk_size=None):
+    """
+    Yields the representation of every row of `queryset` in lists of up to
+    `chunk_size` items, reading one keyset chunk at a time.
+
+    Rows go through the compiled RowMapper when the serializer compiles, and
+    through `serializer`'s class (with its context) otherwise; the related rows
+    of each chunk are eager-loaded with one query per relation either way.
+
+    Args:
+        queryset: Eager-loaded queryset of the serializer's model.
+        serializer: Unbound serializer instance used to render the rows.
+        ordering: Keyset ordering, e.g. `['due_date', 'id']` (see keyset_chunks).
+        chunk_size: Rows per chunk, STREAM_CHUNK_SIZE by default.
+    """
+    chunk_size = chunk_size or STREAM_CHUNK_SIZE
+    mapper = get_row_mapper(serializer)
+    if mapper is not None:
+        for rows in keyset_chunks(mapper.values_queryset(queryset), ordering, chunk_size):
+            yield mapper.map_rows(rows)
+        return
+
+    for instances in keyset_chunks(queryset, ordering, chunk_size):
+        yield type(serializer)(instances, many=True, context=serializer.context).data
+
+
+def json_array_stream(chunks):
+    """
+    Encodes chunks of items as one JSON array, piece by piece, with the same
+    output as `JSONRenderer` for the whole list.
+    """
+    separator = b''
+    yield b'['
+    for chunk in chunks:
+        if not chunk:
+            continue
+        # The chunk encoded as an array, without its brackets.
+        yield separator + dumps(chunk)[1:-1]
+        separator = b','
+    yield b']'
+
+
+def ndjson_stream(chunks):
+    """
+    Encodes chunks of items as newline-delimited JSON, one object per line.
+    """
+    for chunk in chunks:
+        if chunk:
+            yield b''.join(dumps(item) + b'\n' for item in chunk)
+
+
+class _Echo:
+    # File-like object handing each written CSV line back to the caller.
+    def write(self, value):
+        return value
+
+
+def csv_stream(header, chunks):
+    """
+    Encodes a header and chunks of value rows as CSV, one chunk per yield.
+
+    Only the first `len(header)` values of each row are written. Text cells
+    starting with `=`, `+`, `-` or `@` are prefixed with `'` so spreadsheets do
+    not evaluate them as formulas.
+    """
+    writer = csv.writer(_Echo())
+    width = len(header)
+    yield writer.writerow(header).encode('utf-8')
+    for chunk in chunks:
+        yield ''.join(
+            writer.writerow([_csv_cell(value) for value in row[:width]]) for row in chunk
+        ).encode('utf-8')
+
+
+def _csv_cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, str) and value[:1] in ('=', '+', '-', '@'):
+        return "'" + value
+    return value
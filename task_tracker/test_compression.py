@@ -0,0 +1,86 @@
+import gzip
+import json
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, override_settings
+
+from accounts.models import User
+from . import compression
+from .serializers import CustomTokenObtainPairSerializer
+from .testing import APITestCase
+
+
+class CompressionTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = self.create_project()
+        self.create_tasks(20, self.project)
+        self.client = self.client_for(self.admin)
+
+    def test_large_responses_are_compressed_when_accepted(self):
+        plain = self.client.get('/api/tasks/')
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', plain['Vary'])
+
+        response = self.client.get('/api/tasks/', headers={'accept-encoding': 'deflate, gzip;q=0.5'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertEqual(response['ETag'], 'W/' + plain['ETag'])
+        # The weak ETag still validates.
+        self.assertEqual(self.client.get('/api/tasks/', headers={
+            'accept-encoding': 'gzip', 'if-none-match': response['ETag'],
+        }).status_code, 304)
+
+        for accept in ('gzip;q=0', 'identity', 'compress'):
+            with self.subTest(accept=accept):
+                self.assertFalse(self.client.get('/api/tasks/', headers={'accept-encoding': accept})
+                                 .has_header('Content-Encoding'))
+        self.assertEqual(self.client.get('/api/tasks/', headers={'accept-encoding': '*'})['Content-Encoding'], 'gzip')
+
+        small = self.client.get('/api/tasks/?page_size=1&fields=id', headers={'accept-encoding': 'gzip'})
+        self.assertFalse(small.has_header('Content-Encoding'))
+
+    def test_streaming_export_is_compressed(self):
+        plain = b''.join(self.client.get('/api/tasks/export/').streaming_content)
+        response = self.client.get('/api/tasks/export/', headers={'accept-encoding': 'gzip'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), plain)
+        self.assertEqual(compression.get_metrics()['gzip']['bytes_in'], len(plain))
+
+    def test_metrics_are_buffered_in_the_process(self):
+        with patch('task_tracker.counters.cache') as shared:
+            for _ in range(3):
+                self.client.get('/api/tasks/', headers={'accept-encoding': 'gzip'})
+            self.assertFalse(shared.incr.called)
+            with override_settings(REQUEST_METRICS_FLUSH_SECONDS=0):
+                compression.record('gzip', 100, 10, 0)
+        shared.incr.assert_any_call('compression:metrics:gzip:responses', 4)
+
+    @override_settings(RESPONSE_CACHE=True)
+    def test_cache_hits_are_sent_precompressed(self):
+        first = self.client.get('/api/tasks/', headers={'accept-encoding': 'gzip'})
+        with patch('task_tracker.compression.compress') as compress:
+            second = self.client.get('/api/tasks/', headers={'accept-encoding': 'gzip'})
+            self.assertFalse(compress.called)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['Content-Encoding'], 'gzip')
+        self.assertFalse(self.client.get('/api/tasks/').has_header('Content-Encoding'))
+
+        metrics = self.client.get('/api/metrics/compression/').json()['gzip']
+        self.assertEqual((metrics['responses'], metrics['cached']), (2, 1))
+        self.assertEqual(metrics['bytes_saved'], 2 * (len(gzip.decompress(first.content)) - len(first.content)))
+        self.assertGreater(metrics['cpu_ms_per_response'], 0)
+        self.assertEqual(self.client_for(self.create_user('reader@example.com', self.read_only_role))
+                         .get('/api/metrics/compression/').status_code, 403)
+
+    async def test_asgi_responses_are_compressed(self):
+        token = await sync_to_async(
+            lambda: str(CustomTokenObtainPairSerializer.get_token(User.objects.get(pk=self.admin.pk)).access_token)
+        )()
+        response = await AsyncClient().get('/api/async/tasks/', headers={
+            'authorization': f'Bearer {token}', 'accept-encoding': 'gzip',
+        })
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(len(json.loads(gzip.decompress(response.content))['results']), 20)
@@ -0,0 +1,69 @@
+import pstats
+import tempfile
+
+from django.test import override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .testing import APITestCase
+
+
+class ProfilerTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.create_tasks(5, self.create_project())
+        self.client = self.client_for(self.admin)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(PROFILE_DIR=directory.name, PROFILE_KEEP=2)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_admin_profiles_a_request(self):
+        self.assertFalse(self.client.get('/api/tasks/').has_header('X-Profile-Id'))
+        response = self.client.get('/api/tasks/?profile=1')
+        self.assertEqual(response.status_code, 200)
+        profile_id = response['X-Profile-Id']
+
+        listed = self.client.get('/api/profiles/').json()
+        self.assertEqual([profile['id'] for profile in listed], [profile_id])
+        self.assertEqual((listed[0]['path'], listed[0]['status'], listed[0]['user_id']),
+                         ('/api/tasks/?profile=1', 200, self.admin.pk))
+        self.assertNotIn('functions', listed[0])
+
+        detail = self.client.get(f'/api/profiles/{profile_id}/').json()
+        self.assertTrue(any('fast_serializers.py' in row['function'] for row in detail['functions']))
+        self.assertTrue(detail['allocations'])
+
+        download = self.client.get(f'/api/profiles/{profile_id}/download/')
+        self.assertEqual(download['Content-Type'], 'application/octet-stream')
+        with tempfile.NamedTemporaryFile(suffix='.prof') as file:
+            file.write(b''.join(download.streaming_content))
+            file.flush()
+            self.assertTrue(pstats.Stats(file.name).stats)
+
+        self.assertEqual(self.client.get('/api/profiles/../settings/').status_code, 404)
+        self.assertEqual(self.client.get('/api/profiles/20260101T000000-00000000/').status_code, 404)
+
+    def test_header_flag_and_retention(self):
+        ids = [self.client.get('/api/tasks/', headers={'x-profile': '1'})['X-Profile-Id'] for _ in range(3)]
+        self.assertEqual(len(set(ids)), 3)
+        self.assertEqual(len(self.client.get('/api/profiles/').json()), 2)
+        self.assertFalse(self.client.get('/api/tasks/', headers={'x-profile': '0'}).has_header('X-Profile-Id'))
+
+    def test_only_admins_profile_and_read_profiles(self):
+        reader = self.client_for(self.create_user('reader@example.com', self.read_only_role))
+        response = reader.get('/api/tasks/?profile=1')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('X-Profile-Id'))
+        self.assertEqual(self.client.get('/api/profiles/').json(), [])
+        self.assertEqual(reader.get('/api/profiles/').status_code, 403)
+        # Bad credentials are left to the view.
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer nonsense')
+        self.assertEqual(self.client.get('/api/tasks/?profile=1').status_code, 401)
+
+    def test_url_tokens_are_ignored(self):
+        token = RefreshToken.for_user(self.admin).access_token
+        response = APIClient().get(f'/api/tasks/?profile=1&access_token={token}')
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(response.has_header('X-Profile-Id'))
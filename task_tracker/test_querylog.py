@@ -0,0 +1,69 @@
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from tasks.models import Task
+from .querylog import NPlusOneError, fingerprint
+from .testing import APITestCase
+
+
+class QueryInspectorTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        project = self.create_project()
+        for i in range(8):
+            self.create_tasks(1, project, owner=self.create_user(f'owner{i}@example.com', self.read_only_role))
+        self.client = self.client_for(self.admin)
+
+    def without_eager_loading(self):
+        return patch('task_tracker.eager_loading.apply_eager_loading', side_effect=lambda queryset, serializer: queryset)
+
+    def test_fingerprint(self):
+        self.assertEqual(
+            fingerprint('SELECT "id" FROM "t" WHERE "id" IN (%s, %s,%s) AND "name" = \'x\'\n  LIMIT 21'),
+            'SELECT "id" FROM "t" WHERE "id" IN (?) AND "name" = ? LIMIT ?',
+        )
+        self.assertEqual(fingerprint('SELECT "t0"."id" FROM "t" "t0" WHERE "id" = %s'),
+                         'SELECT "t0"."id" FROM "t" "t0" WHERE "id" = ?')
+
+    @override_settings(FAST_SERIALIZERS=False)
+    def test_strict_mode_fails_on_n_plus_one(self):
+        self.assertEqual(self.client.get('/api/tasks/').status_code, 200)
+        with self.without_eager_loading(), self.assertRaises(NPlusOneError) as raised:
+            self.client.get('/api/tasks/')
+        self.assertIn('GET /api/tasks/', str(raised.exception))
+        # The stack points at the code that ran the query.
+        self.assertIn('serializers', str(raised.exception))
+
+    def test_strict_mode_fails_on_writes_per_row(self):
+        def delete_one_by_one(writer, deltas):
+            for task in Task.objects.filter(pk__in=writer.deletes):
+                task.delete()
+            return len(writer.deletes)
+
+        pks = list(Task.objects.values_list('pk', flat=True))
+        with patch('tasks.bulk.BulkTaskWriter.write_deletes', delete_one_by_one), \
+                self.assertRaises(NPlusOneError) as raised:
+            self.client.post('/api/tasks/bulk/', {'delete': pks}, format='json')
+        self.assertIn('POST /api/tasks/bulk/', str(raised.exception))
+        self.assertIn('DELETE', str(raised.exception))
+        self.assertEqual(self.client.post('/api/tasks/bulk/', {'delete': pks}, format='json').status_code, 200)
+
+    @override_settings(FAST_SERIALIZERS=False, QUERY_INSPECTOR_STRICT=False)
+    def test_n_plus_one_is_logged(self):
+        with self.without_eager_loading(), self.assertLogs('task_tracker.querylog', 'WARNING') as logs:
+            self.assertEqual(self.client.get('/api/tasks/').status_code, 200)
+        self.assertIn('N+1 in GET /api/tasks/', logs.output[0])
+        self.assertIn('queries of the same shape', logs.output[0])
+
+    @override_settings(SLOW_QUERY_MS=0)
+    def test_slow_queries_are_logged_with_their_plan(self):
+        with CaptureQueriesContext(connection) as ctx, self.assertLogs('task_tracker.querylog', 'WARNING') as logs:
+            self.client.get('/api/tasks/')
+        # The EXPLAIN queries are captured too, but not inspected.
+        queries = [query for query in ctx.captured_queries if not query['sql'].startswith('EXPLAIN')]
+        slow = [line for line in logs.output if 'Slow query' in line]
+        self.assertEqual(len(slow), len(queries))
+        self.assertRegex(slow[-1], r'Plan:\n.*(SCAN|SEARCH)')
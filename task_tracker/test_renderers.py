@@ -0,0 +1,53 @@
+import datetime
+import io
+from decimal import Decimal
+
+from django.test import override_settings
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from tasks.models import Task
+from .renderers import FastJSONParser, FastJSONRenderer
+from .testing import APITestCase
+
+
+class JSONRendererTests(APITestCase):
+    def test_responses_match_the_stdlib_renderer(self):
+        project = self.create_project(members=[self.admin])
+        task = self.create_tasks(3, project, owner=self.admin)[0]
+        Task.objects.filter(pk=task.pk).update(description='Line\u2028separator, "quoted" \\ é 😀')
+        client = self.client_for(self.admin)
+        for url in ('/api/tasks/', f'/api/tasks/{task.pk}/?expand=project', '/api/projects/', '/api/users/',
+                    '/api/tasks/?status=bogus'):
+            with self.subTest(url=url):
+                fast = client.get(url)
+                with override_settings(FAST_JSON=False):
+                    stock = client.get(url)
+                self.assertEqual(fast.content, stock.content)
+
+    def test_values_orjson_encodes_differently_fall_back(self):
+        values = [
+            {'at': datetime.datetime(2025, 6, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc)},
+            {'on': datetime.date(2025, 6, 1), 'time': datetime.time(9, 5)},
+            {'ratio': 0.95, 'small': 1e-05, 'large': 1e16, 'tiny': 2.5e-300},
+            {'amount': Decimal('1.50'), 'big': 2 ** 70, 1: 'int key'},
+            {'errors': [ErrorDetail('Invalid.', code='invalid')], 'tuple': (1, 2)},
+        ]
+        for value in values:
+            with self.subTest(value=value):
+                self.assertEqual(FastJSONRenderer().render(value), JSONRenderer().render(value))
+        self.assertEqual(FastJSONRenderer().render({'a': 1}, 'application/json; indent=2'), b'{\n  "a": 1\n}')
+
+    def test_parser_matches_the_stdlib_parser(self):
+        for body in (b'{"description": "T\\u00e9", "ids": [1, 2.5, -3e2]}', b'[18446744073709551616]',
+                     b'[123456789012345678901234567890]', '{"é": null}'.encode()):
+            with self.subTest(body=body):
+                self.assertEqual(FastJSONParser().parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body)))
+        for body in (b'{"a": NaN}', b'{"a": ', b'\xef\xbb\xbf{}'):
+            with self.subTest(body=body):
+                with self.assertRaises(ParseError) as fast:
+                    FastJSONParser().parse(io.BytesIO(body))
+                with self.assertRaises(ParseError) as stock:
+                    JSONParser().parse(io.BytesIO(body))
+                self.assertEqual(str(fast.exception), str(stock.exception))
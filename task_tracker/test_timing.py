@@ -0,0 +1,104 @@
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.test import AsyncClient, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import User
+from . import prometheus
+from .serializers import CustomTokenObtainPairSerializer
+from .testing import APITestCase
+
+
+class RequestTimingTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = self.create_project()
+        self.create_tasks(5, self.project)
+        self.client = self.client_for(self.admin)
+        registry = patch.object(prometheus, 'registry', prometheus.Registry())
+        self.registry = registry.start()
+        self.addCleanup(registry.stop)
+
+    def server_timing(self, response):
+        return dict(
+            (part.split(';')[0].strip(), part.split(';', 1)[1] if ';' in part else '')
+            for part in response['Server-Timing'].split(',')
+        )
+
+    def test_server_timing_header(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/tasks/')
+        timing = self.server_timing(response)
+        self.assertEqual(set(timing), {'db', 'serialize', 'total'})
+        self.assertIn(f'desc="{len(ctx.captured_queries)} queries"', timing['db'])
+        self.assertRegex(timing['total'], r'^dur=\d+\.\d$')
+
+        with override_settings(FAST_SERIALIZERS=False):
+            self.assertNotEqual(self.server_timing(self.client.get('/api/tasks/'))['serialize'], 'dur=0.0')
+
+    @override_settings(RESPONSE_CACHE=True)
+    def test_server_timing_counts_response_cache_lookups(self):
+        miss = self.server_timing(self.client.get('/api/tasks/'))
+        hit = self.server_timing(self.client.get('/api/tasks/'))
+        self.assertEqual(miss['cache'], 'desc="hits=0 misses=1"')
+        self.assertEqual(hit['cache'], 'desc="hits=1 misses=0"')
+        # Only authentication queries remain.
+        queries = lambda timing: int(timing['db'].split('desc="')[1].split()[0])
+        self.assertLess(queries(hit), queries(miss))
+
+    async def test_async_views_count_their_queries(self):
+        token = await sync_to_async(
+            lambda: str(CustomTokenObtainPairSerializer.get_token(User.objects.get(pk=self.admin.pk)).access_token)
+        )()
+        response = await AsyncClient().get('/api/async/tasks/', headers={'authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('desc="0 queries"', response['Server-Timing'])
+
+    def test_metrics_endpoint(self):
+        self.client.get('/api/tasks/')
+        self.client.get('/api/tasks/')
+        self.client.get('/api/tasks/999999/')
+
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/plain; charset=utf-8')
+        text = response.content.decode()
+        self.assertIn('# TYPE task_tracker_http_request_duration_seconds histogram', text)
+        self.assertIn('task_tracker_http_request_duration_seconds_bucket{route="task-list",method="GET",le="+Inf"} 2', text)
+        self.assertIn('task_tracker_http_request_duration_seconds_count{route="task-list",method="GET"} 2', text)
+        self.assertIn('task_tracker_http_requests_total{route="task-detail",method="GET",status="404"} 1', text)
+        self.assertRegex(text, r'task_tracker_http_request_db_queries_sum\{route="task-list",method="GET"\} [1-9]')
+
+        self.assertEqual(self.client_for(self.create_user('reader@example.com', self.read_only_role))
+                         .get('/metrics').status_code, 403)
+        self.client.credentials()
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        with override_settings(METRICS_TOKEN='scrape-secret'):
+            self.client.credentials(HTTP_AUTHORIZATION='Bearer scrape-secret')
+            self.assertEqual(self.client.get('/metrics').status_code, 200)
+            self.client.credentials(HTTP_AUTHORIZATION='Bearer wrong-secret')
+            self.assertEqual(self.client.get('/metrics').status_code, 401)
+
+    def test_workers_add_up(self):
+        # Two gunicorn workers, each with its own registry.
+        timing = type('Timing', (), {
+            'total': 0.02, 'db_time': 0.004, 'db_queries': 3, 'serialize_time': 0.001, 'cache_hits': 1, 'cache_misses': 0,
+        })()
+        workers = [prometheus.Registry(), prometheus.Registry()]
+        for worker in workers:
+            worker.observe('task-list', 'GET', 200, timing)
+        workers[1].observe('task-list', 'BREW', 418, timing)
+        for worker in workers:
+            worker.flush()
+
+        text = prometheus.render()
+        self.assertIn('task_tracker_http_request_duration_seconds_bucket{route="task-list",method="GET",le="0.01"} 0', text)
+        self.assertIn('task_tracker_http_request_duration_seconds_bucket{route="task-list",method="GET",le="0.025"} 2', text)
+        self.assertIn('task_tracker_http_request_duration_seconds_sum{route="task-list",method="GET"} 0.04', text)
+        self.assertIn('task_tracker_http_request_db_queries_bucket{route="task-list",method="GET",le="2.0"} 0', text)
+        self.assertIn('task_tracker_http_request_db_queries_sum{route="task-list",method="GET"} 6', text)
+        self.assertIn('task_tracker_http_request_cache_hits_total{route="task-list",method="GET"} 2', text)
+        self.assertIn('task_tracker_http_requests_total{route="task-list",method="other",status="418"} 1', text)
+        self.assertNotIn('cache_misses_total{', text)
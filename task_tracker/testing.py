@@ -0,0 +1,67 @@
+import datetime
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import Role, User
+from projects.models import Project
+from tasks.models import Task
+from . import compression, response_cache, versions
+
+
+class APITestCase(TestCase):
+    """
+    Base test case with role fixtures and helpers to build projects/tasks and
+    authenticate API clients with real JWTs, so every request loads a fresh user.
+    """
+    def setUp(self):
+        # Counts buffered by earlier tests must not reach this test's counters.
+        compression.pending_metrics.flush()
+        response_cache.pending_metrics.flush()
+        cache.clear()
+        versions.unavailable_until = 0.0
+        self.admin_role = Role.objects.create(name=Role.ADMIN)
+        self.creator_role = Role.objects.create(name=Role.TASK_CREATOR)
+        self.read_only_role = Role.objects.create(name=Role.READ_ONLY)
+        self.admin = self.create_user('admin@example.com', self.admin_role)
+        self.project_count = 0
+
+    def create_user(self, email, *roles):
+        user = User.objects.create_user(username=email, email=email, password='x', first_name='F', last_name='L')
+        user.roles.set(roles)
+        return user
+
+    def create_project(self, owner=None, members=()):
+        self.project_count += 1
+        project = Project.objects.create(
+            name=f'Project {self.project_count}', description='desc',
+            start_date=datetime.date(2025, 1, 1), end_date=datetime.date(2025, 12, 31),
+            owner=owner or self.admin,
+        )
+        project.users.set(members)
+        return project
+
+    def create_tasks(self, count, project, **kwargs):
+        return [
+            Task.objects.create(
+                description=f'Task {i}', due_date=datetime.date(2025, 6, 1) + datetime.timedelta(days=i),
+                status=kwargs.get('status', 'new'),
+                project=project, owner=kwargs.get('owner'), creator=kwargs.get('creator', self.admin),
+            )
+            for i in range(count)
+        ]
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+        return client
+
+    def count_queries(self, client, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
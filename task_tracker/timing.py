@@ -0,0 +1,197 @@
+import contextvars
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework import serializers
+
+from . import prometheus
+
+_current = contextvars.ContextVar("request_timing", default=None)
+
+
+class RequestTiming:
+    """
+    What one request spent its time on: database queries, serialization and
+    response cache lookups. Shared with the threads the request runs code in
+    (sync_to_async copies the context), so async views are measured too.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.total = 0.0
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.serializing = False
+
+    def server_timing(self):
+        """
+        Returns the value of the `Server-Timing` header (durations in ms).
+        """
+        metrics = [
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.db_queries} queries"',
+            f'serialize;dur={self.serialize_time * 1000:.1f}',
+        ]
+        if self.cache_hits or self.cache_misses:
+            metrics.append(f'cache;desc="hits={self.cache_hits} misses={self.cache_misses}"')
+        metrics.append(f'total;dur={self.total * 1000:.1f}')
+        return ", ".join(metrics)
+
+
+@contextmanager
+def measure_serialization():
+    """
+    Adds the time spent in the block to the serializer time of the current
+    request. Nested blocks (a row mapper inside a serializer) count once.
+    """
+    timing = _current.get()
+    if timing is None or timing.serializing:
+        yield
+        return
+    timing.serializing = True
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.serialize_time += time.perf_counter() - start
+        timing.serializing = False
+
+
+def record_cache_lookup(hit):
+    """
+    Counts a response cache hit or miss of the current request.
+    """
+    timing = _current.get()
+    if timing is not None:
+        if hit:
+            timing.cache_hits += 1
+        else:
+            timing.cache_misses += 1
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper adding each query and its duration to the
+    current request.
+    """
+    timing = _current.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing.db_time += time.perf_counter() - start
+        timing.db_queries += 1
+
+
+def instrument(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def _instrument_new_connection(sender, connection, **kwargs):
+    instrument(connection)
+
+
+connection_created.connect(_instrument_new_connection)
+
+
+class TimedSerializerMixin:
+    """
+    Serializer mixin counting the time spent building `.data` as serializer
+    time of the request (see TimingMiddleware). Lists (`many=True`) are
+    measured by TimedListSerializer; set it as `Meta.list_serializer_class`.
+    """
+
+    @property
+    def data(self):
+        with measure_serialization():
+            return super().data
+
+
+class TimedListSerializer(serializers.ListSerializer):
+    @property
+    def data(self):
+        with measure_serialization():
+            return super().data
+
+
+class TimingMiddleware:
+    """
+    Measures every request and reports it twice:
+
+        - A `Server-Timing` header with the database time and query count,
+          the serializer time (serializers and row mappers), the response
+          cache hits and misses, and the total time, e.g.
+
+              Server-Timing: db;dur=3.1;desc="7 queries", serialize;dur=1.4,
+                             cache;desc="hits=0 misses=1", total;dur=9.8
+
+          Browser dev tools show it in the request's timing tab.
+        - Per-route histograms (see task_tracker.prometheus), exposed in the
+          Prometheus text format by `GET /metrics`.
+
+    Queries are counted through a database execute wrapper installed on every
+    connection, so queries of the threads async views hop to count as well.
+    The total is the time until the response is returned; streamed bodies are
+    sent afterwards.
+
+    Place it first in MIDDLEWARE so the total covers the other middlewares.
+    Disable with `REQUEST_TIMING=0` in the environment.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        # Connections opened before this module was imported.
+        for connection in connections.all(initialized_only=True):
+            instrument(connection)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not settings.REQUEST_TIMING:
+            return self.get_response(request)
+        timing = RequestTiming()
+        token = _current.set(timing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.process_response(request, response, timing)
+        if prometheus.registry.flush_due():
+            prometheus.registry.flush()
+        return response
+
+    async def __acall__(self, request):
+        if not settings.REQUEST_TIMING:
+            return await self.get_response(request)
+        timing = RequestTiming()
+        token = _current.set(timing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.process_response(request, response, timing)
+        if prometheus.registry.flush_due():
+            await sync_to_async(prometheus.registry.flush, thread_sensitive=False)()
+        return response
+
+    def process_response(self, request, response, timing):
+        timing.total = time.perf_counter() - timing.start
+        response.headers["Server-Timing"] = timing.server_timing()
+        match = request.resolver_match
+        prometheus.registry.observe(
+            match.view_name if match is not None else None, request.method, response.status_code, timing
+        )
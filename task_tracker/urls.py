@@ -14,11 +14,15 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from .views import CustomTokenObtainPairView, health
+from .sse import event_stream
+from .views import (
+    CustomTokenObtainPairView, compression_metrics, health, metrics, profile_detail, profile_download, profile_list,
+    response_cache_metrics,
+)
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework import routers
-from tasks.views import TaskViewSet
+from tasks.views import AnalyticsViewSet, TaskViewSet
 from projects.views import ProjectViewSet
 from accounts.views import RoleViewSet, UserViewSet
 from drf_yasg.views import get_schema_view
@@ -34,6 +38,7 @@ router.register(r'tasks', TaskViewSet)
 router.register(r'projects', ProjectViewSet)
 router.register(r'users', UserViewSet)
 router.register(r'roles', RoleViewSet)
+router.register(r'analytics', AnalyticsViewSet, basename='analytics')
 
 schema_view = get_schema_view(
     openapi.Info(
@@ -50,6 +55,21 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include(router.urls)),
     path('api/', include("sso.urls")),
+    path('api/events/', event_stream, name='event_stream'),
+    # Async reads for ASGI deployments (see AsyncReadViewSetMixin).
+    path('api/async/tasks/', TaskViewSet.as_async_view('list'), name='async-task-list'),
+    path('api/async/tasks/<int:pk>/', TaskViewSet.as_async_view('retrieve'), name='async-task-detail'),
+    path('api/async/projects/', ProjectViewSet.as_async_view('list'), name='async-project-list'),
+    path('api/async/projects/<int:pk>/', ProjectViewSet.as_async_view('retrieve'), name='async-project-detail'),
+    path('api/async/users/', UserViewSet.as_async_view('list'), name='async-user-list'),
+    path('api/async/users/me/', UserViewSet.as_async_view('me'), name='async-user-me'),
+    path('api/async/users/<int:pk>/', UserViewSet.as_async_view('retrieve'), name='async-user-detail'),
+    path('api/metrics/response-cache/', response_cache_metrics, name='response_cache_metrics'),
+    path('api/metrics/compression/', compression_metrics, name='compression_metrics'),
+    path('metrics', metrics, name='metrics'),
+    path('api/profiles/', profile_list, name='profile_list'),
+    path('api/profiles/<str:profile_id>/', profile_detail, name='profile_detail'),
+    path('api/profiles/<str:profile_id>/download/', profile_download, name='profile_download'),
     path("api/token/", CustomTokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
@@ -0,0 +1,137 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+VERSION_KEY = "versions:{}"
+MODIFIED_KEY = "versions:{}:modified"
+
+# Until this time.monotonic() value, a bump of this process failed and the
+# versions it reads may be older than the rows (see get_versions()).
+unavailable_until = 0.0
+
+
+def track(model, *related):
+    """
+    Keeps a version (generation counter and last modification time) of
+    `model`, bumped by its save/delete signals.
+
+    `related` are the many-to-many fields of `model` whose changes also count
+    as changes of `model` (e.g. `Project.users` changes the member count).
+
+    Writes that skip signals (`QuerySet.update()`, `bulk_create()`,
+    `bulk_update()`) must call `bump(model)`.
+    """
+    label = model._meta.label
+    post_save.connect(_bump_sender, sender=model, dispatch_uid=f"versions:{label}:save")
+    post_delete.connect(_bump_sender, sender=model, dispatch_uid=f"versions:{label}:delete")
+    for field in related:
+        through = getattr(model, field).through
+        m2m_changed.connect(
+            _bump_m2m(model), sender=through, weak=False, dispatch_uid=f"versions:{label}:{field}",
+        )
+
+
+def bump(*models):
+    """
+    Marks `models` as changed: every version read afterwards differs from the
+    ones read before.
+
+    Inside a transaction the versions are bumped again on commit: a reader may
+    see the first bump but still read the uncommitted (old) rows, and must not
+    be able to cache them under the new version.
+    """
+    _bump(models)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _bump(models))
+
+
+def _bump(models):
+    global unavailable_until
+    now = time.time()
+    for model in models:
+        label = model._meta.label
+        if not _increment(VERSION_KEY.format(label)):
+            # The cache ignored the error (IGNORE_EXCEPTIONS): the version no
+            # longer tells whether the rows changed.
+            unavailable_until = time.monotonic() + settings.VERSIONS_MAX_STALENESS_SECONDS
+        cache.set(MODIFIED_KEY.format(label), now, timeout=None)
+
+
+def window():
+    """
+    Returns the current VERSIONS_MAX_STALENESS_SECONDS period, part of every
+    ETag and response cache key.
+
+    A bump lost while the cache is unreachable leaves the versions unchanged;
+    the other workers, which cannot know, stop answering from them when the
+    period ends.
+    """
+    return int(time.time() // settings.VERSIONS_MAX_STALENESS_SECONDS)
+
+
+def get_versions(models):
+    """
+    Returns {label: (generation, modified timestamp)} for `models`, or None if
+    the cache is unavailable or a bump of this process failed in the last
+    VERSIONS_MAX_STALENESS_SECONDS.
+
+    Versions missing from the cache (first use, eviction or flush) are started
+    at the current time in nanoseconds, so they never repeat a value handed out
+    before the cache lost them.
+    """
+    if time.monotonic() < unavailable_until:
+        return None
+    keys = {}
+    for model in models:
+        label = model._meta.label
+        keys[label] = (VERSION_KEY.format(label), MODIFIED_KEY.format(label))
+    stored = cache.get_many([key for pair in keys.values() for key in pair])
+    versions = {}
+    for label, (version_key, modified_key) in keys.items():
+        generation, modified = stored.get(version_key), stored.get(modified_key)
+        if generation is None or modified is None:
+            now = time.time()
+            cache.add(version_key, time.time_ns(), timeout=None)
+            cache.add(modified_key, now, timeout=None)
+            generation, modified = cache.get(version_key), cache.get(modified_key)
+            if generation is None or modified is None:
+                return None
+        versions[label] = (generation, modified)
+    return versions
+
+
+def get_request_versions(request, models):
+    """
+    get_versions() read at most once per request, shared by the conditional
+    GET and response cache mixins.
+    """
+    memo = request.__dict__.setdefault("_model_versions", {})
+    key = tuple(model._meta.label for model in models)
+    if key not in memo:
+        memo[key] = get_versions(models)
+    return memo[key]
+
+
+def _increment(key):
+    """
+    Returns whether the version changed: a cache ignoring its errors returns
+    None instead of raising.
+    """
+    try:
+        return cache.incr(key) is not None
+    except ValueError:
+        return cache.add(key, time.time_ns(), timeout=None) is not None
+
+
+def _bump_sender(sender, **kwargs):
+    bump(sender)
+
+
+def _bump_m2m(model):
+    def receiver(sender, action, **kwargs):
+        if action.startswith("post_"):
+            bump(model)
+    return receiver
@@ -1,7 +1,14 @@
+import json
+
+from django.http import FileResponse, Http404
 from rest_framework.response import Response
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.decorators import api_view, authentication_classes, permission_classes, renderer_classes, throttle_classes
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.settings import api_settings
 from rest_framework_simplejwt.views import TokenObtainPairView
+from accounts.permissions import IsAdmin
+from . import compression, profiling, prometheus
+from .response_cache import get_metrics
 from .serializers import CustomTokenObtainPairSerializer
 
 @api_view(['GET'])
@@ -22,5 +29,138 @@ def health(request):
     }, 200)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdmin])
+def response_cache_metrics(request):
+    """
+    Hit and miss counters of the response cache per view, aggregated over
+    every worker (see CachedResponseViewSetMixin). Admin only.
+
+    Example response:
+    {
+        "TaskViewSet": {"hits": 950, "misses": 50, "hit_ratio": 0.95},
+        "UserViewSet": {"hits": 0, "misses": 0, "hit_ratio": null},
+        ...
+    }
+    """
+    return Response(get_metrics())
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdmin])
+def compression_metrics(request):
+    """
+    Bytes saved and CPU time of response compression per content coding,
+    aggregated over every worker (see CompressionMiddleware). Admin only.
+
+    Example response:
+    {
+        "br": {"responses": 0, "cached": 0, "bytes_in": 0, ...},
+        "gzip": {
+            "responses": 120, "cached": 80, "bytes_in": 9437184, "bytes_out": 1048576,
+            "bytes_saved": 8388608, "ratio": 0.111, "cpu_ms": 240.0,
+            "bytes_saved_per_response": 69905, "cpu_ms_per_response": 2.0
+        }
+    }
+    """
+    return Response(compression.get_metrics())
+
+
+@api_view(['GET'])
+@authentication_classes([prometheus.MetricsTokenAuthentication, *api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+@permission_classes([prometheus.IsMetricsScraperOrAdmin])
+@renderer_classes([prometheus.PrometheusRenderer])
+@throttle_classes([])
+def metrics(request):
+    """
+    Per-route request histograms (total, database and serializer time, query
+    count) and counters (status codes, response cache hits and misses) in the
+    Prometheus text format, aggregated over every worker (see TimingMiddleware).
+
+    Permissions:
+        - The Prometheus scraper, with `Authorization: Bearer <METRICS_TOKEN>`.
+        - Users with the 'admin' role.
+
+    Example response:
+        # HELP task_tracker_http_request_duration_seconds Time until the response is returned.
+        # TYPE task_tracker_http_request_duration_seconds histogram
+        task_tracker_http_request_duration_seconds_bucket{route="task-list",method="GET",le="0.005"} 12
+        ...
+        task_tracker_http_request_duration_seconds_bucket{route="task-list",method="GET",le="+Inf"} 40
+        task_tracker_http_request_duration_seconds_sum{route="task-list",method="GET"} 0.61
+        task_tracker_http_request_duration_seconds_count{route="task-list",method="GET"} 40
+    """
+    # Include what this worker has not flushed yet.
+    prometheus.registry.flush()
+    return Response(prometheus.render())
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdmin])
+def profile_list(request):
+    """
+    Request profiles taken on demand (`X-Profile: 1` or `?profile=1`, see
+    ProfilerMiddleware) by this server, newest first. Admin only.
+
+    Example response:
+    [
+        {
+            "id": "20261018T101500-3f9a0c1e",
+            "created_at": "2026-10-18T10:15:00.123456+00:00",
+            "method": "GET",
+            "path": "/api/tasks/?status=new&profile=1",
+            "status": 200,
+            "user_id": 1,
+            "duration_ms": 84.2,
+            "peak_memory_bytes": 2097152
+        },
+        ...
+    ]
+    """
+    return Response(profiling.list_profiles())
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdmin])
+def profile_detail(request, profile_id):
+    """
+    Summary of one profile: the fields of the list, plus the top functions by
+    cumulative time and the top allocation sites. Admin only.
+
+    Example response:
+    {
+        "id": "20261018T101500-3f9a0c1e",
+        ...
+        "functions": [
+            {"function": "/app/tasks/views.py:120(list)", "calls": 1, "total_ms": 0.1, "cumulative_ms": 80.3},
+            ...
+        ],
+        "allocations": [
+            {"site": "/app/task_tracker/fast_serializers.py:190", "bytes": 524288, "count": 2001},
+            ...
+        ]
+    }
+    """
+    path = profiling.profile_path(profile_id, '.json')
+    if path is None:
+        raise Http404("No profile matches the given id.")
+    with open(path) as file:
+        return Response(json.load(file))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdmin])
+def profile_download(request, profile_id):
+    """
+    Downloads the cProfile dump of a profile, for `python -m pstats` or
+    snakeviz. Admin only.
+    """
+    path = profiling.profile_path(profile_id, '.prof')
+    if path is None:
+        raise Http404("No profile matches the given id.")
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=path.name,
+                        content_type='application/octet-stream')
+
+
 class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
\ No newline at end of file
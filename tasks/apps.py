@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
+
+    def ready(self):
+        from task_tracker import search, versions
+        from . import signals  # noqa: F401
+        from .models import Task
+
+        search.register(Task, ['description'])
+        versions.track(Task)
@@ -0,0 +1,355 @@
+from collections import Counter
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from task_tracker import events, search, versions
+from task_tracker.relations import prefetch_related_ids
+from .changes import record_change, task_event
+from .filters import TaskFilterBackend
+from .models import Task, TaskChangeSequence
+from .serializers import TaskSerializer
+from .stats import adjust_project_stats
+
+# Operations accepted by bulk_write(), applied in this order.
+BULK_OPERATIONS = ('create', 'update', 'update_where', 'delete')
+
+# Rows at most per `create`, `update` and `delete` list; `update_where` is not
+# limited since it is applied with UPDATE statements.
+BULK_MAX_ROWS = 1000
+
+# Primary keys per UPDATE statement of `update_where`.
+UPDATE_BATCH_SIZE = 1000
+
+# Fields read-only users may change (see TaskViewSet.get_permissions).
+STATUS_ONLY_FIELDS = {'status'}
+
+
+def is_status_only(data):
+    """
+    Returns True if a bulk payload only changes task statuses: `update` rows of
+    `id` and `status` and/or an `update_where` setting `status`. Such payloads
+    are allowed to read-only users, like a single-field status PATCH.
+    """
+    if not isinstance(data, dict) or not data or set(data) - {'update', 'update_where'}:
+        return False
+    updates = data.get('update', [])
+    if not isinstance(updates, list) or not all(
+        isinstance(row, dict) and set(row) - {'id'} and set(row) - {'id'} <= STATUS_ONLY_FIELDS for row in updates
+    ):
+        return False
+    where = data.get('update_where', {'set': {'status': None}})
+    return isinstance(where, dict) and isinstance(where.get('set'), dict) and set(where['set']) == STATUS_ONLY_FIELDS
+
+
+def bulk_write(request, queryset, context):
+    """
+    Creates, updates and deletes tasks in one transaction.
+
+    `queryset` must already be restricted to the tasks the user may read;
+    updates and deletes of other tasks are rejected as missing.
+
+    Request body (every key optional, at least one required):
+    {
+        "create": [{"description": "...", "due_date": "2025-06-15", "status": "new", "project_id": 2}, ...],
+        "update": [{"id": 7, "status": "completed"}, {"id": 8, "owner_id": 5}, ...],
+        "update_where": {"filter": {"project": 2, "status": "new,in_progress"}, "set": {"status": "completed"}},
+        "delete": [9, 10]
+    }
+
+    `update` rows are partial updates; `update_where` applies `set` to every
+    task matching `filter` (the TaskFilterBackend parameters). Created tasks
+    get the requesting user as creator, as in TaskViewSet.perform_create().
+
+    The whole payload is validated before anything is written, related IDs
+    are looked up once for all rows, and the writes are one `bulk_create`,
+    one `bulk_update`, batched `UPDATE ... WHERE id IN (...)` statements and
+    one DELETE.
+    ProjectTaskStats, the search index and the change feed (see
+    tasks/changes.py) are updated for the rows written, and their change
+    events are published as one message.
+
+    Returns:
+        Response: `{"created": 2, "updated": 302, "deleted": 2}`, `updated`
+        counting distinct tasks.
+
+    Raises:
+        ValidationError: Errors keyed by operation; `create`, `update` and
+        `delete` errors are lists aligned with the submitted rows.
+    """
+    data = request.data
+    if not isinstance(data, dict) or not data or set(data) - set(BULK_OPERATIONS):
+        raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+            f'Expected an object with any of: {", ".join(BULK_OPERATIONS)}.'
+        ]})
+
+    writer = BulkTaskWriter(request, queryset, context)
+    with transaction.atomic():
+        writer.validate(data)
+        return Response(writer.write())
+
+
+class BulkTaskWriter:
+    """
+    Validates and applies one bulk_write() payload. Updated rows are read with
+    `SELECT ... FOR UPDATE` (the `update` rows while validating, the
+    `update_where` rows when written), so the counters derived from their
+    previous values stay exact under concurrent writes.
+    """
+
+    def __init__(self, request, queryset, context):
+        self.request = request
+        self.queryset = queryset
+        self.context = context
+        self.errors = {}
+        self.creates, self.updates, self.update_where, self.deletes = [], [], None, []
+        # Whether searchable text was written without the model signals.
+        self.text_changed = False
+        # Change feed placeholder of the rows written without the model signals
+        # (see tasks.changes.record_change()), and the tasks whose owner or
+        # creator those writes changed.
+        self.change_seq = None
+        self.reassigned = []
+        self.events = []
+
+    def validate(self, data):
+        for operation in BULK_OPERATIONS:
+            if operation in data:
+                getattr(self, f'validate_{operation}')(data[operation])
+        if self.errors:
+            raise ValidationError(self.errors)
+
+    def write(self):
+        deltas = Counter()
+        if self.creates or self.updates or self.update_where is not None:
+            self.change_seq = TaskChangeSequence.placeholder()
+        created = self.write_creates(deltas)
+        # A task changed by both `update` and `update_where` counts once.
+        updated = len(self.write_updates(deltas) | self.write_update_where(deltas))
+        # After the updates, so the counters decremented are the ones written.
+        deleted = self.write_deletes(deltas)
+        adjust_project_stats(deltas)
+        if self.change_seq is not None:
+            record_change(self.change_seq, self.reassigned, deleted=False)
+        events.publish(self.events)
+        if created or self.text_changed:
+            search.invalidate(Task)
+        if created or updated or deleted:
+            versions.bump(Task)
+        return {'created': created, 'updated': updated, 'deleted': deleted}
+
+    def validate_create(self, rows):
+        if not self.check_rows('create', rows):
+            return
+        serializer = TaskSerializer(data=rows, many=True, context=self.context)
+        if not serializer.is_valid():
+            self.errors['create'] = serializer.errors
+            return
+        # As serializer.save(creator=...) in perform_create(): the user wins over `creator_id`.
+        self.creates = [Task(**{**attrs, 'creator': self.request.user}) for attrs in serializer.validated_data]
+
+    def validate_update(self, rows):
+        if not self.check_rows('update', rows):
+            return
+        ids = self.parse_ids('update', [row.get('id') if isinstance(row, dict) else None for row in rows])
+        if ids is None:
+            return
+        instances = self.queryset.select_for_update().in_bulk(ids)
+        prefetch_related_ids(TaskSerializer(context=self.context), rows)
+        errors, valid = [], True
+        for pk, row in zip(ids, rows):
+            instance = instances.get(pk)
+            if instance is None:
+                errors.append({'id': [f'Task {pk} does not exist.']})
+                valid = False
+                continue
+            fields = {key: value for key, value in row.items() if key != 'id'}
+            serializer = TaskSerializer(instance, data=fields, partial=True, context=self.context)
+            unknown = set(fields) - set(serializer.fields)
+            if not fields:
+                errors.append({api_settings.NON_FIELD_ERRORS_KEY: ['Expected one or more task fields.']})
+                valid = False
+            elif unknown:
+                errors.append({api_settings.NON_FIELD_ERRORS_KEY: [f'Unknown fields: {", ".join(sorted(unknown))}.']})
+                valid = False
+            elif serializer.is_valid():
+                errors.append({})
+                self.updates.append((instance, serializer.validated_data))
+            else:
+                errors.append(serializer.errors)
+                valid = False
+        if not valid:
+            self.errors['update'] = errors
+
+    def validate_update_where(self, where):
+        if not isinstance(where, dict) or not isinstance(where.get('filter'), dict) \
+                or not isinstance(where.get('set'), dict) or set(where) - {'filter', 'set'}:
+            self.errors['update_where'] = ['Expected an object with "filter" and "set" objects.']
+            return
+        backend = TaskFilterBackend()
+        params = {
+            key: ','.join(str(item) for item in value) if isinstance(value, list) else str(value)
+            for key, value in where['filter'].items()
+        }
+        unknown = set(params) - set(backend.get_param_names())
+        if not params or unknown:
+            self.errors['update_where'] = {'filter': [
+                f'Expected any of: {", ".join(backend.get_param_names())}.'
+            ]}
+            return
+        serializer = TaskSerializer(data=where['set'], partial=True, context=self.context)
+        unknown = set(where['set']) - set(serializer.fields)
+        if not where['set'] or unknown:
+            self.errors['update_where'] = {'set': ['Expected one or more task fields.']}
+            return
+        try:
+            tasks = backend.filter_params(params, self.queryset)
+        except ValidationError as exc:
+            self.errors['update_where'] = {'filter': exc.detail}
+            return
+        if not serializer.is_valid():
+            self.errors['update_where'] = {'set': serializer.errors}
+            return
+        self.update_where = (tasks, serializer.validated_data)
+
+    def validate_delete(self, ids):
+        if not self.check_rows('delete', ids):
+            return
+        ids = self.parse_ids('delete', ids)
+        if ids is None:
+            return
+        found = set(self.queryset.filter(pk__in=ids).values_list('pk', flat=True))
+        if len(found) < len(ids):
+            self.errors['delete'] = [{} if pk in found else {'id': [f'Task {pk} does not exist.']} for pk in ids]
+            return
+        self.deletes = ids
+
+    def check_rows(self, operation, rows):
+        if not isinstance(rows, list) or not rows:
+            self.errors[operation] = ['Expected a non-empty list.']
+        elif len(rows) > BULK_MAX_ROWS:
+            self.errors[operation] = [f'At most {BULK_MAX_ROWS} rows per request.']
+        else:
+            return True
+        return False
+
+    def parse_ids(self, operation, values):
+        """
+        Returns the task IDs in `values`, or None after recording a per-row error
+        for every invalid or repeated ID.
+        """
+        ids, errors = [], []
+        for value in values:
+            try:
+                pk = Task._meta.pk.to_python(value) if not isinstance(value, bool) and value is not None else None
+            except (DjangoValidationError, TypeError, ValueError):
+                pk = None
+            if pk is None:
+                errors.append({'id': ['Expected a task ID.']})
+            elif pk in ids:
+                errors.append({'id': [f'Task {pk} is listed more than once.']})
+            else:
+                errors.append({})
+            ids.append(pk)
+        if any(errors):
+            self.errors[operation] = errors
+            return None
+        return ids
+
+    def write_creates(self, deltas):
+        for task in self.creates:
+            task.change_seq = self.change_seq
+        Task.objects.bulk_create(self.creates, batch_size=500)
+        deltas.update((task.project_id, task.status) for task in self.creates)
+        # Without the IDs on databases that do not return them from bulk inserts.
+        self.events.extend(
+            task_event('created', task.pk, owners=[task.owner_id], creators=[task.creator_id])
+            for task in self.creates
+        )
+        return len(self.creates)
+
+    def write_updates(self, deltas):
+        """
+        Writes the `update` rows and returns their primary keys.
+        """
+        if not self.updates:
+            return set()
+        fields, now = {'updated_at', 'change_seq'}, timezone.now()
+        for instance, attrs in self.updates:
+            instance.updated_at, instance.change_seq = now, self.change_seq
+            deltas[(instance.project_id, instance.status)] -= 1
+            previous = (instance.owner_id, instance.creator_id)
+            for attr, value in attrs.items():
+                setattr(instance, attr, value)
+            deltas[(instance.project_id, instance.status)] += 1
+            self.record_reassigned(instance.pk, previous, (instance.owner_id, instance.creator_id))
+            fields.update(attrs)
+        self.text_changed |= 'description' in fields
+        Task.objects.bulk_update([instance for instance, _ in self.updates], sorted(fields), batch_size=500)
+        return {instance.pk for instance, _ in self.updates}
+
+    def write_update_where(self, deltas):
+        """
+        Applies `update_where` and returns the primary keys of the tasks it
+        changed.
+        """
+        if self.update_where is None:
+            return set()
+        # Read (and locked) after the `update` rows are written, so the counters
+        # start from their new values.
+        tasks, attrs = self.update_where
+        rows = list(tasks.select_for_update().order_by().values_list(
+            'pk', 'project_id', 'status', 'owner_id', 'creator_id'
+        ))
+        self.text_changed |= 'description' in attrs
+        project = attrs['project'].pk if 'project' in attrs else None
+        users = {name: getattr(attrs[name], 'pk', None) for name in ('owner', 'creator') if name in attrs}
+        for pk, project_id, status, owner_id, creator_id in rows:
+            deltas[(project_id, status)] -= 1
+            deltas[(project or project_id, attrs.get('status', status))] += 1
+            self.record_reassigned(
+                pk, (owner_id, creator_id), (users.get('owner', owner_id), users.get('creator', creator_id)),
+            )
+        pks = [row[0] for row in rows]
+        for start in range(0, len(pks), UPDATE_BATCH_SIZE):
+            Task.objects.filter(pk__in=pks[start:start + UPDATE_BATCH_SIZE]).update(
+                **attrs, updated_at=timezone.now(), change_seq=self.change_seq,
+            )
+        return set(pks)
+
+    def record_reassigned(self, pk, previous, current):
+        self.events.append(task_event(
+            'updated', pk, owners=[previous[0], current[0]], creators=[previous[1], current[1]],
+        ))
+        # Previous owner and/or creator who may no longer see the task.
+        if previous != current:
+            self.reassigned.append((pk, *(old if old != new else None for old, new in zip(previous, current))))
+
+    def write_deletes(self, deltas):
+        """
+        Deletes the `delete` rows with one DELETE and returns their number.
+
+        The per-row model signals are skipped: the counters, change feed,
+        events and search index are updated once for all the rows, as when a
+        project is deleted (see tasks/signals.py).
+        """
+        if not self.deletes:
+            return 0
+        tasks = Task.objects.filter(pk__in=self.deletes)
+        rows = list(tasks.select_for_update().order_by('pk').values_list(
+            'pk', 'project_id', 'status', 'owner_id', 'creator_id'
+        ))
+        # No model references tasks, so nothing cascades.
+        deleted = tasks._raw_delete(tasks.db)
+        deltas.subtract((project_id, status) for _, project_id, status, _, _ in rows)
+        record_change(tombstones=[(pk, owner_id, creator_id) for pk, _, _, owner_id, creator_id in rows])
+        self.events.extend(
+            task_event('deleted', pk, owners=[owner_id], creators=[creator_id])
+            for pk, _, _, owner_id, creator_id in rows
+        )
+        search.rows_deleted(Task, [row[0] for row in rows])
+        return deleted
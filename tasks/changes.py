@@ -0,0 +1,245 @@
+import json
+import time
+from base64 import b64decode, b64encode
+
+from django.db import OperationalError, connections, router, transaction
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import _positive_int
+from rest_framework.response import Response
+
+from accounts.models import Role
+from task_tracker.eager_loading import apply_eager_loading
+from task_tracker.events import event_audience
+from task_tracker.fast_serializers import get_row_mapper
+from task_tracker.pagination import keyset_condition, row_position, with_ordering_columns
+from .models import Task, TaskChangeSequence, TaskTombstone
+from .serializers import TaskSerializer
+
+SINCE_PARAM = 'since'
+PAGE_SIZE_PARAM = 'page_size'
+CHANGES_PAGE_SIZE = 200
+CHANGES_MAX_PAGE_SIZE = 1000
+
+# Attempts at numbering a committed write, waiting NUMBERING_RETRY_SECONDS
+# times the attempt number in between.
+NUMBERING_ATTEMPTS = 3
+NUMBERING_RETRY_SECONDS = 0.05
+
+TASK_POSITION = ['change_seq', 'id']
+TOMBSTONE_POSITION = ['change_seq', 'task_id']
+
+
+def record_tombstones(rows, change_seq, deleted=True):
+    """
+    Records the tasks `rows`, (task_id, owner_id, creator_id) tuples, as gone
+    from the change feed at `change_seq` (see TaskTombstone).
+    """
+    TaskTombstone.objects.bulk_create(
+        [
+            TaskTombstone(change_seq=change_seq, task_id=task_id, owner_id=owner_id, creator_id=creator_id,
+                          deleted=deleted)
+            for task_id, owner_id, creator_id in rows
+        ],
+        batch_size=1000,
+    )
+
+
+def record_change(placeholder=None, tombstones=(), deleted=True):
+    """
+    Numbers a task write once the current transaction commits: the tasks it
+    wrote with `placeholder` as `change_seq` (see
+    TaskChangeSequence.placeholder()) and its `tombstones` rows (see
+    record_tombstones()), recorded now under the same placeholder, move to
+    the next sequence number.
+
+    The number is taken in a short transaction of its own, so the counter row
+    is locked while a few rows are numbered rather than for the whole write.
+    It is retried on database errors (lock wait timeouts, deadlocks, lost
+    connections); rows still left unnumbered, e.g. when the process dies in
+    between, are numbered by number_pending_changes().
+    """
+    tombstones = list(tombstones)
+    if placeholder is None:
+        if not tombstones:
+            return
+        placeholder = TaskChangeSequence.placeholder()
+    record_tombstones(tombstones, placeholder, deleted)
+    transaction.on_commit(lambda: _number_change(placeholder), robust=True)
+
+
+def _number_change(placeholder):
+    for attempt in range(1, NUMBERING_ATTEMPTS + 1):
+        try:
+            return number_changes(change_seq=placeholder)
+        except OperationalError:
+            if attempt == NUMBERING_ATTEMPTS:
+                raise
+            connection = connections[router.db_for_write(Task)]
+            if not connection.in_atomic_block:
+                connection.close_if_unusable_or_obsolete()
+            time.sleep(NUMBERING_RETRY_SECONDS * attempt)
+
+
+def number_changes(**condition):
+    """
+    Moves the tasks and tombstones matching `condition` (e.g.
+    `change_seq=placeholder`) to the next sequence number, and returns how
+    many rows were numbered.
+    """
+    with transaction.atomic():
+        # The rows are locked before the counter: waiting on a task that another
+        # write holds must not stall every other write.
+        tasks = Task.objects.filter(**condition)
+        tombstones = TaskTombstone.objects.filter(**condition)
+        locked = len(tasks.select_for_update().order_by('pk').values_list('pk', flat=True)) \
+            + len(tombstones.select_for_update().order_by('pk').values_list('pk', flat=True))
+        if not locked:
+            return 0
+        change_seq = TaskChangeSequence.next_value()
+        return tasks.update(change_seq=change_seq) + tombstones.update(change_seq=change_seq)
+
+
+def number_pending_changes():
+    """
+    Numbers every committed write whose numbering failed (its rows still have
+    a negative `change_seq`), and returns how many rows were numbered. Run
+    from the `number_task_changes` command on a schedule.
+    """
+    return number_changes(change_seq__lt=0)
+
+
+def task_event(action, pk, owners=(), creators=()):
+    """
+    Returns the change event (see task_tracker.events.publish) of a task,
+    visible to the read-only users among `owners` and the task creators among
+    `creators`, as in TaskQuerySet.visible_to().
+    """
+    return {
+        'type': 'task', 'action': action, 'id': pk,
+        'audience': event_audience(**{Role.READ_ONLY: owners, Role.TASK_CREATOR: creators}),
+    }
+
+
+def task_changes(request, queryset, context):
+    """
+    Returns the tasks of `queryset` written since a cursor, and the IDs of the
+    tasks the user lost since then, so clients refresh a local copy without
+    listing every task again.
+
+    `queryset` must be the tasks visible to the user (TaskViewSet.get_queryset).
+    Every task write takes a number from TaskChangeSequence right after it
+    commits (see record_change()), stored on the task (`change_seq`) and on
+    the tombstones it leaves; numbers are handed out in commit order, so a
+    cursor never skips a change that commits later. Changes
+    are read in `(change_seq, id)` order through the `task_change_seq_id_idx`
+    and `task_tombstone_seq_idx` indexes.
+
+    A task is `removed` when it was deleted (directly, in bulk or with its
+    project), or when its owner or creator changed and the user can no longer
+    see it. Tasks that come into view appear in `changes`.
+
+    Query Parameters:
+        - since: `cursor` of the previous response. Without it, every visible
+          task is returned (a full sync) and nothing is removed.
+        - page_size: Number of changes per response (default 200, at most 1000).
+          Repeat with the new cursor while `has_more` is true.
+        - fields / expand: Applied to `changes` as in the task list.
+
+    Nested projects and users are rendered as they are now; changing them does
+    not move a task in the feed. Clients should drop their copy and sync from
+    scratch when the user's roles change.
+
+    Example response:
+    {
+        "changes": [{"id": 7, "status": "completed", ...}],
+        "removed": [3, 12],
+        "cursor": "WzQyLDEyXQ==",
+        "has_more": false
+    }
+
+    Raises:
+        ValidationError: `since` is not a cursor returned by this endpoint.
+    """
+    since = decode_since(request.query_params.get(SINCE_PARAM))
+    limit = _page_size(request)
+    serializer = TaskSerializer(context=context)
+
+    tasks = apply_eager_loading(queryset, serializer)
+    if since is not None:
+        tasks = tasks.filter(keyset_condition(TASK_POSITION, since))
+    else:
+        # Written but not numbered yet.
+        tasks = tasks.filter(change_seq__gte=0)
+    tasks = tasks.order_by(*TASK_POSITION)
+    mapper = get_row_mapper(serializer)
+    if mapper is not None:
+        rows, row_index = with_ordering_columns(mapper.values_queryset(tasks), TASK_POSITION)
+        rows = list(rows[:limit + 1])
+        items = mapper.map_rows(rows)
+    else:
+        rows, row_index = list(tasks[:limit + 1]), None
+        items = TaskSerializer(rows, many=True, context=context).data
+    # Sorted before tombstones at the same position (see below).
+    events = [
+        (*row_position(row, TASK_POSITION, row_index), 0, item)
+        for row, item in zip(rows, items)
+    ]
+
+    if since is not None:
+        tombstones = (
+            TaskTombstone.objects.visible_to(request.user)
+            .filter(keyset_condition(TOMBSTONE_POSITION, since))
+            .order_by(*TOMBSTONE_POSITION)
+            .values_list(*TOMBSTONE_POSITION, 'deleted')[:limit + 1]
+        )
+        events.extend((seq, task_id, 1, deleted) for seq, task_id, deleted in tombstones)
+
+    events.sort(key=lambda event: event[:3])
+    has_more = len(events) > limit
+    events = events[:limit]
+
+    # A task that lost its owner may still be visible through its creator, and
+    # the other way around.
+    reassigned = {task_id for _, task_id, kind, deleted in events if kind and not deleted}
+    if reassigned:
+        reassigned -= set(queryset.filter(pk__in=reassigned).values_list('pk', flat=True))
+
+    removed = []
+    for _, task_id, kind, deleted in events:
+        if kind and (deleted or task_id in reassigned) and task_id not in removed:
+            removed.append(task_id)
+    cursor = list(events[-1][:2]) if events else since or [0, 0]
+    return Response({
+        'changes': [item for _, _, kind, item in events if not kind],
+        'removed': removed,
+        'cursor': encode_since(cursor),
+        'has_more': has_more,
+    })
+
+
+def encode_since(position):
+    return b64encode(json.dumps(position, separators=(',', ':')).encode('utf-8')).decode('ascii')
+
+
+def decode_since(encoded):
+    """
+    Returns the [change_seq, id] position of a `since` cursor, or None when it
+    is missing.
+    """
+    if not encoded:
+        return None
+    try:
+        position = json.loads(b64decode(encoded.encode('ascii'), validate=True).decode('utf-8'))
+        if not isinstance(position, list) or len(position) != 2 \
+                or not all(type(value) is int and value >= 0 for value in position):
+            raise ValueError
+    except (TypeError, ValueError, UnicodeError):
+        raise ValidationError({SINCE_PARAM: ['Invalid cursor.']})
+    return position
+
+
+def _page_size(request):
+    try:
+        return _positive_int(request.query_params[PAGE_SIZE_PARAM], strict=True, cutoff=CHANGES_MAX_PAGE_SIZE)
+    except (KeyError, ValueError):
+        return CHANGES_PAGE_SIZE
@@ -0,0 +1,64 @@
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
+
+from task_tracker.eager_loading import apply_eager_loading
+from task_tracker.pagination import TaskPagination, keyset_chunks
+from task_tracker import streaming
+from .filters import TaskFilterBackend
+from .serializers import TaskSerializer
+
+EXPORT_FORMAT_PARAM = 'export_format'
+
+# CSV column name -> values_list() lookup. Relations are flattened to their ID
+# and a readable label.
+CSV_COLUMNS = {
+    'id': 'id',
+    'description': 'description',
+    'due_date': 'due_date',
+    'status': 'status',
+    'project_id': 'project_id',
+    'project_name': 'project__name',
+    'owner_id': 'owner_id',
+    'owner_email': 'owner__email',
+    'creator_id': 'creator_id',
+    'creator_email': 'creator__email',
+}
+
+
+def export_tasks(request, queryset, context, filename='tasks'):
+    """
+    Streams every task of `queryset` as NDJSON or CSV.
+
+    `queryset` must already be restricted to the tasks the user may read. Rows
+    are read in keyset chunks of `streaming.STREAM_CHUNK_SIZE`, so memory use
+    does not depend on the number of exported tasks.
+
+    Query Parameters:
+        - export_format: `ndjson` (default, one TaskSerializer object per line,
+          honours `fields`/`expand`) or `csv` (flat columns, see CSV_COLUMNS).
+        - status, due_date_after, due_date_before: See TaskFilterBackend.
+        - ordering: See TaskPagination.
+
+    Returns:
+        StreamingHttpResponse: Sent as an attachment named `<filename>.<format>`.
+    """
+    export_format = request.query_params.get(EXPORT_FORMAT_PARAM) or 'ndjson'
+    if export_format not in ('ndjson', 'csv'):
+        raise ValidationError({EXPORT_FORMAT_PARAM: ['Expected "ndjson" or "csv".']})
+
+    queryset = TaskFilterBackend().filter_queryset(request, queryset, None)
+    ordering = TaskPagination().get_ordering(request)
+
+    if export_format == 'csv':
+        rows = queryset.values_list(*CSV_COLUMNS.values())
+        content = streaming.csv_stream(list(CSV_COLUMNS), keyset_chunks(rows, ordering, streaming.STREAM_CHUNK_SIZE))
+        content_type = 'text/csv; charset=utf-8'
+    else:
+        serializer = TaskSerializer(context=context)
+        chunks = streaming.serialize_chunks(apply_eager_loading(queryset, serializer), serializer, ordering)
+        content = streaming.ndjson_stream(chunks)
+        content_type = 'application/x-ndjson'
+
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
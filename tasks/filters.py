@@ -0,0 +1,87 @@
+import datetime
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .models import STATUS_CHOICES
+
+
+class TaskFilterBackend(BaseFilterBackend):
+    """
+    Filters tasks by query parameters.
+
+    Query Parameters:
+        - status: One or more comma-separated statuses, e.g. `new,in_progress`.
+        - due_date_after: Tasks due on or after this date (YYYY-MM-DD).
+        - due_date_before: Tasks due on or before this date (YYYY-MM-DD).
+        - project / owner / creator: One or more comma-separated IDs, e.g. `owner=5,7`.
+
+    Every filter is served by an index on Task (see Task.Meta.indexes).
+
+    Invalid values are rejected with 400 instead of being ignored, so a typo
+    never silently returns the unfiltered list.
+    """
+    id_filters = {
+        'project': 'project_id',
+        'owner': 'owner_id',
+        'creator': 'creator_id',
+    }
+    date_filters = {
+        'due_date_after': 'due_date__gte',
+        'due_date_before': 'due_date__lte',
+    }
+
+    def filter_queryset(self, request, queryset, view):
+        return self.filter_params(request.query_params, queryset)
+
+    def filter_params(self, params, queryset):
+        """
+        Applies the filters given in `params` (a mapping of the query parameters
+        above to strings) to `queryset`.
+
+        Raises:
+            ValidationError: Listing every invalid parameter.
+        """
+        errors = {}
+
+        if params.get('status'):
+            statuses = [status.strip() for status in params['status'].split(',') if status.strip()]
+            valid = {status for status, _ in STATUS_CHOICES}
+            invalid = [status for status in statuses if status not in valid]
+            if invalid:
+                errors['status'] = [f'Invalid status: {", ".join(invalid)}.']
+            else:
+                queryset = queryset.filter(status__in=statuses) if len(statuses) > 1 else queryset.filter(status=statuses[0])
+
+        for param, column in self.id_filters.items():
+            if not params.get(param):
+                continue
+            try:
+                ids = [int(value) for value in params[param].split(',') if value.strip()]
+            except ValueError:
+                errors[param] = ['Expected a comma-separated list of IDs.']
+                continue
+            if not ids:
+                continue
+            queryset = queryset.filter(**{f'{column}__in': ids}) if len(ids) > 1 else queryset.filter(**{column: ids[0]})
+
+        for param, lookup in self.date_filters.items():
+            if not params.get(param):
+                continue
+            try:
+                queryset = queryset.filter(**{lookup: datetime.date.fromisoformat(params[param])})
+            except ValueError:
+                errors[param] = ['Date has wrong format. Use YYYY-MM-DD.']
+
+        if errors:
+            raise ValidationError(errors)
+        return queryset
+
+    def get_param_names(self):
+        return ['status', *self.id_filters, *self.date_filters]
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {'name': name, 'required': False, 'in': 'query', 'schema': {'type': 'string'}}
+            for name in self.get_param_names()
+        ]
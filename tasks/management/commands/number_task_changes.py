@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from tasks.changes import number_pending_changes
+
+
+class Command(BaseCommand):
+    help = (
+        'Numbers the task writes left out of the change feed because numbering them failed after commit. '
+        'Schedule it every minute.'
+    )
+
+    def handle(self, *args, **kwargs):
+        numbered = number_pending_changes()
+        self.stdout.write(self.style.SUCCESS(f'Numbered {numbered} pending task changes'))
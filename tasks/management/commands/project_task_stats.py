@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.stats import rebuild_project_stats, verify_project_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuilds the per-project task counters (ProjectTaskStats) from the tasks table, '
+        'or only reports the counters that differ with --verify.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify', action='store_true',
+            help='Compare the counters with the tasks table without changing them; fails if any differ.',
+        )
+        parser.add_argument(
+            '--project', type=int, action='append', dest='project_ids',
+            help='Only this project (repeatable).',
+        )
+
+    def handle(self, *args, verify=False, project_ids=None, **kwargs):
+        if not verify:
+            written = rebuild_project_stats(project_ids)
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} project task counters'))
+            return
+
+        differences = verify_project_stats(project_ids)
+        for (project_id, status), (stored, actual) in differences.items():
+            self.stdout.write(self.style.WARNING(
+                f'Project {project_id} {status}: stored {stored}, actual {actual}'
+            ))
+        if differences:
+            raise CommandError(f'{len(differences)} project task counters are out of date')
+        self.stdout.write(self.style.SUCCESS('Project task counters are up to date'))
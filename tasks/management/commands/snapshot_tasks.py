@@ -0,0 +1,28 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from tasks.rollups import snapshot_tasks
+
+
+class Command(BaseCommand):
+    help = (
+        'Records the current task counts per project and per owner into TaskDailyRollup. '
+        'Schedule it nightly (e.g. at 23:55), since tasks only store their current state.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date', help='Date to record the snapshot under (YYYY-MM-DD, default today).',
+        )
+
+    def handle(self, *args, date=None, **kwargs):
+        try:
+            date = datetime.date.fromisoformat(date) if date else timezone.localdate()
+        except ValueError:
+            raise CommandError('Date has wrong format. Use YYYY-MM-DD.')
+        projects, owners = snapshot_tasks(date)
+        self.stdout.write(self.style.SUCCESS(
+            f'Recorded {projects} project and {owners} owner rollups for {date.isoformat()}'
+        ))
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.2 on 2026-10-18 12:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_project_task_stats(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    ProjectTaskStats = apps.get_model('tasks', 'ProjectTaskStats')
+    rows = Task.objects.order_by().values_list('project_id', 'status').annotate(count=Count('pk'))
+    ProjectTaskStats.objects.bulk_create(
+        [ProjectTaskStats(project_id=project_id, status=status, count=count) for project_id, status, count in rows],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_project_fulltext'),
+        ('tasks', '0005_task_description_fulltext'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectTaskStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('new', 'New'), ('in_progress', 'In Progress'), ('blocked', 'Blocked'), ('completed', 'Completed'), ('not_started', 'Not Started')], max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_stats', to='projects.project')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('project', 'status'), name='project_task_stats_unique')],
+            },
+        ),
+        migrations.RunPython(populate_project_task_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.2 on 2026-10-18 12:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_change_sequence(apps, schema_editor):
+    apps.get_model('tasks', 'TaskChangeSequence').objects.create(pk=1, value=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_project_updated_at'),
+        ('tasks', '0008_task_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskChangeSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TaskTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('change_seq', models.BigIntegerField()),
+                ('task_id', models.BigIntegerField()),
+                ('owner_id', models.BigIntegerField(null=True)),
+                ('creator_id', models.BigIntegerField(null=True)),
+                ('deleted', models.BooleanField(default=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='change_seq',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['change_seq', 'id'], name='task_change_seq_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tasktombstone',
+            index=models.Index(fields=['change_seq', 'task_id'], name='task_tombstone_seq_idx'),
+        ),
+        migrations.RunPython(create_change_sequence, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,8 @@
-from django.db import models
-from accounts.models import User
+import secrets
+
+from django.db import models, transaction
+from accounts.models import Role, User
+from accounts.roles import get_role_names
 from projects.models import Project
 
 STATUS_CHOICES = [
@@ -10,6 +13,32 @@ STATUS_CHOICES = [
     ("not_started", "Not Started"),
 ]
 
+class TaskQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """
+        Tasks the user may read, based on their roles:
+            - Admin: all tasks.
+            - Task Creator + Read-Only: tasks the user created or owns.
+            - Read-Only: tasks the user owns.
+            - Task Creator: tasks the user created.
+            - No role: all tasks (requests are rejected by the permission classes).
+        """
+        role_names = get_role_names(user)
+        if Role.ADMIN in role_names:
+            return self.all()
+        if Role.TASK_CREATOR in role_names and Role.READ_ONLY in role_names:
+            # Both columns lead an index (owner_*, creator_*), so the OR is
+            # planned as two index lookups merged by the database (MySQL
+            # index_merge sort_union, SQLite MULTI-INDEX OR). A `pk IN (... UNION
+            # ...)` subquery would run as a DEPENDENT UNION per row on MySQL.
+            return self.filter(models.Q(owner=user) | models.Q(creator=user))
+        if Role.READ_ONLY in role_names:
+            return self.filter(owner=user)
+        if Role.TASK_CREATOR in role_names:
+            return self.filter(creator=user)
+        return self.all()
+
+
 class Task(models.Model):
     description = models.TextField()
     due_date = models.DateField()
@@ -17,4 +46,171 @@ class Task(models.Model):
     project = models.ForeignKey(Project, on_delete=models.CASCADE)
     owner = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     creator = models.ForeignKey(User, related_name="tasks", on_delete=models.SET_NULL, null=True)
-    
+    updated_at = models.DateTimeField(auto_now=True)
+    # Position of the last write in the change feed (see tasks/changes.py).
+    change_seq = models.BigIntegerField(default=0)
+
+    objects = TaskQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        # The per-project counters (ProjectTaskStats, see tasks/signals.py) are
+        # adjusted by the save signals and must commit together with the row.
+        # The change feed number is taken once the write has committed (see
+        # tasks.changes.record_change()); until then the row has a placeholder.
+        update_fields = kwargs.get('update_fields')
+        with transaction.atomic():
+            if update_fields is None or update_fields:
+                self.change_seq = TaskChangeSequence.placeholder()
+                if update_fields is not None:
+                    kwargs['update_fields'] = {*update_fields, 'change_seq'}
+            super().save(*args, **kwargs)
+
+    class Meta:
+        # Composite indexes behind the visibility rules, TaskFilterBackend and
+        # the keyset orderings of TaskPagination.
+        indexes = [
+            models.Index(fields=['owner', 'status', 'due_date'], name='task_owner_status_due_idx'),
+            models.Index(fields=['creator', 'due_date'], name='task_creator_due_idx'),
+            models.Index(fields=['project', 'status'], name='task_project_status_idx'),
+            models.Index(fields=['due_date', 'id'], name='task_due_date_id_idx'),
+            models.Index(fields=['status', 'id'], name='task_status_id_idx'),
+            models.Index(fields=['change_seq', 'id'], name='task_change_seq_id_idx'),
+        ]
+
+
+class TaskChangeSequence(models.Model):
+    """
+    Single-row counter numbering task writes for the change feed
+    (`GET /api/tasks/changes/`, see tasks/changes.py).
+    """
+    value = models.BigIntegerField(default=0)
+
+    @classmethod
+    def next_value(cls):
+        """
+        Returns a new sequence number for a task write.
+
+        The counter row stays locked until the calling transaction ends, so
+        numbers become visible in commit order: a client that has read every
+        change up to N can never miss a change numbered N or lower that commits
+        later. Only call it from the short transaction numbering a committed
+        write (see tasks.changes.record_change()), never from the write itself.
+        """
+        with transaction.atomic():
+            if not cls.objects.filter(pk=1).update(value=models.F('value') + 1):
+                cls.objects.get_or_create(pk=1)
+                cls.objects.filter(pk=1).update(value=models.F('value') + 1)
+            return cls.objects.values_list('value', flat=True).get(pk=1)
+
+    @staticmethod
+    def placeholder():
+        """
+        Returns a random negative `change_seq` marking the rows of one task
+        write until it is numbered. Rows with a negative number are not in the
+        change feed yet.
+        """
+        return -secrets.randbits(62) - 1
+
+
+class TaskTombstoneQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """
+        Tombstones of tasks the user could read before they were deleted or
+        reassigned, matching TaskQuerySet.visible_to(). Admins see every task,
+        so only deletions concern them.
+        """
+        role_names = get_role_names(user)
+        if Role.ADMIN in role_names:
+            return self.filter(deleted=True)
+        condition = models.Q()
+        if Role.READ_ONLY in role_names:
+            condition |= models.Q(owner_id=user.pk)
+        if Role.TASK_CREATOR in role_names:
+            condition |= models.Q(creator_id=user.pk)
+        return self.filter(condition) if condition else self.filter(deleted=True)
+
+
+class TaskTombstone(models.Model):
+    """
+    A task that left the change feed of some users, at `change_seq`:
+        - deleted: the task was deleted (directly or with its project);
+          `owner_id`/`creator_id` are its owner and creator at that time.
+        - otherwise: its owner and/or creator changed; `owner_id`/`creator_id`
+          are the previous ones (None when unchanged), who may have lost it.
+
+    IDs are plain columns, not foreign keys: the rows outlive the task and
+    the users.
+    """
+    change_seq = models.BigIntegerField()
+    task_id = models.BigIntegerField()
+    owner_id = models.BigIntegerField(null=True)
+    creator_id = models.BigIntegerField(null=True)
+    deleted = models.BooleanField(default=True)
+
+    objects = TaskTombstoneQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['change_seq', 'task_id'], name='task_tombstone_seq_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.change_seq}: task {self.task_id} deleted={self.deleted}'
+
+
+class ProjectTaskStats(models.Model):
+    """
+    Number of tasks per status of each project, kept in step with the tasks by
+    the signals in tasks/signals.py so dashboards do not run a `GROUP BY` over
+    the tasks table.
+
+    Writes that bypass the model signals (`QuerySet.update()`, `bulk_create()`)
+    must call `tasks.stats.rebuild_project_stats()` for the affected projects.
+    `python manage.py project_task_stats` rebuilds or verifies the whole table.
+    """
+    project = models.ForeignKey(Project, related_name='task_stats', on_delete=models.CASCADE)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        # Also the index behind `WHERE project_id IN (...)` on the dashboard.
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'status'], name='project_task_stats_unique'),
+        ]
+
+    def __str__(self):
+        return f'{self.project_id}: {self.status}={self.count}'
+
+
+class TaskDailyRollup(models.Model):
+    """
+    Task counts per status at one day, for either a project (burndown) or an
+    owner (workload), written by `python manage.py snapshot_tasks`.
+
+    One row holds every status of one project (or owner) on one day, so a year
+    of history for a chart is at most 366 rows.
+    """
+    date = models.DateField()
+    project = models.ForeignKey(Project, null=True, related_name='daily_rollups', on_delete=models.CASCADE)
+    owner = models.ForeignKey(User, null=True, related_name='task_rollups', on_delete=models.CASCADE)
+    # One column per STATUS_CHOICES entry.
+    new = models.PositiveIntegerField(default=0)
+    in_progress = models.PositiveIntegerField(default=0)
+    blocked = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+    not_started = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        # The unique constraints double as the (project, date) and (owner, date)
+        # indexes of the date range queries.
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'date'], name='task_rollup_project_date_unique'),
+            models.UniqueConstraint(fields=['owner', 'date'], name='task_rollup_owner_date_unique'),
+            models.CheckConstraint(
+                condition=models.Q(project__isnull=True) ^ models.Q(owner__isnull=True),
+                name='task_rollup_project_xor_owner',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.date} project={self.project_id} owner={self.owner_id}'
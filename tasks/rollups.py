@@ -0,0 +1,73 @@
+import datetime
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import STATUS_CHOICES, Task, TaskDailyRollup
+
+STATUSES = [status for status, _ in STATUS_CHOICES]
+
+
+@transaction.atomic
+def snapshot_tasks(date):
+    """
+    Records the current task counts per project and per owner as the rollup of `date`.
+
+    The counts come from one `GROUP BY project, owner, status` query over the
+    tasks and are summed into both grains in Python. Running it again for the
+    same date replaces that day's rows. Unassigned tasks count towards their
+    project only.
+
+    Returns:
+        tuple: (project rows, owner rows) written.
+    """
+    projects, owners = defaultdict(Counter), defaultdict(Counter)
+    rows = Task.objects.order_by().values_list('project_id', 'owner_id', 'status').annotate(count=Count('pk'))
+    for project_id, owner_id, status, count in rows:
+        projects[project_id][status] += count
+        if owner_id is not None:
+            owners[owner_id][status] += count
+
+    TaskDailyRollup.objects.filter(date=date).delete()
+    TaskDailyRollup.objects.bulk_create(
+        [TaskDailyRollup(date=date, project_id=pk, **counts) for pk, counts in projects.items()]
+        + [TaskDailyRollup(date=date, owner_id=pk, **counts) for pk, counts in owners.items()],
+        batch_size=1000,
+    )
+    return len(projects), len(owners)
+
+
+def rollup_series(rollups, interval='day'):
+    """
+    Returns chart points for rollup rows ordered by date:
+        [{"date": ..., "open": ..., "completed": ..., "status_counts": {...}}]
+
+    With `interval='week'` only the last snapshot of each ISO week is kept.
+    """
+    rollups = list(rollups)
+    if interval == 'week':
+        weeks = {}
+        for rollup in rollups:
+            weeks[rollup.date.isocalendar()[:2]] = rollup
+        rollups = list(weeks.values())
+    points = []
+    for rollup in rollups:
+        counts = {status: getattr(rollup, status) for status in STATUSES}
+        points.append({
+            'date': rollup.date.isoformat(),
+            'open': sum(counts.values()) - counts['completed'],
+            'completed': counts['completed'],
+            'status_counts': counts,
+        })
+    return points
+
+
+def default_range(today=None):
+    """
+    Returns the (start, end) dates used when a chart asks for no range: the
+    last 365 days.
+    """
+    end = today or timezone.localdate()
+    return end - datetime.timedelta(days=364), end
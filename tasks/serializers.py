@@ -4,8 +4,12 @@ from projects.serializers import ProjectSerializer
 from accounts.serializers import UserSerializer
 from accounts.models import User
 from projects.models import Project
+from task_tracker.eager_loading import EagerLoadingMixin
+from task_tracker.relations import BulkPrimaryKeyRelatedField, BulkRelatedLookupMixin
+from task_tracker.sparse_fieldsets import SparseFieldsetsMixin
+from task_tracker.timing import TimedListSerializer, TimedSerializerMixin
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(TimedSerializerMixin, BulkRelatedLookupMixin, SparseFieldsetsMixin, EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializer for the Task model.
 
@@ -13,6 +17,8 @@ class TaskSerializer(serializers.ModelSerializer):
     - Linking task to a project.
     - Assigning owner and creator to the task.
     - Handling both read and write operations with nested serializers and ID-based relations.
+    - Resolving project_id/owner_id/creator_id with one lookup per model, shared
+      by every row of a `many=True` write.
 
     Fields:
         - id (read-only): Task ID.
@@ -25,6 +31,7 @@ class TaskSerializer(serializers.ModelSerializer):
         - owner_id (write-only, optional): Assign owner by User ID.
         - creator (read-only): Nested User object representing task creator.
         - creator_id (write-only, optional): Assign creator by User ID.
+        - updated_at (read-only): Time of the last change to the task.
 
     Example request (create/update):
     {
@@ -56,24 +63,30 @@ class TaskSerializer(serializers.ModelSerializer):
             "id": 3,
             "username": "jane.smith",
             ...
-        }
+        },
+        "updated_at": "2025-06-10T09:30:00.123456Z"
     }
     """
     project = ProjectSerializer(read_only=True)
-    project_id = serializers.PrimaryKeyRelatedField(
+    project_id = BulkPrimaryKeyRelatedField(
         queryset=Project.objects.all(), write_only=True, source='project'
     )
 
     owner = UserSerializer(read_only=True)
-    owner_id = serializers.PrimaryKeyRelatedField(
+    owner_id = BulkPrimaryKeyRelatedField(
         queryset=User.objects.all(), write_only=True, source='owner', allow_null=True, required=False
     )
 
     creator = UserSerializer(read_only=True)
-    creator_id = serializers.PrimaryKeyRelatedField(
+    creator_id = BulkPrimaryKeyRelatedField(
         queryset=User.objects.all(), write_only=True, source='creator', allow_null=True, required=False
     )
 
     class Meta:
         model = Task
-        fields = ['id', 'description', 'due_date', 'status', 'project', 'project_id', 'owner', 'owner_id', 'creator', 'creator_id']
+        list_serializer_class = TimedListSerializer
+        fields = [
+            'id', 'description', 'due_date', 'status', 'project', 'project_id', 'owner', 'owner_id', 'creator', 'creator_id',
+            'updated_at',
+        ]
+        select_related = ['project', 'owner', 'creator']
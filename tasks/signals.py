@@ -0,0 +1,112 @@
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from accounts.models import User
+from projects.models import Project
+from task_tracker import events
+from .changes import record_change, task_event
+from .models import Task, TaskChangeSequence
+from .stats import adjust_project_stats
+
+# Changes to these fields move a task between ProjectTaskStats counters, or
+# out of the change feed of its previous owner or creator.
+TRACKED_FIELDS = ("project", "project_id", "status", "owner", "owner_id", "creator", "creator_id")
+
+
+@receiver(pre_save, sender=Task)
+def remember_previous_state(sender, instance, update_fields=None, raw=False, **kwargs):
+    """
+    Reads the stored project, status, owner and creator of an updated task,
+    locking the row so concurrent updates of the same task are counted one
+    after the other.
+    """
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not set(update_fields) & set(TRACKED_FIELDS):
+        return
+    instance._previous_state = (
+        Task.objects.select_for_update().filter(pk=instance.pk)
+        .values_list("project_id", "status", "owner_id", "creator_id").first()
+    )
+
+
+@receiver(post_save, sender=Task)
+def count_saved_task(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    current = (instance.project_id, instance.status)
+    if created:
+        adjust_project_stats({current: 1})
+        return
+    previous = instance.__dict__.get("_previous_state")
+    if previous is None:
+        return
+    if previous[:2] != current:
+        adjust_project_stats({previous[:2]: -1, current: 1})
+
+
+@receiver(post_save, sender=Task)
+def record_saved_task(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = instance.__dict__.get("_previous_state")
+    owner_id, creator_id = previous[2:] if previous else (instance.owner_id, instance.creator_id)
+    tombstones = []
+    if (owner_id, creator_id) != (instance.owner_id, instance.creator_id):
+        tombstones.append((
+            instance.pk,
+            owner_id if owner_id != instance.owner_id else None,
+            creator_id if creator_id != instance.creator_id else None,
+        ))
+    record_change(instance.change_seq, tombstones, deleted=False)
+
+
+@receiver(post_save, sender=Task)
+def publish_saved_task(sender, instance, created, raw=False, **kwargs):
+    # Also sent to the previous owner and creator, who may have lost the task.
+    previous = instance.__dict__.pop("_previous_state", None)
+    owner_id, creator_id = previous[2:] if previous else (None, None)
+    events.publish([task_event(
+        "created" if created else "updated", instance.pk,
+        owners=[instance.owner_id, owner_id], creators=[instance.creator_id, creator_id],
+    )])
+
+
+@receiver(post_delete, sender=Task)
+def count_deleted_task(sender, instance, origin=None, **kwargs):
+    # Deleting a project cascades to its counters as well as its tasks.
+    if isinstance(origin, Project) or getattr(origin, "model", None) is Project:
+        return
+    adjust_project_stats({(instance.project_id, instance.status): -1})
+
+
+@receiver(post_delete, sender=Task)
+def record_deleted_task(sender, instance, origin=None, **kwargs):
+    # Tasks deleted with their project are recorded by record_project_tasks().
+    if isinstance(origin, Project) or getattr(origin, "model", None) is Project:
+        return
+    record_change(tombstones=[(instance.pk, instance.owner_id, instance.creator_id)])
+    events.publish([task_event("deleted", instance.pk, owners=[instance.owner_id], creators=[instance.creator_id])])
+
+
+@receiver(pre_delete, sender=Project)
+def record_project_tasks(sender, instance, **kwargs):
+    """
+    Records the tasks of a deleted project as deleted, with one insert per
+    1000 tasks instead of one per task.
+    """
+    rows = list(Task.objects.filter(project=instance).values_list("pk", "owner_id", "creator_id"))
+    record_change(tombstones=rows)
+    events.publish(
+        task_event("deleted", pk, owners=[owner_id], creators=[creator_id]) for pk, owner_id, creator_id in rows
+    )
+
+
+@receiver(pre_delete, sender=User)
+def touch_user_tasks(sender, instance, **kwargs):
+    # Deleting a user clears the owner/creator of their tasks with an UPDATE,
+    # which must still move those tasks forward in the change feed.
+    placeholder = TaskChangeSequence.placeholder()
+    Task.objects.filter(Q(owner=instance) | Q(creator=instance)).update(change_seq=placeholder)
+    record_change(placeholder)
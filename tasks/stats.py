@@ -0,0 +1,96 @@
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from .models import STATUS_CHOICES, ProjectTaskStats, Task
+
+
+def adjust_project_stats(deltas):
+    """
+    Applies task count changes to ProjectTaskStats.
+
+    Args:
+        deltas: {(project_id, status): change}, e.g. `{(5, 'new'): -1, (5, 'completed'): 1}`.
+
+    Each counter is changed with an `UPDATE ... SET count = count + n`, so
+    concurrent writers never overwrite each other; missing rows are created.
+    Must run inside the transaction of the task write it accounts for.
+    """
+    for (project_id, status), delta in deltas.items():
+        if not delta:
+            continue
+        counters = ProjectTaskStats.objects.filter(project_id=project_id, status=status)
+        if counters.update(count=F('count') + delta) or delta < 0:
+            continue
+        try:
+            with transaction.atomic():
+                ProjectTaskStats.objects.create(project_id=project_id, status=status, count=delta)
+        except IntegrityError:
+            # Created by a concurrent transaction in the meantime.
+            counters.update(count=F('count') + delta)
+
+
+def count_project_tasks(project_ids=None):
+    """
+    Returns {(project_id, status): count} computed from the tasks table.
+    """
+    tasks = Task.objects.all()
+    if project_ids is not None:
+        tasks = tasks.filter(project_id__in=project_ids)
+    rows = tasks.order_by().values_list('project_id', 'status').annotate(count=Count('pk'))
+    return {(project_id, status): count for project_id, status, count in rows}
+
+
+def stored_project_stats(project_ids=None):
+    """
+    Returns {(project_id, status): count} as stored in ProjectTaskStats,
+    without zero counters.
+    """
+    counters = ProjectTaskStats.objects.filter(count__gt=0)
+    if project_ids is not None:
+        counters = counters.filter(project_id__in=project_ids)
+    rows = counters.values_list('project_id', 'status', 'count')
+    return {(project_id, status): count for project_id, status, count in rows}
+
+
+@transaction.atomic
+def rebuild_project_stats(project_ids=None):
+    """
+    Recomputes the counters of `project_ids` (every project when None) from the
+    tasks table and returns the number of counters written.
+    """
+    counters = ProjectTaskStats.objects.all()
+    if project_ids is not None:
+        counters = counters.filter(project_id__in=project_ids)
+    counters.delete()
+    counts = count_project_tasks(project_ids)
+    ProjectTaskStats.objects.bulk_create(
+        [
+            ProjectTaskStats(project_id=project_id, status=status, count=count)
+            for (project_id, status), count in counts.items()
+        ],
+        batch_size=1000,
+    )
+    return len(counts)
+
+
+def verify_project_stats(project_ids=None):
+    """
+    Compares ProjectTaskStats with the tasks table.
+
+    Returns:
+        dict: {(project_id, status): (stored, actual)} for every counter that
+        differs; empty when the table is consistent.
+    """
+    actual = Counter(count_project_tasks(project_ids))
+    stored = Counter(stored_project_stats(project_ids))
+    return {
+        key: (stored[key], actual[key])
+        for key in sorted(set(actual) | set(stored))
+        if stored[key] != actual[key]
+    }
+
+
+def empty_status_counts():
+    return {status: 0 for status, _ in STATUS_CHOICES}
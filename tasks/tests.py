@@ -1,3 +1,1113 @@
-from django.test import TestCase
+import asyncio
+import csv
+import datetime
+import gc
+import io
+import json
+import time
+from unittest.mock import patch
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection
+from django.test import AsyncClient, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import Role, User
+from task_tracker.fast_serializers import compile_serializer
+from task_tracker import events, search, versions
+from task_tracker.pagination import TaskPagination
+from task_tracker.serializers import CustomTokenObtainPairSerializer
+from task_tracker.testing import APITestCase
+from .export import CSV_COLUMNS
+from .models import ProjectTaskStats, Task, TaskChangeSequence, TaskDailyRollup, TaskTombstone
+from .stats import verify_project_stats
+from .serializers import TaskSerializer
+
+
+class TaskEagerLoadingTests(APITestCase):
+    def populate(self, rows):
+        for _ in range(rows):
+            member = self.create_user(f'm{User.objects.count()}@example.com', self.read_only_role, self.creator_role)
+            project = self.create_project(owner=member, members=[member, self.admin])
+            self.create_tasks(1, project, owner=member)
+
+    def test_task_list_query_count_is_constant(self):
+        client = self.client_for(self.admin)
+        self.populate(1)
+        small, response = self.count_queries(client, '/api/tasks/')
+        self.assertEqual(len(response.json()['results']), 1)
+
+        self.populate(5)
+        large, response = self.count_queries(client, '/api/tasks/')
+        self.assertEqual(len(response.json()['results']), 6)
+        self.assertEqual(small, large)
+
+    def test_task_list_renders_nested_relations(self):
+        self.populate(2)
+        response = self.client_for(self.admin).get('/api/tasks/')
+        task = response.json()['results'][0]
+        self.assertEqual(task['project']['owner']['roles'][0]['name'], Role.TASK_CREATOR)
+        self.assertEqual(task['project']['member_count'], 2)
+        self.assertEqual(task['project']['task_count'], 1)
+        self.assertEqual(task['project']['status_counts']['new'], 1)
+        self.assertEqual(task['creator']['roles'], [{'id': self.admin_role.id, 'name': Role.ADMIN}])
+
+
+class TaskSparseFieldsetTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.member = self.create_user('member@example.com', self.read_only_role)
+        self.project = self.create_project(owner=self.member, members=[self.member, self.admin])
+        self.task = self.create_tasks(1, self.project, owner=self.member)[0]
+        self.client = self.client_for(self.admin)
+
+    def test_fields_and_nested_fields(self):
+        response = self.client.get('/api/tasks/?fields=id,description,status,due_date,owner.first_name,owner.last_name')
+        self.assertEqual(response.json()['results'], [{
+            'id': self.task.id,
+            'description': 'Task 0',
+            'due_date': '2025-06-01',
+            'status': 'new',
+            'owner': {'first_name': 'F', 'last_name': 'L'},
+        }])
+
+    def test_relations_are_ids_unless_expanded(self):
+        task = self.client.get('/api/tasks/?expand=project').json()['results'][0]
+        self.assertEqual(task['owner'], self.member.id)
+        self.assertEqual(task['creator'], self.admin.id)
+        self.assertEqual(task['project']['owner'], self.member.id)
+        self.assertEqual(task['project']['member_count'], 2)
+        self.assertEqual(task['project']['task_count'], 1)
+
+        task = self.client.get('/api/tasks/?expand=project.owner&fields=id,project').json()['results'][0]
+        self.assertEqual(task['project']['owner']['email'], 'member@example.com')
+        self.assertEqual(task['project']['owner']['roles'], [self.read_only_role.id])
+
+    def test_sparse_queryset_loads_selected_columns_only(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get('/api/tasks/?fields=id,status,owner')
+        task_query = next(q['sql'] for q in ctx.captured_queries if 'FROM "tasks_task"' in q['sql'])
+        self.assertNotIn('"tasks_task"."description"', task_query)
+        self.assertNotIn('JOIN "projects_project"', task_query)
+        self.assertNotIn('JOIN "accounts_user" T', task_query)
+
+    def test_sparse_list_query_count_is_constant(self):
+        url = '/api/tasks/?fields=id,project,owner.first_name&expand=project'
+        small, _ = self.count_queries(self.client, url)
+        self.create_tasks(5, self.create_project(members=[self.member]), owner=self.member)
+        large, response = self.count_queries(self.client, url)
+        self.assertEqual(len(response.json()['results']), 6)
+        self.assertEqual(small, large)
+
+    def test_default_representation_is_unchanged(self):
+        task = self.client.get('/api/tasks/').json()['results'][0]
+        self.assertEqual(task['owner']['email'], 'member@example.com')
+        self.assertEqual(task['project']['owner']['roles'], [{'id': self.read_only_role.id, 'name': 'read_only'}])
+
+
+class TaskFastSerializerTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.member = self.create_user('member@example.com', self.read_only_role, self.creator_role)
+        for members in ([self.member, self.admin], [self.admin], []):
+            project = self.create_project(owner=self.member, members=members)
+            self.create_tasks(3, project, owner=self.member)
+        self.create_tasks(1, project, owner=None, creator=None)
+        self.client = self.client_for(self.admin)
+
+    def assertSameAsSerializer(self, url):
+        fast = self.client.get(url)
+        with override_settings(FAST_SERIALIZERS=False):
+            stock = self.client.get(url)
+        self.assertEqual(fast.status_code, stock.status_code)
+        self.assertEqual(fast.content, stock.content)
+
+    def test_task_serializer_compiles(self):
+        mapper = compile_serializer(TaskSerializer())
+        self.assertIn('owner__email', mapper.columns)
+        # The annotated project (with its owner's roles), owner.roles and creator.roles.
+        self.assertEqual(len(mapper.loaders), 3)
+        project_mapper = mapper.loaders[0].mapper
+        self.assertIn('owner__email', project_mapper.columns)
+        self.assertIn('task_count', project_mapper.annotations)
+
+    def test_malformed_ids_are_not_found(self):
+        for url in ('/api/tasks/abc/', '/api/projects/abc/', '/api/users/abc/'):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_fast_path_output_matches_serializer(self):
+        task = Task.objects.first()
+        for url in [
+            '/api/tasks/',
+            f'/api/tasks/{task.pk}/',
+            '/api/tasks/?fields=id,description,status,due_date,owner.first_name',
+            '/api/tasks/?expand=project.owner',
+            '/api/tasks/?fields=id,project.name,project.task_count',
+            '/api/projects/',
+            f'/api/projects/{task.project_id}/',
+            '/api/users/',
+            f'/api/users/{self.member.pk}/',
+            '/api/tasks/0/',
+        ]:
+            with self.subTest(url=url):
+                self.assertSameAsSerializer(url)
+
+
+class TaskBulkIdValidationTests(APITestCase):
+    def test_many_rows_share_one_lookup_per_model(self):
+        users = [self.create_user(f'u{i}@example.com') for i in range(5)]
+        projects = [self.create_project() for _ in range(3)]
+        rows = [
+            {'description': f'T{i}', 'due_date': '2025-06-01', 'status': 'new', 'project_id': projects[i % 3].id,
+             'owner_id': users[i % 5].id, 'creator_id': users[(i + 1) % 5].id}
+            for i in range(40)
+        ]
+        serializer = TaskSerializer(data=rows, many=True)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(len(ctx.captured_queries), 2)
+        self.assertIs(serializer.validated_data[0]['owner'], serializer.validated_data[4]['creator'])
+
+    def test_missing_ids_are_reported_per_row(self):
+        project = self.create_project()
+        serializer = TaskSerializer(data=[
+            {'description': 'ok', 'due_date': '2025-06-01', 'status': 'new', 'project_id': project.id},
+            {'description': 'bad', 'due_date': '2025-06-01', 'status': 'new', 'project_id': 9999, 'owner_id': 9998},
+        ], many=True)
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors[0], {})
+        self.assertEqual(serializer.errors[1]['project_id'], ['Invalid pk "9999" - object does not exist.'])
+        self.assertEqual(serializer.errors[1]['owner_id'], ['Invalid pk "9998" - object does not exist.'])
+
+
+class TaskKeysetPaginationTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        project = self.create_project()
+        for status in ('new', 'blocked', 'completed'):
+            self.create_tasks(5, project, status=status)
+        self.client = self.client_for(self.admin)
+
+    def walk(self, url):
+        rows, pages = [], 0
+        while url:
+            page = self.client.get(url).json()
+            rows += page['results']
+            url = page['next']
+            pages += 1
+        return rows, pages
+
+    def test_pages_cover_every_row_in_order(self):
+        expected = {
+            'id': list(Task.objects.order_by('id').values_list('id', flat=True)),
+            'due_date,id': list(Task.objects.order_by('due_date', 'id').values_list('id', flat=True)),
+            'status,id': list(Task.objects.order_by('status', 'id').values_list('id', flat=True)),
+            '-due_date,-id': list(Task.objects.order_by('-due_date', '-id').values_list('id', flat=True)),
+        }
+        for ordering, ids in expected.items():
+            with self.subTest(ordering=ordering):
+                rows, pages = self.walk(f'/api/tasks/?ordering={ordering}&page_size=4&fields=id,description')
+                self.assertEqual([row['id'] for row in rows], ids)
+                self.assertEqual(pages, 4)
+
+    def test_previous_link_returns_the_previous_page(self):
+        first = self.client.get('/api/tasks/?ordering=due_date,id&page_size=4').json()
+        self.assertIsNone(first['previous'])
+        second = self.client.get(first['next']).json()
+        back = self.client.get(second['previous']).json()
+        self.assertEqual(back['results'], first['results'])
+
+    def test_deep_pages_cost_the_same_and_never_count(self):
+        page = self.client.get('/api/tasks/?ordering=status,id&page_size=2').json()
+        first, _ = self.count_queries(self.client, '/api/tasks/?ordering=status,id&page_size=2')
+        for _ in range(4):
+            next_url = page['next']
+            page = self.client.get(next_url).json()
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(next_url)
+        self.assertEqual(len(ctx.captured_queries), first)
+        self.assertFalse(any('"__count"' in q['sql'] for q in ctx.captured_queries))
+
+    def test_page_size_is_capped(self):
+        self.create_tasks(TaskPagination.max_page_size, self.create_project())
+        response = self.client.get('/api/tasks/?page_size=100000&fields=id')
+        self.assertEqual(len(response.json()['results']), TaskPagination.max_page_size)
+
+    def test_invalid_ordering_and_cursor(self):
+        self.assertEqual(self.client.get('/api/tasks/?ordering=description').status_code, 400)
+        self.assertEqual(self.client.get('/api/tasks/?ordering=due_date,-id').status_code, 400)
+        self.assertEqual(self.client.get('/api/tasks/?cursor=garbage').status_code, 404)
+
+    def test_fast_path_pages_match_serializer(self):
+        url = '/api/tasks/?ordering=due_date,id&page_size=4&fields=id,description'
+        next_url = self.client.get(url).json()['next']
+        for url in [url, next_url, '/api/tasks/?ordering=-status,-id&page_size=3']:
+            fast = self.client.get(url)
+            with override_settings(FAST_SERIALIZERS=False):
+                stock = self.client.get(url)
+            self.assertEqual(fast.content, stock.content)
+
+
+class TaskExportTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.member = self.create_user('member@example.com', self.read_only_role)
+        self.project = self.create_project(members=[self.member])
+        self.own = self.create_tasks(3, self.project, owner=self.member)
+        self.create_tasks(2, self.project, status='blocked')
+
+    def export(self, user, url):
+        response = self.client_for(user).get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode('utf-8')
+
+    def test_ndjson_matches_serializer_and_visibility(self):
+        response, body = self.export(self.member, '/api/tasks/export/')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in body.splitlines()]
+        listed = self.client_for(self.member).get('/api/tasks/').json()['results']
+        self.assertEqual(rows, listed)
+        self.assertEqual([row['id'] for row in rows], [task.id for task in self.own])
+
+    def test_csv_export(self):
+        Task.objects.filter(pk=self.own[0].pk).update(description='=HYPERLINK("x")')
+        response, body = self.export(self.admin, '/api/tasks/export/?export_format=csv&status=new&ordering=-due_date,-id')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="tasks.csv"')
+        rows = list(csv.reader(io.StringIO(body)))
+        self.assertEqual(rows[0], list(CSV_COLUMNS))
+        self.assertEqual([row[0] for row in rows[1:]], [str(task.id) for task in reversed(self.own)])
+        self.assertEqual(rows[-1][1], '\'=HYPERLINK("x")')
+        self.assertEqual(rows[-1][7], 'member@example.com')
+
+    def test_export_reads_in_chunks(self):
+        with patch('task_tracker.streaming.STREAM_CHUNK_SIZE', 2), CaptureQueriesContext(connection) as ctx:
+            _, body = self.export(self.admin, '/api/tasks/export/?export_format=csv')
+        self.assertEqual(len(body.splitlines()), 6)
+        task_queries = [q['sql'] for q in ctx.captured_queries if 'FROM "tasks_task"' in q['sql']]
+        self.assertEqual(len(task_queries), 3)
+
+    def test_project_export(self):
+        other = self.create_project()
+        self.create_tasks(2, other, owner=self.member)
+        _, body = self.export(self.member, f'/api/projects/{self.project.pk}/tasks/export/')
+        self.assertEqual([json.loads(line)['id'] for line in body.splitlines()], [task.id for task in self.own])
+        outsider = self.create_user('outsider@example.com', self.read_only_role)
+        self.assertEqual(self.client_for(outsider).get(f'/api/projects/{self.project.pk}/tasks/export/').status_code, 404)
+
+    def test_invalid_format(self):
+        self.assertEqual(self.client_for(self.admin).get('/api/tasks/export/?export_format=xml').status_code, 400)
+
+
+class TaskFilterAndIndexTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.member = self.create_user('member@example.com', self.read_only_role, self.creator_role)
+        self.other = self.create_user('other@example.com', self.read_only_role)
+        self.project = self.create_project(members=[self.member])
+        self.owned = self.create_tasks(3, self.project, owner=self.member)
+        self.created = self.create_tasks(2, self.create_project(), owner=self.other, creator=self.member, status='blocked')
+        self.create_tasks(4, self.project, owner=self.other)
+
+    def ids(self, user, query):
+        return [task['id'] for task in self.client_for(user).get(f'/api/tasks/?fields=id&{query}').json()['results']]
+
+    def test_filters(self):
+        self.assertEqual(self.ids(self.admin, f'owner={self.member.id}'), [task.id for task in self.owned])
+        self.assertEqual(self.ids(self.admin, f'creator={self.member.id}&status=blocked'), [task.id for task in self.created])
+        self.assertEqual(len(self.ids(self.admin, f'project={self.project.id}&owner={self.member.id},{self.other.id}')), 7)
+        expected = Task.objects.filter(project=self.project, due_date__range=('2025-06-03', '2025-06-03')).order_by('id')
+        self.assertEqual(
+            self.ids(self.admin, f'due_date_after=2025-06-03&due_date_before=2025-06-03&project={self.project.id}'),
+            [task.id for task in expected],
+        )
+        self.assertEqual(len(expected), 2)
+        self.assertEqual(self.client_for(self.admin).get('/api/tasks/?owner=me').status_code, 400)
+
+    def test_owner_or_creator_visibility(self):
+        self.assertEqual(self.ids(self.member, 'ordering=id'), [task.id for task in self.owned + self.created])
+        self.assertEqual(self.ids(self.member, 'status=blocked'), [task.id for task in self.created])
+
+    def assertUsesIndexes(self, queryset):
+        plan = queryset.explain()
+        self.assertNotRegex(plan, r'SCAN (tasks_task|U0)\b(?! USING)', plan)
+        self.assertIn('USING', plan)
+        return plan
+
+    def test_visibility_and_filters_use_indexes(self):
+        tasks = Task.objects.visible_to(self.member)
+        self.assertUsesIndexes(tasks.filter(status='new').order_by('due_date', 'id'))
+        self.assertIn('MULTI-INDEX OR', self.assertUsesIndexes(tasks.order_by('due_date', 'id')))
+        self.assertUsesIndexes(Task.objects.visible_to(self.other).filter(status='new', due_date__gte='2025-06-01'))
+        self.assertUsesIndexes(Task.objects.filter(creator=self.member).order_by('due_date', 'id'))
+        self.assertUsesIndexes(Task.objects.filter(project=self.project, status='blocked'))
+
+    def test_filtered_list_query_count_is_constant(self):
+        client = self.client_for(self.member)
+        small, _ = self.count_queries(client, '/api/tasks/?status=new&ordering=due_date,id')
+        self.create_tasks(5, self.project, owner=self.member)
+        large, response = self.count_queries(client, '/api/tasks/?status=new&ordering=due_date,id')
+        self.assertEqual(len(response.json()['results']), 8)
+        self.assertEqual(small, large)
+
+
+class TaskSearchTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.member = self.create_user('member@example.com', self.read_only_role)
+        project = self.create_project(members=[self.member])
+        self.tasks = self.create_tasks(4, project, owner=self.member)
+        for task, description in zip(self.tasks, [
+            'Write unit tests for the parser',
+            'Deploy parser service',
+            'Unit tests, more unit tests and unit fixtures',
+            'Plan the sprint',
+        ]):
+            task.description = description
+            task.save()
+        self.hidden = self.create_tasks(1, project)[0]
+        self.hidden.description = 'Unit tests nobody else may see'
+        self.hidden.save()
+
+    def search(self, user, query):
+        response = self.client_for(user).get(f'/api/tasks/?fields=id&{query}')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_results_are_ordered_by_relevance(self):
+        ids = [task['id'] for task in self.search(self.member, 'q=unit tests')['results']]
+        self.assertEqual(ids, [self.tasks[2].id, self.tasks[0].id])
+
+    def test_search_respects_visibility_and_filters(self):
+        ids = [task['id'] for task in self.search(self.admin, 'q=unit')['results']]
+        self.assertIn(self.hidden.id, ids)
+        self.assertEqual(self.search(self.member, 'q=nobody')['results'], [])
+        ids = [task['id'] for task in self.search(self.admin, f'q=parser&ordering=id&owner={self.member.id}')['results']]
+        self.assertEqual(ids, [self.tasks[0].id, self.tasks[1].id])
+
+    def test_hit_limit_applies_after_visibility(self):
+        for task in self.create_tasks(3, self.tasks[0].project):
+            task.description = 'Unit tests, unit tests, unit tests and unit fixtures'
+            task.save()
+        backend = search.get_search_backend()
+        with patch.object(backend, 'max_hits', 2):
+            ids = [task['id'] for task in self.search(self.member, 'q=unit tests')['results']]
+            self.assertEqual(ids, [self.tasks[2].id, self.tasks[0].id])
+            self.assertEqual(len(self.search(self.admin, 'q=unit tests')['results']), 2)
+
+    def test_search_results_are_paginated(self):
+        page = self.search(self.admin, 'q=unit tests parser&page_size=2')
+        rest = self.client_for(self.admin).get(page['next']).json()
+        ids = [task['id'] for task in page['results'] + rest['results']]
+        self.assertEqual(len(ids), 4)
+        self.assertEqual(len(set(ids)), 4)
+        self.assertIsNone(rest['next'])
+
+    def test_index_follows_writes(self):
+        self.assertEqual(self.search(self.admin, 'q=sprint')['results'], [{'id': self.tasks[3].id}])
+        self.tasks[3].description = 'Plan the retro'
+        self.tasks[3].save()
+        self.assertEqual(self.search(self.admin, 'q=sprint')['results'], [])
+        self.tasks[1].delete()
+        self.assertEqual(self.search(self.admin, 'q=deploy')['results'], [])
+        Task.objects.filter(pk=self.tasks[0].pk).update(description='Renamed in bulk')
+        search.invalidate(Task)
+        self.assertEqual(self.search(self.admin, 'q=bulk')['results'], [{'id': self.tasks[0].id}])
+
+    def test_fast_path_matches_serializer(self):
+        url = '/api/tasks/?q=unit tests&page_size=1'
+        client = self.client_for(self.admin)
+        fast = client.get(url)
+        with override_settings(FAST_SERIALIZERS=False):
+            stock = client.get(url)
+        self.assertEqual(fast.content, stock.content)
+
+    def test_mysql_backend_query(self):
+        sql = str(search.MySQLFullTextBackend().search(Task.objects.all(), 'unit tests').query)
+        self.assertIn('WHERE MATCH ("tasks_task"."description") AGAINST (unit tests IN NATURAL LANGUAGE MODE)', sql)
+        self.assertIn('AS "relevance"', sql)
+
+
+class ProjectTaskStatsTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = self.create_project()
+        self.other = self.create_project()
+        self.tasks = self.create_tasks(3, self.project)
+
+    def counters(self):
+        return {
+            (project_id, status): count
+            for project_id, status, count in ProjectTaskStats.objects.filter(count__gt=0)
+            .values_list('project_id', 'status', 'count')
+        }
+
+    def test_create_status_change_move_and_delete(self):
+        self.assertEqual(self.counters(), {(self.project.pk, 'new'): 3})
+
+        response = self.client_for(self.admin).patch(
+            f'/api/tasks/{self.tasks[0].pk}/', {'status': 'completed'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.tasks[1].project = self.other
+        self.tasks[1].save()
+        self.tasks[2].description = 'Only the description'
+        self.tasks[2].save(update_fields=['description'])
+        self.assertEqual(self.counters(), {
+            (self.project.pk, 'new'): 1, (self.project.pk, 'completed'): 1, (self.other.pk, 'new'): 1,
+        })
+
+        self.client_for(self.admin).delete(f'/api/tasks/{self.tasks[0].pk}/')
+        Task.objects.filter(pk=self.tasks[1].pk).delete()
+        self.assertEqual(self.counters(), {(self.project.pk, 'new'): 1})
+        self.assertEqual(verify_project_stats(), {})
+
+    def test_project_delete_removes_its_counters(self):
+        self.create_tasks(2, self.other, status='blocked')
+        self.project.delete()
+        self.assertEqual(self.counters(), {(self.other.pk, 'blocked'): 2})
+
+    def test_failed_write_rolls_back_the_counters(self):
+        with patch('tasks.signals.adjust_project_stats', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.create_tasks(1, self.project)
+        self.assertEqual(Task.objects.count(), 3)
+        self.assertEqual(self.counters(), {(self.project.pk, 'new'): 3})
+
+    def test_command_verifies_and_rebuilds(self):
+        Task.objects.filter(pk=self.tasks[0].pk).update(status='blocked')
+        out = io.StringIO()
+        with self.assertRaises(CommandError):
+            call_command('project_task_stats', '--verify', stdout=out)
+        self.assertIn(f'Project {self.project.pk} blocked: stored 0, actual 1', out.getvalue())
+
+        call_command('project_task_stats', stdout=io.StringIO())
+        self.assertEqual(self.counters(), {(self.project.pk, 'new'): 2, (self.project.pk, 'blocked'): 1})
+        call_command('project_task_stats', '--verify', stdout=io.StringIO())
+
+
+class TaskRollupTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.member = self.create_user('member@example.com', self.read_only_role)
+        self.project = self.create_project(members=[self.member])
+        self.hidden = self.create_project()
+        self.tasks = self.create_tasks(3, self.project, owner=self.member)
+        self.create_tasks(2, self.hidden)
+        # Two weeks of history: one task is completed each week.
+        for day in range(14):
+            if day in (3, 10):
+                task = self.tasks[day // 7]
+                task.status = 'completed'
+                task.save()
+            call_command('snapshot_tasks', f'--date={datetime.date(2025, 6, 2) + datetime.timedelta(days=day)}',
+                         stdout=io.StringIO())
+
+    def test_snapshot_uses_one_aggregate_query(self):
+        with CaptureQueriesContext(connection) as ctx:
+            call_command('snapshot_tasks', '--date=2025-07-01', stdout=io.StringIO())
+        self.assertEqual(len([query for query in ctx.captured_queries if 'FROM "tasks_task"' in query['sql']]), 1)
+        self.assertEqual(TaskDailyRollup.objects.filter(date='2025-07-01').count(), 3)  # two projects, one owner
+
+    def test_snapshot_is_idempotent(self):
+        call_command('snapshot_tasks', '--date=2025-06-02', stdout=io.StringIO())
+        rollup = TaskDailyRollup.objects.get(date='2025-06-02', project=self.project)
+        self.assertEqual((rollup.new, rollup.completed), (1, 2))
+        self.assertEqual(TaskDailyRollup.objects.filter(date='2025-06-02').count(), 3)
+
+    def test_burndown(self):
+        response = self.client_for(self.member).get(
+            f'/api/analytics/burndown/?project={self.project.pk}&start=2025-06-04&end=2025-06-06'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'project': self.project.pk, 'interval': 'day', 'results': [
+            {'date': '2025-06-04', 'open': 3, 'completed': 0,
+             'status_counts': {'new': 3, 'in_progress': 0, 'blocked': 0, 'completed': 0, 'not_started': 0}},
+            {'date': '2025-06-05', 'open': 2, 'completed': 1,
+             'status_counts': {'new': 2, 'in_progress': 0, 'blocked': 0, 'completed': 1, 'not_started': 0}},
+            {'date': '2025-06-06', 'open': 2, 'completed': 1,
+             'status_counts': {'new': 2, 'in_progress': 0, 'blocked': 0, 'completed': 1, 'not_started': 0}},
+        ]})
+
+    def test_burndown_requires_a_visible_project(self):
+        client = self.client_for(self.member)
+        self.assertEqual(client.get('/api/analytics/burndown/').status_code, 400)
+        self.assertEqual(client.get(f'/api/analytics/burndown/?project={self.hidden.pk}').status_code, 404)
+        self.assertEqual(client.get(f'/api/analytics/burndown/?project={self.project.pk}&start=x').status_code, 400)
+
+    def test_weekly_workload(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client_for(self.member).get('/api/analytics/workload/?start=2025-06-01&end=2025-06-30')
+        self.assertFalse([query for query in ctx.captured_queries if 'FROM "tasks_task"' in query['sql']])
+        self.assertEqual(
+            [(point['date'], point['open'], point['completed']) for point in response.json()['results']],
+            [('2025-06-08', 2, 1), ('2025-06-15', 1, 2)],
+        )
+
+    def test_workload_of_other_users_is_admin_only(self):
+        self.assertEqual(
+            self.client_for(self.member).get(f'/api/analytics/workload/?owner={self.admin.pk}').status_code, 403
+        )
+        response = self.client_for(self.admin).get(f'/api/analytics/workload/?owner={self.member.pk}&start=2025-06-01')
+        self.assertEqual(len(response.json()['results']), 2)
+
+
+class TaskBulkWriteTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.creator = self.create_user('creator@example.com', self.creator_role)
+        self.reader = self.create_user('reader@example.com', self.read_only_role)
+        self.project = self.create_project()
+        self.other = self.create_project()
+        self.tasks = self.create_tasks(4, self.project, creator=self.creator, owner=self.reader)
+        self.foreign = self.create_tasks(1, self.project)[0]
+
+    def bulk(self, user, payload):
+        return self.client_for(user).post('/api/tasks/bulk/', payload, format='json')
+
+    def test_all_operations_in_one_request(self):
+        response = self.bulk(self.creator, {
+            'create': [
+                {'description': 'New A', 'due_date': '2025-07-01', 'status': 'new', 'project_id': self.other.pk},
+                {'description': 'New B', 'due_date': '2025-07-02', 'status': 'blocked', 'project_id': self.other.pk},
+            ],
+            'update': [{'id': self.tasks[0].pk, 'status': 'completed', 'project_id': self.other.pk}],
+            'update_where': {'filter': {'project': self.project.pk, 'status': 'new'}, 'set': {'status': 'in_progress'}},
+            'delete': [self.tasks[3].pk],
+        })
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json(), {'created': 2, 'updated': 4, 'deleted': 1})
+        self.assertEqual(Task.objects.filter(description__startswith='New', creator=self.creator).count(), 2)
+        self.assertEqual(
+            list(Task.objects.filter(pk__in=[task.pk for task in self.tasks]).values_list('status', 'project')),
+            [('completed', self.other.pk), ('in_progress', self.project.pk), ('in_progress', self.project.pk)],
+        )
+        # Only tasks visible to the creator are updated by the filter.
+        self.foreign.refresh_from_db()
+        self.assertEqual(self.foreign.status, 'new')
+        self.assertEqual(verify_project_stats(), {})
+
+    def test_query_count_does_not_grow_with_rows(self):
+        def run(count):
+            tasks = self.create_tasks(count, self.project, creator=self.creator)
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.bulk(self.creator, {
+                    'update': [{'id': task.pk, 'status': 'completed', 'owner_id': self.reader.pk} for task in tasks],
+                    'create': [
+                        {'description': 'x', 'due_date': '2025-07-01', 'status': 'new', 'project_id': self.project.pk,
+                         'owner_id': self.reader.pk}
+                    ] * count,
+                })
+            self.assertEqual(response.status_code, 200, response.content)
+            return len(ctx.captured_queries)
+
+        run(1)  # creates the counters rows
+        self.assertEqual(run(5), run(50))
+
+    def test_deletes_are_set_based(self):
+        def run(count):
+            tasks = self.create_tasks(count, self.project, creator=self.creator, status='blocked')
+            with CaptureQueriesContext(connection) as ctx, self.captureOnCommitCallbacks(execute=True) as callbacks:
+                response = self.bulk(self.creator, {'delete': [task.pk for task in tasks]})
+            self.assertEqual(response.json(), {'created': 0, 'updated': 0, 'deleted': count})
+            return len(ctx.captured_queries), len(callbacks)
+
+        self.assertEqual(run(5), run(40))
+        self.assertEqual(verify_project_stats(), {})
+        self.assertEqual(TaskTombstone.objects.filter(deleted=True).count(), 45)
+        self.assertEqual(len(set(TaskTombstone.objects.values_list('change_seq', flat=True))), 2)
+
+    def test_read_only_users_may_only_change_statuses_of_their_tasks(self):
+        response = self.bulk(self.reader, {
+            'update_where': {'filter': {'project': [self.project.pk]}, 'set': {'status': 'completed'}},
+        })
+        self.assertEqual(response.json(), {'created': 0, 'updated': 4, 'deleted': 0})
+        self.foreign.refresh_from_db()
+        self.assertEqual(self.foreign.status, 'new')
+
+        self.assertEqual(self.bulk(self.reader, {'update': [{'id': self.tasks[0].pk, 'status': 'new'}]}).status_code, 200)
+        forbidden = [
+            {'update': [{'id': self.tasks[0].pk, 'description': 'Renamed'}]},
+            {'update_where': {'filter': {'project': self.project.pk}, 'set': {'status': 'new', 'owner_id': None}}},
+            {'delete': [self.tasks[0].pk]},
+        ]
+        for payload in forbidden:
+            self.assertEqual(self.bulk(self.reader, payload).status_code, 403, payload)
+
+    def test_invalid_rows_write_nothing(self):
+        response = self.bulk(self.creator, {
+            'create': [{'description': 'ok', 'due_date': '2025-07-01', 'status': 'new', 'project_id': self.project.pk}],
+            'update': [{'id': self.tasks[0].pk, 'status': 'done'}, {'id': self.foreign.pk, 'status': 'new'}],
+            'delete': [self.tasks[1].pk, 'x'],
+        })
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()
+        self.assertNotIn('create', errors)
+        self.assertEqual(errors['update'][0], {'status': ['"done" is not a valid choice.']})
+        self.assertEqual(errors['update'][1], {'id': [f'Task {self.foreign.pk} does not exist.']})
+        self.assertEqual(errors['delete'], [{}, {'id': ['Expected a task ID.']}])
+        self.assertEqual(Task.objects.count(), 5)
+        self.assertEqual(Task.objects.filter(status='new').count(), 5)
+
+    def test_filter_and_payload_validation(self):
+        self.assertEqual(self.bulk(self.creator, {'rename': []}).status_code, 400)
+        response = self.bulk(self.creator, {'update_where': {'filter': {}, 'set': {'status': 'new'}}})
+        self.assertIn('filter', response.json()['update_where'])
+        response = self.bulk(self.creator, {'update_where': {'filter': {'status': 'bogus'}, 'set': {'status': 'new'}}})
+        self.assertEqual(response.json()['update_where'], {'filter': {'status': ['Invalid status: bogus.']}})
+        response = self.bulk(self.creator, {'update': [{'id': self.tasks[0].pk}]})
+        self.assertEqual(response.json()['update'], [{'non_field_errors': ['Expected one or more task fields.']}])
+
+    def test_creates_ignore_creator_id(self):
+        response = self.bulk(self.creator, {'create': [
+            {'description': 'New', 'due_date': '2025-07-01', 'status': 'new', 'project_id': self.other.pk,
+             'creator_id': self.reader.pk},
+        ]})
+        self.assertEqual(response.status_code, 200, response.content)
+        # The requesting user is the creator, as with POST /api/tasks/.
+        self.assertEqual(Task.objects.get(description='New').creator, self.creator)
+
+    def test_tasks_updated_twice_count_once(self):
+        response = self.bulk(self.creator, {
+            'update': [{'id': self.tasks[0].pk, 'description': 'Renamed'}],
+            'update_where': {'filter': {'project': self.project.pk, 'status': 'new'}, 'set': {'status': 'blocked'}},
+        })
+        self.assertEqual(response.json(), {'created': 0, 'updated': 4, 'deleted': 0})
+
+
+class TaskConditionalGetTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.reader = self.create_user('reader@example.com', self.read_only_role)
+        self.project = self.create_project()
+        self.tasks = self.create_tasks(3, self.project, owner=self.reader)
+        self.client = self.client_for(self.admin)
+
+    def assertNotModified(self, url, **headers):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, **headers)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertFalse([query for query in ctx.captured_queries if 'tasks_task' in query['sql']])
+        return response
+
+    def test_list_and_detail_answer_304_without_reading_tasks(self):
+        for url in ('/api/tasks/?status=new', f'/api/tasks/{self.tasks[0].pk}/'):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response['ETag'].startswith('"'))
+            self.assertIn('no-cache', response['Cache-Control'])
+            not_modified = self.assertNotModified(url, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(not_modified['ETag'], response['ETag'])
+            self.assertNotModified(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+
+    def test_writes_change_the_etag(self):
+        etag = self.client.get('/api/tasks/')['ETag']
+        self.tasks[0].status = 'completed'
+        self.tasks[0].save()
+        response = self.client.get('/api/tasks/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('updated_at', response.json()['results'][0])
+
+        etag = response['ETag']
+        self.client.post('/api/tasks/bulk/', {'update': [{'id': self.tasks[1].pk, 'status': 'blocked'}]}, format='json')
+        self.assertEqual(self.client.get('/api/tasks/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        # Renaming a rendered owner changes the nested representation too.
+        etag = self.client.get('/api/tasks/')['ETag']
+        self.reader.first_name = 'Renamed'
+        self.reader.save()
+        self.assertEqual(self.client.get('/api/tasks/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_depends_on_user_and_url(self):
+        etag = self.client.get('/api/tasks/')['ETag']
+        self.assertNotEqual(self.client.get('/api/tasks/?page_size=1')['ETag'], etag)
+        response = self.client_for(self.reader).get('/api/tasks/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_cache_flush_changes_the_etag(self):
+        etag = self.client.get('/api/tasks/')['ETag']
+        cache.clear()
+        self.assertEqual(self.client.get('/api/tasks/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_lost_bump_leaves_etags_stale_for_a_bounded_time(self):
+        etag = self.client.get('/api/tasks/')['ETag']
+        # A cache ignoring its errors drops writes and returns None from incr().
+        with patch.object(cache, 'incr', return_value=None), patch.object(cache, 'set'):
+            self.tasks[0].status = 'completed'
+            self.tasks[0].save()
+        # The writing worker stops validating until the period is over.
+        response = self.client.get('/api/tasks/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+
+        # Other workers, which saw no failure, change their ETags with the period.
+        versions.unavailable_until = 0.0
+        self.assertEqual(self.client.get('/api/tasks/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        later = time.time() + settings.VERSIONS_MAX_STALENESS_SECONDS
+        with patch('task_tracker.versions.time.time', return_value=later):
+            self.assertEqual(self.client.get('/api/tasks/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+@override_settings(RESPONSE_CACHE=True)
+class TaskResponseCacheTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.reader = self.create_user('reader@example.com', self.read_only_role)
+        self.project = self.create_project()
+        self.tasks = self.create_tasks(3, self.project, owner=self.reader)
+
+    def task_queries(self, client, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len([query for query in ctx.captured_queries if 'tasks_task' in query['sql']]), response
+
+    def test_repeated_list_and_detail_are_served_from_cache(self):
+        client = self.client_for(self.admin)
+        for url in ('/api/tasks/?ordering=due_date,id', f'/api/tasks/{self.tasks[0].pk}/'):
+            queries, first = self.task_queries(client, url)
+            self.assertGreater(queries, 0)
+            queries, second = self.task_queries(client, url)
+            self.assertEqual(queries, 0)
+            self.assertEqual(second.content, first.content)
+            self.assertEqual(second['Content-Type'], 'application/json')
+
+    def test_writes_bump_the_generation(self):
+        client = self.client_for(self.admin)
+        client.get('/api/tasks/')
+        self.tasks[0].status = 'completed'
+        self.tasks[0].save()
+        queries, response = self.task_queries(client, '/api/tasks/')
+        self.assertGreater(queries, 0)
+        self.assertEqual(response.json()['results'][0]['status'], 'completed')
+
+        # Project membership changes the nested member_count.
+        self.project.users.add(self.reader)
+        self.assertEqual(client.get('/api/tasks/').json()['results'][0]['project']['member_count'], 1)
+
+    def test_admins_share_a_scope_and_other_users_do_not(self):
+        other_admin = self.create_user('admin2@example.com', self.admin_role)
+        self.client_for(self.admin).get('/api/tasks/')
+        self.assertEqual(self.task_queries(self.client_for(other_admin), '/api/tasks/')[0], 0)
+
+        self.create_tasks(1, self.project)
+        queries, response = self.task_queries(self.client_for(self.reader), '/api/tasks/')
+        self.assertGreater(queries, 0)
+        self.assertEqual(len(response.json()['results']), 3)
+        queries, response = self.task_queries(self.client_for(self.admin), '/api/tasks/')
+        self.assertEqual(len(response.json()['results']), 4)
+
+
+
+class TaskChangeFeedTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.reader = self.create_user('reader@example.com', self.read_only_role)
+        self.other = self.create_user('other@example.com', self.read_only_role)
+        self.project = self.create_project()
+        with self.committed():
+            self.tasks = self.create_tasks(3, self.project, owner=self.reader)
+
+    def committed(self):
+        """Numbers the writes of the block as if they had committed."""
+        return self.captureOnCommitCallbacks(execute=True)
+
+    def changes(self, user, cursor=None, **params):
+        if cursor is not None:
+            params['since'] = cursor
+        response = self.client_for(user).get('/api/tasks/changes/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def sync(self, user, cursor=None, page_size=2):
+        """Follows `has_more` and returns (changed IDs, removed IDs, cursor)."""
+        changed, removed = [], []
+        while True:
+            body = self.changes(user, cursor, page_size=page_size)
+            changed += [task['id'] for task in body['changes']]
+            removed += body['removed']
+            cursor = body['cursor']
+            if not body['has_more']:
+                return changed, removed, cursor
+
+    def test_full_sync_then_incremental_changes(self):
+        changed, removed, cursor = self.sync(self.reader)
+        self.assertEqual(sorted(changed), [task.pk for task in self.tasks])
+        self.assertEqual(removed, [])
+        self.assertEqual(self.sync(self.reader, cursor)[:2], ([], []))
+
+        with self.committed():
+            self.tasks[1].status = 'completed'
+            self.tasks[1].save()
+            created = self.create_tasks(1, self.project, owner=self.reader)[0]
+            self.create_tasks(1, self.project, owner=self.other)
+            deleted = self.tasks[0].pk
+            self.tasks[0].delete()
+        body = self.changes(self.reader, cursor)
+        self.assertEqual([task['id'] for task in body['changes']], [self.tasks[1].pk, created.pk])
+        self.assertEqual(body['changes'][0]['status'], 'completed')
+        self.assertEqual(body['removed'], [deleted])
+
+    def test_writes_are_numbered_after_commit(self):
+        cursor = self.sync(self.reader)[2]
+        value = TaskChangeSequence.objects.get(pk=1).value
+        with self.committed():
+            self.tasks[0].save()
+            created = self.create_tasks(1, self.project, owner=self.reader)[0]
+            # The write does not hold the counter, and is not in the feed yet.
+            self.assertEqual(TaskChangeSequence.objects.get(pk=1).value, value)
+            self.assertEqual(self.sync(self.reader)[0], [task.pk for task in self.tasks[1:]])
+            self.assertEqual(self.sync(self.reader, cursor)[:2], ([], []))
+        self.assertEqual(TaskChangeSequence.objects.get(pk=1).value, value + 2)
+        self.assertEqual(self.sync(self.reader, cursor)[:2], ([self.tasks[0].pk, created.pk], []))
+
+    @patch('tasks.changes.NUMBERING_RETRY_SECONDS', 0)
+    def test_failed_numbering_is_retried_then_repaired(self):
+        cursor = self.sync(self.reader)[2]
+        next_value = TaskChangeSequence.next_value
+        failures = iter([True])
+        def flaky():
+            if next(failures, False):
+                raise OperationalError('Lock wait timeout exceeded')
+            return next_value()
+
+        with patch.object(TaskChangeSequence, 'next_value', side_effect=flaky), self.committed():
+            self.tasks[0].save()
+        changed, removed, cursor = self.sync(self.reader, cursor)
+        self.assertEqual((changed, removed), ([self.tasks[0].pk], []))
+
+        with patch.object(TaskChangeSequence, 'next_value', side_effect=OperationalError('gone')), \
+                self.assertLogs('django.test', 'ERROR'), self.committed():
+            self.tasks[1].save()
+            deleted = self.tasks[2].pk
+            self.tasks[2].delete()
+        self.assertEqual(self.sync(self.reader, cursor)[:2], ([], []))
+        call_command('number_task_changes', stdout=io.StringIO())
+        self.assertEqual(self.sync(self.reader, cursor)[:2], ([self.tasks[1].pk], [deleted]))
+        self.assertFalse(Task.objects.filter(change_seq__lt=0).exists())
+
+    def test_reassigned_tasks_leave_and_enter_scope(self):
+        cursor = self.sync(self.reader)[2]
+        other_cursor = self.sync(self.other)[2]
+        with self.committed():
+            self.tasks[0].owner = self.other
+            self.tasks[0].save()
+        self.assertEqual(self.sync(self.reader, cursor)[:2], ([], [self.tasks[0].pk]))
+        self.assertEqual(self.sync(self.other, other_cursor)[:2], ([self.tasks[0].pk], []))
+
+        # Still visible through the creator role: not removed.
+        both = self.create_user('both@example.com', self.read_only_role, self.creator_role)
+        with self.committed():
+            task = self.create_tasks(1, self.project, owner=both, creator=both)[0]
+        cursor = self.sync(both)[2]
+        with self.committed():
+            task.owner = self.reader
+            task.save()
+        self.assertEqual(self.sync(both, cursor)[:2], ([task.pk], []))
+
+    def test_project_cascade_and_bulk_writes(self):
+        cursor = self.sync(self.reader)[2]
+        admin_cursor = self.sync(self.admin)[2]
+        other_project = self.create_project()
+        with self.committed():
+            moved = self.create_tasks(2, other_project, owner=self.reader)
+        cursor_after_create = self.sync(self.reader, cursor)[2]
+
+        with self.committed():
+            response = self.client_for(self.admin).post('/api/tasks/bulk/', {
+                'update': [{'id': self.tasks[0].pk, 'owner_id': self.other.pk}],
+                'update_where': {'filter': {'project': self.project.pk, 'status': 'new'}, 'set': {'status': 'blocked'}},
+            }, format='json')
+            other_project.delete()
+        self.assertEqual(response.status_code, 200, response.content)
+
+        changed, removed, _ = self.sync(self.reader, cursor_after_create)
+        self.assertEqual(sorted(changed), [task.pk for task in self.tasks[1:]])
+        self.assertEqual(sorted(removed), sorted([self.tasks[0].pk] + [task.pk for task in moved]))
+        # Admins see every task: only deletions are removed.
+        changed, removed, _ = self.sync(self.admin, admin_cursor)
+        self.assertEqual(sorted(changed), [task.pk for task in self.tasks])
+        self.assertEqual(sorted(removed), [task.pk for task in moved])
+
+    def test_changes_are_read_through_the_index(self):
+        cursor = self.sync(self.reader)[2]
+        with self.committed():
+            self.tasks[2].save()
+        self.assertEqual([task['id'] for task in self.changes(self.reader, cursor)['changes']], [self.tasks[2].pk])
+        plan = Task.objects.filter(change_seq__gt=0).order_by('change_seq', 'id').explain()
+        self.assertIn('task_change_seq_id_idx', plan)
+
+    def test_invalid_cursor(self):
+        response = self.client_for(self.reader).get('/api/tasks/changes/?since=nope')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('since', response.json())
+
+
+class TaskEventStreamTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.reader = self.create_user('reader@example.com', self.read_only_role)
+        self.other = self.create_user('other@example.com', self.read_only_role)
+        self.project = self.create_project()
+
+    async def open_stream(self, user, **params):
+        token = await sync_to_async(
+            lambda: str(CustomTokenObtainPairSerializer.get_token(User.objects.get(pk=user.pk)).access_token)
+        )()
+        if params.pop('in_url', False):
+            response = await AsyncClient().get('/api/events/', {'access_token': token})
+        else:
+            response = await AsyncClient().get('/api/events/', headers={'authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = response.streaming_content
+        self.assertEqual(await anext(stream), b'retry: 3000\n\n')
+        return stream
+
+    async def commit(self, write):
+        def run():
+            with self.captureOnCommitCallbacks(execute=True):
+                return write()
+        return await sync_to_async(run)()
+
+    async def read(self, stream):
+        return (await asyncio.wait_for(anext(stream), 1)).decode()
+
+    async def test_events_follow_task_visibility(self):
+        reader_stream = await self.open_stream(self.reader, in_url=True)
+        admin_stream = await self.open_stream(self.admin)
+        try:
+            await self.commit(lambda: self.create_tasks(1, self.project, owner=self.other))
+            task = (await self.commit(lambda: self.create_tasks(1, self.project, owner=self.reader)))[0]
+            self.assertEqual(await self.read(reader_stream), f'event: task\ndata: {{"action":"created","id":{task.pk}}}\n\n')
+            self.assertIn('"action":"created"', await self.read(admin_stream))
+            self.assertIn(f'"id":{task.pk}', await self.read(admin_stream))
+
+            # The previous owner learns that the task left their scope.
+            task.owner = self.other
+            await self.commit(task.save)
+            self.assertEqual(await self.read(reader_stream), f'event: task\ndata: {{"action":"updated","id":{task.pk}}}\n\n')
+        finally:
+            await reader_stream.aclose()
+            await admin_stream.aclose()
+        del reader_stream, admin_stream
+        gc.collect()
+        self.assertEqual(len(events.get_broker().subscriptions), 0)
+
+    async def test_bulk_writes_are_one_message(self):
+        task = (await self.commit(lambda: self.create_tasks(2, self.project, owner=self.reader)))[0]
+        stream = await self.open_stream(self.reader)
+        client = await sync_to_async(self.client_for)(self.admin)
+        response = await self.commit(lambda: client.post('/api/tasks/bulk/', {
+            'update_where': {'filter': {'owner': self.reader.pk}, 'set': {'status': 'completed'}},
+        }, format='json'))
+        self.assertEqual(response.status_code, 200)
+        chunk = await self.read(stream)
+        self.assertEqual(chunk.count('event: task'), 2)
+        self.assertIn(f'"id":{task.pk}', chunk)
+        await stream.aclose()
+
+    @override_settings(SSE_HEARTBEAT_SECONDS=0.01)
+    async def test_heartbeat_and_revoked_token(self):
+        stream = await self.open_stream(self.reader)
+        self.assertEqual(await self.read(stream), ': ping\n\n')
+        await sync_to_async(self.reader.roles.add)(self.creator_role)
+        self.assertEqual(await self.read(stream), 'event: revoked\ndata: {}\n\n')
+        with self.assertRaises(StopAsyncIteration):
+            await anext(stream)
+
+    @override_settings(SSE_HEARTBEAT_SECONDS=0.05)
+    async def test_revocation_is_checked_while_events_flow(self):
+        stream = await self.open_stream(self.reader)
+        await sync_to_async(self.reader.roles.add)(self.creator_role)
+        other_events = [{'type': 'task', 'action': 'updated', 'id': 1, 'audience': {'any': [self.other.pk]}}]
+
+        async def publish():
+            # Never idle for a heartbeat, for longer than the check may take.
+            for _ in range(400):
+                events.get_broker().publish(other_events)
+                await asyncio.sleep(0.005)
+
+        publisher = asyncio.create_task(publish())
+        started = time.monotonic()
+        try:
+            self.assertEqual(await self.read(stream), 'event: revoked\ndata: {}\n\n')
+            self.assertLess(time.monotonic() - started, 1)
+        finally:
+            publisher.cancel()
+            await stream.aclose()
+
+    async def test_slow_subscribers_are_reset(self):
+        subscription = events.LocalBroker().subscribe()
+        subscription.queue = asyncio.Queue(2)
+        for batch in range(3):
+            subscription.put([batch])
+        await asyncio.sleep(0)
+        self.assertEqual(await subscription.get(), events.RESET)
+        self.assertTrue(subscription.queue.empty())
+
+    async def test_requires_asgi_and_credentials(self):
+        self.assertEqual((await sync_to_async(self.client.get)('/api/events/')).status_code, 501)
+        self.assertEqual((await AsyncClient().get('/api/events/')).status_code, 401)
+        response = await AsyncClient().get('/api/events/', headers={'authorization': 'Bearer nope'})
+        self.assertEqual(response.status_code, 401)
+
+
+class TaskAsyncReadTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.reader = self.create_user('reader@example.com', self.read_only_role)
+        self.project = self.create_project()
+        self.create_tasks(5, self.project, owner=self.reader, status='blocked')
+        self.create_tasks(5, self.project)
+
+    def assertSameResponse(self, client, url):
+        sync = client.get(f'/api{url}')
+        asynchronous = client.get(f'/api/async{url}')
+        self.assertEqual(asynchronous.status_code, sync.status_code)
+        self.assertEqual(
+            json.loads(asynchronous.content.decode().replace('/api/async/', '/api/')), json.loads(sync.content),
+        )
+        return asynchronous
+
+    def test_matches_the_sync_endpoints(self):
+        client = self.client_for(self.admin)
+        task = Task.objects.first()
+        for url in (
+            '/tasks/?page_size=3&ordering=-due_date,-id',
+            '/tasks/?status=blocked&fields=id,status,owner.email&expand=owner',
+            f'/tasks/{task.pk}/',
+            f'/tasks/{task.pk}/?fields=id,project.name',
+            '/tasks/0/',
+        ):
+            with self.subTest(url=url):
+                self.assertSameResponse(client, url)
+
+        with override_settings(FAST_SERIALIZERS=False):
+            self.assertSameResponse(client, '/tasks/?page_size=3')
+            self.assertSameResponse(client, f'/tasks/{task.pk}/')
+
+        page = client.get('/api/async/tasks/?page_size=4').json()
+        following = client.get(page['next']).json()
+        self.assertEqual(len(page['results']) + len(following['results']), 8)
+
+    def test_visibility_and_permissions(self):
+        response = self.assertSameResponse(self.client_for(self.reader), '/tasks/')
+        self.assertEqual({task['status'] for task in response.json()['results']}, {'blocked'})
+        self.assertEqual(self.client_for(self.create_user('norole@example.com')).get('/api/async/tasks/').status_code, 403)
+        self.assertEqual(self.client.get('/api/async/tasks/').status_code, 401)
+        self.assertEqual(self.client_for(self.admin).post('/api/async/tasks/', {}).status_code, 405)
+
+    async def test_served_by_the_asgi_handler(self):
+        token = await sync_to_async(
+            lambda: str(CustomTokenObtainPairSerializer.get_token(User.objects.get(pk=self.reader.pk)).access_token)
+        )()
+        response = await AsyncClient().get('/api/async/tasks/', headers={'authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 5)
@@ -1,13 +1,33 @@
+import datetime
+
 from rest_framework import viewsets
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.response import Response
+from django.shortcuts import get_object_or_404
 
-from accounts.models import Role
-from .models import Task
+from accounts.models import Role, User
+from accounts.roles import get_role_names
+from projects.models import Project
+from .models import Task, TaskDailyRollup
+from .rollups import default_range, rollup_series
 from .serializers import TaskSerializer
 from rest_framework.permissions import IsAuthenticated
 from accounts.permissions import IsAdminOrTaskCreator, IsReadOnlyOrAdminOrTaskCreator
-from django.db.models import Q
+from task_tracker.async_views import AsyncReadViewSetMixin
+from task_tracker.conditional import ConditionalGetViewSetMixin
+from task_tracker.response_cache import CachedResponseViewSetMixin
+from task_tracker.eager_loading import EagerLoadingViewSetMixin
+from task_tracker.fast_serializers import FastReadViewSetMixin
+from task_tracker.pagination import TaskPagination
+from rest_framework.decorators import action
+from .bulk import bulk_write, is_status_only
+from .changes import task_changes
+from .export import export_tasks
+from .filters import TaskFilterBackend
+from task_tracker.search import FullTextSearchFilter
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(AsyncReadViewSetMixin, ConditionalGetViewSetMixin, CachedResponseViewSetMixin, FastReadViewSetMixin,
+                  EagerLoadingViewSetMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing Task resources.
 
@@ -25,12 +45,42 @@ class TaskViewSet(viewsets.ModelViewSet):
         - POST /tasks/ : Create new task (assigns creator automatically).
         - PATCH /tasks/{id}/ : Update task partially.
         - DELETE /tasks/{id}/ : Delete task.
+        - GET /tasks/export/ : Stream every visible task as NDJSON or CSV (see export_tasks).
+        - POST /tasks/bulk/ : Create, update (by ID or by filter) and delete many tasks in one
+          transaction (see bulk_write).
+        - GET /tasks/changes/?since={cursor} : Tasks written and IDs of tasks removed since the
+          cursor of a previous call, for incremental refresh (see task_changes).
+        - GET /async/tasks/ and /async/tasks/{id}/ : The list and retrieve above served
+          through the async ORM under ASGI (see AsyncReadViewSetMixin).
+
+    Related objects rendered by TaskSerializer are eager-loaded on read requests,
+    so listing tasks costs a constant number of queries.
+
+    List and retrieve responses carry an ETag and Last-Modified; repeating the
+    request with `If-None-Match` (or `If-Modified-Since`) returns 304 Not Modified
+    without querying or serializing tasks until a task, project, user or role
+    changes (see ConditionalGetViewSetMixin). Other list/retrieve responses are
+    served from the response cache while those models are unchanged (see
+    CachedResponseViewSetMixin).
+
+    Query Parameters (GET):
+        - fields: Comma-separated fields to return, e.g. `id,status,owner.first_name`.
+        - expand: Comma-separated relations to nest, e.g. `project,project.owner`.
+          When either parameter is given, relations not expanded are returned as IDs.
+        - cursor / page_size: Keyset pagination (see KeysetPagination). At most
+          200 rows per page; responses are `{"next", "previous", "results"}`.
+        - ordering: `id` (default), `due_date,id` or `status,id`; prefix every field
+          with `-` for descending order.
+        - status, due_date_after, due_date_before, project, owner, creator: Filters
+          (see TaskFilterBackend).
+        - q: Full-text search in the description (see FullTextSearchFilter); results
+          are ordered by relevance unless `ordering` is given.
 
     QuerySet Filtering Logic (get_queryset):
         - Admin:
             - Full access to all tasks.
         - Task Creator + Read-Only:
-            - Access to tasks where user is creator or owner.
+            - Access to tasks where user is creator or owner (an OR of two index lookups).
         - Read-Only:
             - Access to tasks where user is owner.
         - Task Creator:
@@ -41,6 +91,8 @@ class TaskViewSet(viewsets.ModelViewSet):
     Permission Logic (get_permissions):
         - GET: Allowed for Admin, Task Creator, and Read-Only.
         - PATCH (status only): Allowed for Read-Only users if only updating "status" field.
+        - POST /tasks/bulk/ (status only): Allowed for Read-Only users if every update only
+          sets "status".
         - POST / DELETE / PATCH (full): Allowed only for Admin or Task Creator.
     
     Methods:
@@ -63,36 +115,27 @@ class TaskViewSet(viewsets.ModelViewSet):
     """
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
+    pagination_class = TaskPagination
+    filter_backends = [TaskFilterBackend, FullTextSearchFilter]
+    # Models rendered by TaskSerializer (nested projects include task counts),
+    # whose versions key the ETags and cached responses.
+    versioned_models = [Task, Project, User, Role]
 
 
     def get_queryset(self):
         if getattr(self, 'swagger_fake_view', False):
             return Task.objects.none() 
         
-        request_user_role = self.request.user.roles.values_list("name", flat=True)
-        # Full access to all tasks.
-        if Role.ADMIN in request_user_role: 
-            return super().get_queryset()
-        
-      
-        # Task Creator and Read-Only Access to tasks where user is creator or owner.
-        if Role.TASK_CREATOR in request_user_role and Role.READ_ONLY in request_user_role:
-            return Task.objects.filter(Q(creator=self.request.user) | Q(owner=self.request.user))
-        
-        # READ_ONLY - Access to tasks where user is owner.
-        if Role.READ_ONLY in request_user_role:
-            return Task.objects.filter(owner=self.request.user)
-        
-        # Full access to tasks created by themselves.
-        if Role.TASK_CREATOR in request_user_role:
-            return Task.objects.filter(creator=self.request.user)
-    
-        return super().get_queryset()
+        # Role-based visibility, see TaskQuerySet.visible_to().
+        return super().get_queryset().visible_to(self.request.user)
 
     def get_permissions(self):
         # Read-Only User: Can read tasks and partially update task "status".
         if (self.request.method == "GET") or (self.request.method == "PATCH" and len(self.request.data) == 1 and 'status' in self.request.data):
             return [IsAuthenticated(), IsReadOnlyOrAdminOrTaskCreator()]
+        # The same applies to bulk writes that only change statuses.
+        if self.action == 'bulk' and is_status_only(self.request.data):
+            return [IsAuthenticated(), IsReadOnlyOrAdminOrTaskCreator()]
         return [IsAuthenticated(), IsAdminOrTaskCreator()]
 
     def perform_create(self, serializer):
@@ -100,3 +143,125 @@ class TaskViewSet(viewsets.ModelViewSet):
 
     def partial_update(self, request, *args, **kwargs):
         return super().partial_update(request, *args, **kwargs)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Streams every task visible to the user as NDJSON (default) or CSV.
+        URL: /tasks/export/?export_format=csv
+        """
+        return export_tasks(request, self.get_queryset(), self.get_serializer_context())
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Creates, partially updates and deletes many tasks in one transaction.
+        URL: /tasks/bulk/
+
+        Updates and deletes only reach tasks visible to the user (see
+        get_queryset); payloads that only change statuses are allowed to
+        read-only users. See bulk_write for the request and response format.
+        """
+        return bulk_write(request, self.get_queryset(), self.get_serializer_context())
+
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """
+        Returns the visible tasks created or updated since a cursor, and the IDs
+        of tasks deleted or no longer visible to the user since then.
+        URL: /tasks/changes/?since={cursor}
+
+        See task_changes for the cursor and response format.
+        """
+        return task_changes(request, self.get_queryset(), self.get_serializer_context())
+
+
+class AnalyticsViewSet(viewsets.ViewSet):
+    """
+    Read-only charts served from the daily rollups (TaskDailyRollup) written by
+    `python manage.py snapshot_tasks`, never from the tasks table.
+
+    Permissions:
+        - Requires authentication and one of the roles: `IsReadOnlyOrAdminOrTaskCreator`.
+        - Burndown: the project must be visible to the user (see ProjectQuerySet.visible_to).
+        - Workload: admins may read any owner, other users only themselves.
+
+    Endpoints:
+        - GET /analytics/burndown/?project={id} : Open vs completed tasks of a project per day.
+        - GET /analytics/workload/?owner={id} : Tasks per status of an owner per week.
+
+    Query Parameters:
+        - start / end: Date range (YYYY-MM-DD), by default the last 365 days.
+        - interval: `day` or `week` (last snapshot of each ISO week). Burndown
+          defaults to `day`, workload to `week`.
+
+    Each point reads one rollup row, so a year of daily history is at most 366
+    rows. Days without a snapshot (or without tasks) have no point.
+
+    Example response:
+    {
+        "project": 5,
+        "interval": "day",
+        "results": [
+            {
+                "date": "2025-06-01",
+                "open": 7,
+                "completed": 3,
+                "status_counts": {"new": 4, "in_progress": 2, "blocked": 1, "completed": 3, "not_started": 0}
+            },
+            ...
+        ]
+    }
+    """
+    intervals = ['day', 'week']
+
+    def get_permissions(self):
+        return [IsAuthenticated(), IsReadOnlyOrAdminOrTaskCreator()]
+
+    @action(detail=False, methods=['get'])
+    def burndown(self, request):
+        project_id = self.get_id_param('project', required=True)
+        project = get_object_or_404(Project.objects.visible_to(request.user).only('pk'), pk=project_id)
+        rollups = TaskDailyRollup.objects.filter(project=project)
+        return self.series_response(request, 'project', project.pk, rollups, 'day')
+
+    @action(detail=False, methods=['get'])
+    def workload(self, request):
+        owner_id = self.get_id_param('owner') or request.user.pk
+        if owner_id != request.user.pk and Role.ADMIN not in get_role_names(request.user):
+            raise PermissionDenied('Only admins may read the workload of other users.')
+        rollups = TaskDailyRollup.objects.filter(owner_id=owner_id)
+        return self.series_response(request, 'owner', owner_id, rollups, 'week')
+
+    def get_id_param(self, name, required=False):
+        value = self.request.query_params.get(name)
+        if not value:
+            if required:
+                raise ValidationError({name: ['This query parameter is required.']})
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise ValidationError({name: ['Expected an ID.']})
+
+    def series_response(self, request, key, pk, rollups, default_interval):
+        params = request.query_params
+        errors = {}
+        start, end = default_range()
+        try:
+            start = datetime.date.fromisoformat(params['start']) if params.get('start') else start
+        except ValueError:
+            errors['start'] = ['Date has wrong format. Use YYYY-MM-DD.']
+        try:
+            end = datetime.date.fromisoformat(params['end']) if params.get('end') else end
+        except ValueError:
+            errors['end'] = ['Date has wrong format. Use YYYY-MM-DD.']
+        interval = params.get('interval') or default_interval
+        if interval not in self.intervals:
+            errors['interval'] = [f'Expected one of: {", ".join(self.intervals)}.']
+        if errors:
+            raise ValidationError(errors)
+
+        rollups = rollups.filter(date__gte=start, date__lte=end).order_by('date')
+        return Response({key: pk, 'interval': interval, 'results': rollup_series(rollups, interval)})
+